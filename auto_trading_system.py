@@ -1,33 +1,36 @@
-import alpaca_trade_api as tradeapi
-from alpaca_trade_api.rest import TimeFrame
+import asyncio
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
 import os
 from dotenv import load_dotenv
 import sys
+import time
 
 from config.settings import (
-    SYMBOL, SIMULATED_CAPITAL, RISK_PERCENT, RISK_PER_TRADE,
-    ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL
+    SYMBOL, SIMULATED_CAPITAL, RISK_PERCENT, RISK_PER_TRADE, SIGNAL_STATE_FILE
 )
+from trading.cache import cached_broker
+from trading.execution import OrderExecutor, OrderRequest
+from trading.journal import Journal
+from utils.telemetry import telemetry
 
 load_dotenv()
 
 class AutomatedTradingSystem:
-    def __init__(self):
-        self.api = tradeapi.REST(
-            ALPACA_API_KEY,
-            ALPACA_SECRET_KEY,
-            ALPACA_BASE_URL,
-            api_version='v2'
-        )
+    def __init__(self, broker=None, journal=None):
+        self.broker = broker or cached_broker()
+        self.journal = journal or Journal()
+        self.executor = OrderExecutor(self.broker, journal=self.journal)
         self.symbol = SYMBOL
         self.simulated_capital = SIMULATED_CAPITAL
         self.risk_percent = RISK_PERCENT
         
         from strategies.main_strategy import SimpleCombinedWithATR
+        from strategies.incremental import IncrementalSignalState
         self.strategy = SimpleCombinedWithATR(risk_per_trade=RISK_PER_TRADE)
+        self.state_file = SIGNAL_STATE_FILE
+        self.signal_state = IncrementalSignalState.load(self.state_file, self.strategy)
         
         # Telegram alerts (optional)
         self.use_telegram = False
@@ -36,8 +39,8 @@ class AutomatedTradingSystem:
             self.telegram = TelegramAlerts()
             self.use_telegram = True
     
-    def get_market_data(self):
-        """Get current market data"""
+    def market_data_range(self, since=None):
+        """(start, end) of the bars to request, or None if the state is up to date"""
         eastern = pytz.timezone('US/Eastern')
         now_et = datetime.now(eastern)
         
@@ -51,62 +54,134 @@ class AutomatedTradingSystem:
             end_date = now_et
             start_date = end_date - timedelta(days=60)
         
-        try:
-            bars = self.api.get_bars(
-                symbol=self.symbol,
-                timeframe=TimeFrame.Day,
-                start=start_date.isoformat(),
-                end=end_date.isoformat(),
-                feed='iex'
-            )
-            
-            df = bars.df
-            if df is None or len(df) == 0:
+        # Signal state already holds everything up to `since`
+        if since is not None and since > start_date:
+            start_date = since
+            if start_date >= end_date:
                 return None
-            
-            # Convert cents to dollars
-            if 'close' in df.columns and df['close'].mean() > 1000:
-                price_columns = ['open', 'high', 'low', 'close']
-                for col in price_columns:
-                    if col in df.columns:
-                        df[col] = df[col] / 100.0
-            
-            return df[['open', 'high', 'low', 'close', 'volume']]
-            
-        except Exception as e:
-            print(f"❌ Data error: {e}")
+        return start_date.isoformat(), end_date.isoformat()
+    
+    def batch_id(self, slot=None):
+        """Order batch of one session slot: a rerun of that slot can't place the same order twice
+
+        slot is the session's trigger time (the daemon passes it), else
+        the current minute, US/Eastern. Each of several sessions a day
+        gets its own batch, so a later same-size order is not mistaken
+        for a duplicate of an earlier one.
+        """
+        slot = slot or datetime.now(pytz.timezone('US/Eastern'))
+        return f"session-{slot.strftime('%Y-%m-%dT%H:%M')}-{self.symbol}"
+    
+    @staticmethod
+    def clean_bars(df):
+        """OHLCV columns in dollars, or None if there are no bars"""
+        if df is None or len(df) == 0:
             return None
+        
+        # Convert cents to dollars
+        if 'close' in df.columns and df['close'].mean() > 1000:
+            price_columns = ['open', 'high', 'low', 'close']
+            for col in price_columns:
+                if col in df.columns:
+                    df[col] = df[col] / 100.0
+        
+        return df[['open', 'high', 'low', 'close', 'volume']]
+    
+    @telemetry.timed('fetch')
+    async def fetch_snapshot(self):
+        """Clock, account, new bars and position in one concurrent round trip"""
+        data_range = self.market_data_range(since=self.signal_state.last_timestamp)
+        start, end = data_range if data_range else (None, None)
+        snapshot = await self.broker.session_snapshot(self.symbol, start, end)
+        if snapshot.bars_error is not None:
+            print(f"❌ Data error: {snapshot.bars_error}")
+        snapshot.bars = self.clean_bars(snapshot.bars)
+        return snapshot
+    
+    @telemetry.timed('live_signal')
+    def advance_signal_state(self, df):
+        """Feed new bars into the signal state; returns the state including today's bar
+        
+        Only finished bars are persisted; today's bar is still forming, so
+        it is applied to a throwaway copy. Returns None if there is neither
+        stored state nor data.
+        """
+        if df is None and self.signal_state.bars == 0:
+            return None
+        if df is None:
+            df = pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        
+        today = datetime.now(pytz.timezone('US/Eastern')).date()
+        bar_dates = df.index.tz_convert('US/Eastern').date if len(df) else []
+        finished = df[bar_dates < today] if len(df) else df
+        new_bars = self.signal_state.update_frame(finished)
+        self.signal_state.save(self.state_file)
+        live_state = self.signal_state.preview(df[len(finished):])
+        print(f"📈 Signal state: {new_bars} new bar(s), {live_state.bars} total, "
+              f"last {live_state.last_timestamp}")
+        return live_state
+    
+    def check_signal(self):
+        """Current signal without trading: fetch new bars, update the state, close the session"""
+        async def fetch():
+            async with self.broker:
+                return await self.fetch_snapshot()
+        return self.advance_signal_state(asyncio.run(fetch()).bars)
     
     def execute_trading_session(self):
         """Full trading session"""
+        return asyncio.run(self.run_session())
+    
+    async def run_session(self):
+        """Trading session on one pooled broker connection, closed afterwards"""
+        async with self.broker:
+            return await self.trading_session()
+    
+    @telemetry.timed('session')
+    async def trading_session(self, trigger=None):
+        """One session; trigger is the scheduled time it runs for, if any (names its order batch)"""
+        batch_id = self.batch_id(trigger)
         print(f"\n{'='*60}")
         print(f"🤖 AUTOMATED TRADING SESSION")
         print(f"   {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print('='*60)
         
-        # 1. Account status
-        account = self.api.get_account()
-        equity = float(account.equity)
+        # 1-2. Market clock, account status, market data (only bars newer than
+        # the stored signal state) and position, requested concurrently
+        snapshot = await self.fetch_snapshot()
+        session_id = self.journal.record('session', self.symbol, status='started')
+        await self.reconcile_fills(session_id)
+        clock = snapshot.clock
+        if not clock.is_open:
+            print(f"⏸️  Market closed. Next open: {clock.next_open}")
+            print("⚠️  Running anyway for testing...")
+        else:
+            print(f"✅ Market is open")
+        
+        equity = snapshot.equity
         print(f"💰 Account Equity: ${equity:,.2f}")
+        self.journal.record('equity', self.symbol, session_id, equity=equity,
+                            cash=float(snapshot.account.cash))
         
-        # 2. Get market data
-        df = self.get_market_data()
-        if df is None:
+        # 3. Generate signal (O(1) per new bar on top of the stored state)
+        live_state = self.advance_signal_state(snapshot.bars)
+        if live_state is None:
             print("❌ No data available")
+            self.journal.record('session', self.symbol, session_id, status='no_data')
             return
-        
-        # 3. Generate signal
-        df = self.strategy.generate_signals(df)
-        signal = df['signal'].iloc[-1]
-        signal_text = "BUY" if signal == 1 else "SELL" if signal == -1 else "HOLD"
+        signal = live_state.signal
+        signal_at = time.perf_counter()
+        signal_text = live_state.signal_text
         
         # Get latest ATR and price for position sizing
-        latest_atr = df['atr'].iloc[-1]
-        latest_price = df['close'].iloc[-1]
+        latest_atr = live_state.atr_value
+        latest_price = live_state.close
+        self.journal.record('signal', self.symbol, session_id, signal=int(signal), text=signal_text,
+                            close=latest_price, atr=latest_atr, bar=live_state.last_timestamp)
         
-        # 4. Check existing position
-        try:
-            position = self.api.get_position(self.symbol)
+        # 4. Check existing position (fetched with the snapshot)
+        position = snapshot.position
+        if position is not None:
             has_position = True
             position_qty = int(position.qty)
             avg_price = float(position.avg_entry_price)
@@ -118,7 +193,7 @@ class AutomatedTradingSystem:
             print(f"   Avg Entry: ${avg_price:.2f}")
             print(f"   Current Price: ${current_price:.2f}")
             print(f"   Unrealized P&L: ${pnl:+.2f}")
-        except:
+        else:
             has_position = False
             current_price = latest_price
             print(f"\n📦 EXISTING POSITION: None")
@@ -143,31 +218,28 @@ class AutomatedTradingSystem:
             # BUY signal, no position
             print(f"\n🚀 ACTION: BUY {calculated_shares} shares")
             
-            try:
-                order = self.api.submit_order(
-                    symbol=self.symbol,
-                    qty=calculated_shares,
-                    side='buy',
-                    type='market',
-                    time_in_force='day'
-                )
-                print(f"✅ Buy order placed: {order.id}")
+            result = await self.executor.submit(OrderRequest(self.symbol, calculated_shares, 'buy'),
+                                                batch_id, session_id)
+            if result.ok:
+                telemetry.observe('signal_to_order_seconds', time.perf_counter() - signal_at, self.symbol)
+                print(f"✅ Buy order placed: {result.order.id}")
                 
                 # Send alert
                 if self.use_telegram:
                     self.telegram.send_trade_alert(
                         'BUY', self.symbol, calculated_shares, current_price
                     )
-                    
-            except Exception as e:
-                print(f"❌ Buy order failed: {e}")
+            else:
+                print(f"❌ Buy order failed: {result.error}")
                 
         elif signal == -1 and has_position:
             # SELL signal, has position
             print(f"🚀 ACTION: SELL {position_qty} shares")
             
-            try:
-                self.api.close_position(self.symbol)
+            result = await self.executor.submit(OrderRequest(self.symbol, position_qty, 'sell'),
+                                                batch_id, session_id)
+            if result.ok:
+                telemetry.observe('signal_to_order_seconds', time.perf_counter() - signal_at, self.symbol)
                 print(f"✅ Sell order executed")
                 
                 # Send alert with P&L
@@ -175,9 +247,8 @@ class AutomatedTradingSystem:
                     self.telegram.send_trade_alert(
                         'SELL', self.symbol, position_qty, current_price, pnl
                     )
-                    
-            except Exception as e:
-                print(f"❌ Sell order failed: {e}")
+            else:
+                print(f"❌ Sell order failed: {result.error}")
                 
         else:
             # HOLD
@@ -189,19 +260,25 @@ class AutomatedTradingSystem:
         print(f"✅ SESSION COMPLETE")
         print('='*60)
         
-        # Log to file
-        self.log_session(signal_text, has_position)
+        self.journal.record('session', self.symbol, session_id, status='complete',
+                            signal=signal_text, had_position=has_position, equity=equity)
         
         return signal_text
     
-    def log_session(self, signal, had_position):
-        """Log trading session to file"""
-        log_entry = f"{datetime.now()},{signal},{had_position},{self.api.get_account().equity}\n"
-        
-        with open('trading_log.csv', 'a') as f:
-            if os.path.getsize('trading_log.csv') == 0:
-                f.write("timestamp,signal,had_position,equity\n")
-            f.write(log_entry)
+    async def reconcile_fills(self, session_id):
+        """Journal how earlier orders that were still open when journaled have ended"""
+        pending = self.journal.open_order_ids()
+        if not pending:
+            return 0
+        try:
+            orders = await self.broker.list_orders(status='closed', limit=100)
+        except Exception as e:
+            print(f"⚠️  Could not reconcile {len(pending)} open order(s): {e}")
+            return 0
+        closed = [o for o in orders if o.id in pending]
+        for order in closed:
+            self.journal.record_order(order, session_id)
+        return len(closed)
 
 def main():
     """Main execution with error handling"""
@@ -214,16 +291,8 @@ def main():
     trader = AutomatedTradingSystem()
     
     try:
-        # Check market hours (skip for testing in future dates)
-        clock = trader.api.get_clock()
-        if not clock.is_open:
-            print(f"⏸️  Market closed. Next open: {clock.next_open}")
-            print("⚠️  Running anyway for testing...")
-            # return  # Commented out for testing
-        else:
-            print(f"✅ Market is open")
-        
-        # Execute trading session
+        # Execute trading session (market hours are checked inside; it runs
+        # anyway when closed, for testing in future dates)
         signal = trader.execute_trading_session()
         
         print(f"\n📊 Next run recommended: Tomorrow at market open")
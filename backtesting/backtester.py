@@ -1,116 +1,197 @@
+import copy
+import functools
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 from config.settings import SYMBOL
+from backtesting.event_engine import run_event_engine
+from backtesting.lean import LeanResult
+from backtesting.metrics import compute_metrics
+from utils.telemetry import telemetry
+
+
+def vectorized_columns(position, returns, commission, initial_capital):
+    """Result arrays of the vectorized engine: a 0/1 position applied to close-to-close returns"""
+    # Calculate strategy returns without commission
+    strategy_returns_raw = position * returns
+    
+    # Calculate commission adjustment
+    position_change = np.zeros(len(position))
+    position_change[1:] = np.diff(position)
+    if len(position) and position[0] == 1:
+        # A window that opens in a position (e.g. a walk-forward test window)
+        # buys in at its first bar's close, as the event engine does, unless
+        # the strategy exits at that same close
+        strategy_returns_raw[0] = 0.0
+        if len(position) > 1 and position[1] == 0:
+            position_change[1] = 0.0
+        else:
+            position_change[0] = 1.0
+    commission_adj = np.zeros(len(position))
+    # When we enter (position changes from 0 to 1) we pay commission,
+    # and again when we exit (position changes from 1 to 0)
+    commission_adj[(position_change == 1) | (position_change == -1)] = -commission
+    
+    # Adjust returns by commission
+    strategy_returns = strategy_returns_raw + commission_adj
+    
+    # Cumulative returns (pandas cumprod skips the NaN first bar)
+    cumulative_strategy = pd.Series(1 + strategy_returns).cumprod().to_numpy()
+    cumulative_market = pd.Series(1 + returns).cumprod().to_numpy()
+    
+    return {
+        'strategy_returns_raw': strategy_returns_raw,
+        'position_change': position_change,
+        'commission_adj': commission_adj,
+        'strategy_returns': strategy_returns,
+        'cumulative_strategy': cumulative_strategy,
+        'cumulative_market': cumulative_market,
+        'portfolio_value': initial_capital * cumulative_strategy,
+    }
+
+
+def event_columns(sim, returns, initial_capital):
+    """Result arrays from a run_event_engine simulation"""
+    equity = sim['equity']
+    prev_equity = np.concatenate(([float(initial_capital)], equity[:-1]))
+    
+    # Position = actually holding shares during the bar
+    position = sim['held']
+    position_change = np.zeros(len(position))
+    position_change[1:] = np.diff(position)
+    return {
+        'position': position,
+        'position_change': position_change,
+        'stop_hit': sim['stopped'],
+        'fill_price': sim['fills'],
+        'commission_paid': sim['fees'],
+        'commission_adj': -sim['fees'] / prev_equity,
+        'strategy_returns': equity / prev_equity - 1,
+        'cumulative_strategy': equity / initial_capital,
+        'cumulative_market': pd.Series(1 + returns).cumprod().to_numpy(),
+        'portfolio_value': equity,
+    }
+
 
 class Backtester:
-    """Simple backtesting engine"""
+    """Simple backtesting engine
+
+    engine='vectorized' applies the 0/1 position to close-to-close returns;
+    engine='event' simulates bar by bar with ATR sizing and intrabar stops
+    (see backtesting/event_engine.py). Both produce the same columns and
+    metrics.
+
+    lean=True skips the widened result frame: run_backtest returns a
+    LeanResult holding just the equity curve, positions and signals in
+    compact dtypes (metrics are still computed in float64), for sweeps
+    and large universes. Pass run_backtest a source (a callable that
+    reloads the bars) to be able to rebuild the full frame from it later.
+    """
+    
+    ENGINES = ('vectorized', 'event')
     
-    def __init__(self, initial_capital=10000, commission=0.001):
+    def __init__(self, initial_capital=10000, commission=0.001, verbose=True, engine='vectorized',
+                 lean=False):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {self.ENGINES})")
         self.initial_capital = initial_capital
         self.commission = commission
+        self.verbose = verbose
+        self.engine = engine
+        self.lean = lean
         
-    def run_backtest(self, df, strategy):
+    @telemetry.timed('backtest')
+    def run_backtest(self, df, strategy, source=None):
         """Run a basic backtest with commission"""
-        print("🔄 Running backtest...")
+        if self.verbose:
+            print(f"🔄 Running backtest ({self.engine}{', lean' if self.lean else ''})...")
+        
+        if self.lean:
+            return self.run_lean(df, strategy, source=source)
         
         # Generate signals from strategy
         df = strategy.generate_signals(df)
-        
-        # Calculate strategy returns without commission
-        df['strategy_returns_raw'] = df['position'] * df['returns']
-        
-        # Calculate commission adjustment
-        df['position_change'] = df['position'].diff().fillna(0)
-        df['commission_adj'] = 0.0
-        # When we enter (position changes from 0 to 1) we pay commission
-        df.loc[df['position_change'] == 1, 'commission_adj'] = -self.commission
-        # When we exit (position changes from 1 to 0) we pay commission
-        df.loc[df['position_change'] == -1, 'commission_adj'] = -self.commission
-        
-        # Adjust returns by commission
-        df['strategy_returns'] = df['strategy_returns_raw'] + df['commission_adj']
-        
-        # Cumulative returns
-        df['cumulative_strategy'] = (1 + df['strategy_returns']).cumprod()
-        df['cumulative_market'] = (1 + df['returns']).cumprod()
-        
-        # Portfolio value
-        df['portfolio_value'] = self.initial_capital * df['cumulative_strategy']
-        
-        # Calculate metrics
-        metrics = self.calculate_metrics(df)
-        
-        return df, metrics
+        return self.backtest_signals(df)
     
-    def calculate_metrics(self, df):
-        """Calculate performance metrics"""
-        # Total returns
-        total_return_strategy = df['cumulative_strategy'].iloc[-1] - 1
-        total_return_market = df['cumulative_market'].iloc[-1] - 1
-        
-        # Sharpe ratio
-        returns = df['strategy_returns'].dropna()
-        if len(returns) > 0 and returns.std() > 0:
-            sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
+    def backtest_signals(self, df):
+        """Backtest a frame that already carries the strategy's signal columns"""
+        self.fill_results(df)
+        return df, self.calculate_metrics(df)
+    
+    def fill_results(self, df):
+        """Add the result columns of the configured engine to a signal frame"""
+        if self.engine == 'event':
+            return self.apply_event_engine(df)
+        columns = vectorized_columns(df['position'].to_numpy(dtype=float), df['returns'].to_numpy(dtype=float),
+                                     self.commission, self.initial_capital)
+        for name, values in columns.items():
+            df[name] = values
+        return df
+    
+    def apply_event_engine(self, df):
+        """Fill the result columns from a bar-by-bar simulation"""
+        sim = run_event_engine(df, self.initial_capital, self.commission)
+        for name, values in event_columns(sim, df['returns'].to_numpy(dtype=float),
+                                          self.initial_capital).items():
+            df[name] = values
+        return df
+    
+    def run_lean(self, df, strategy, signals=None, source=None):
+        """Backtest without building the result frame; returns (LeanResult, BacktestMetrics)
+        
+        signals: the strategy's signal arrays if already computed (e.g. by
+        a StrategyEngine sharing indicators across strategies).
+        source: optional zero-argument callable returning df again (e.g. a
+        DataFetcher's load, which reads the on-disk cache). It is all the
+        result keeps for rebuilding the full frame, so a kept result never
+        pins df; without one only the stored columns are available.
+        """
+        if signals is None:
+            signals = strategy.signal_arrays(df)
+        close = df['close'].to_numpy(dtype=float)
+        returns = df['returns'].to_numpy(dtype=float)
+        if self.engine == 'event':
+            bars = {'open': df['open'], 'high': df['high'], 'low': df['low'], 'close': close}
+            sim = run_event_engine({**bars, **signals}, self.initial_capital, self.commission)
+            columns = event_columns(sim, returns, self.initial_capital)
         else:
-            sharpe_ratio = 0
-        
-        # Max drawdown
-        cumulative = df['cumulative_strategy']
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min()
-        
-        # Win rate (of round trips)
-        # We define a trade as a period when we are in the market (from entry to exit)
-        # But for simplicity, let's use the position change to identify trades
-        # We'll count the number of entries that resulted in a profit
-        # Note: This is a simplified win rate calculation
-        entries = df[df['position_change'] == 1]
-        exits = df[df['position_change'] == -1]
-        
-        win_rate = 0
-        if len(entries) > 0 and len(exits) > 0:
-            # We'll match each entry with the next exit (assuming we are always in the market)
-            # This is a simplified approach and might not be accurate if there are multiple entries without exits
-            # We assume the strategy is always in the market after an entry until an exit
-            profits = []
-            for i in range(min(len(entries), len(exits))):
-                entry_price = entries.iloc[i]['close']
-                exit_price = exits.iloc[i]['close']
-                profit = (exit_price - entry_price) / entry_price
-                profits.append(profit)
-            
-            if profits:
-                win_rate = sum(1 for p in profits if p > 0) / len(profits)
-        
-        # Total commission paid
-        total_commission_pct = abs(df['commission_adj'].sum())
-        total_commission_dollars = self.initial_capital * total_commission_pct
-        
-        # Number of round trips (entry and exit pairs)
-        num_round_trips = min((df['position_change'] == 1).sum(), (df['position_change'] == -1).sum())
-        
-        metrics = {
-            'Total Return (Strategy)': f"{total_return_strategy * 100:.2f}%",
-            'Total Return (Market)': f"{total_return_market * 100:.2f}%",
-            'Sharpe Ratio': f"{sharpe_ratio:.2f}",
-            'Max Drawdown': f"{max_drawdown * 100:.2f}%",
-            'Win Rate': f"{win_rate * 100:.2f}%",
-            'Number of Trades': f"{num_round_trips}",
-            'Final Portfolio Value': f"${df['portfolio_value'].iloc[-1]:,.2f}",
-            'Total Commission Paid': f"${total_commission_dollars:.2f}"
-        }
-        
-        return metrics
+            columns = vectorized_columns(signals['position'], returns,
+                                         self.commission, self.initial_capital)
+            columns['position'] = signals['position']
+        columns['close'] = close
+        metrics = compute_metrics(columns, self.initial_capital)
+        
+        # Everything else is recomputed from the source only if a diagnostic column is asked for
+        materialize = None
+        if source is not None:
+            materialize = functools.partial(self._full_frame, source, self._detached(strategy))
+        result = LeanResult(df.index, columns['portfolio_value'], columns['position'], signals['signal'],
+                            self.initial_capital, materialize=materialize)
+        return result, metrics
+    
+    def _full_frame(self, source, strategy):
+        return self.fill_results(strategy.generate_signals(source()))
+    
+    @staticmethod
+    def _detached(strategy):
+        """Copy of the strategy that doesn't keep a shared indicator cache alive"""
+        strategy = copy.copy(strategy)
+        strategy.cache = None
+        return strategy
+    
+    @telemetry.timed('metrics')
+    def calculate_metrics(self, df):
+        """Calculate performance metrics (numeric; see BacktestMetrics.formatted())"""
+        return compute_metrics(df, self.initial_capital)
     
     def plot_results(self, df, symbol=None):
         """Plot backtest results"""
         if symbol is None:
             symbol = SYMBOL
         print("📊 Generating charts...")
+        # Imported here: matplotlib costs ~0.5s and most runs never plot
+        import matplotlib.pyplot as plt
         
         fig, axes = plt.subplots(2, 1, figsize=(12, 8))
         
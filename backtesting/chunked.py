@@ -0,0 +1,325 @@
+# backtesting/chunked.py - Out-of-core backtest over bars read chunk by chunk
+import os
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.settings import BACKTEST_CHUNK_BARS
+from backtesting.event_engine import simulate_bars
+from backtesting.metrics import TRADE_DTYPE, BacktestMetrics
+from strategies.main_strategy import latch_positions
+
+# Per-bar result columns written by ChunkedBacktester.run(..., output_dir=...)
+RESULT_COLUMNS = ['signal', 'position', 'strategy_returns', 'cumulative_strategy',
+                  'cumulative_market', 'portfolio_value']
+
+
+def ewm_continue(values, span, last=None):
+    """ewm(span, adjust=False).mean() of values, resuming from the previous chunk's last average
+
+    With adjust=False the recursion's only state is the last average, so
+    prepending it reproduces a single pass over the whole history exactly.
+    """
+    if last is None:
+        return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+    return pd.Series(np.r_[last, values]).ewm(span=span, adjust=False).mean().to_numpy()[1:]
+
+
+def cumprod_continue(values, carry):
+    """NaN-skipping cumprod (as pandas does) resuming from carry; returns (result, unmasked product)"""
+    missing = np.isnan(values)
+    product = np.cumprod(np.r_[carry, np.where(missing, 1.0, values)])[1:]
+    result = product.copy()
+    result[missing] = np.nan
+    return result, product
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+class ChunkedSignals:
+    """SimpleCombinedWithATR.generate_signals over consecutive chunks of one history
+
+    Carries the last close, the EMA and RSI averages, the trailing
+    atr_period - 1 true ranges and the latched position from chunk to
+    chunk. EMAs, RSI, signals and positions come out identical to the
+    pandas path on the whole frame; the ATR rolling mean restarts its
+    running sum at each chunk, so ATR (and the event engine's sizing and
+    stops derived from it) agree to floating-point rounding.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.prev_close = None
+        self.ma_fast = None
+        self.ma_slow = None
+        self.gain = None
+        self.loss = None
+        self.tr_tail = np.zeros(0)
+        self.latched = 0
+
+    def process(self, chunk):
+        """Indicator, signal and position arrays for the next chunk (dict of OHLC arrays)"""
+        s = self.strategy
+        close = np.asarray(chunk['close'], dtype=float)
+        high = np.asarray(chunk['high'], dtype=float)
+        low = np.asarray(chunk['low'], dtype=float)
+        prev_close = np.r_[np.nan if self.prev_close is None else self.prev_close, close[:-1]]
+
+        ma_fast = ewm_continue(close, s.ma_fast, self.ma_fast)
+        ma_slow = ewm_continue(close, s.ma_slow, self.ma_slow)
+
+        delta = close - prev_close
+        gain = ewm_continue(np.where(delta > 0, delta, 0.0), s.rsi_period, self.gain)
+        loss = ewm_continue(-np.where(delta < 0, delta, 0.0), s.rsi_period, self.loss)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        window = np.r_[self.tr_tail, true_range]
+        atr = pd.Series(window).rolling(s.atr_period).mean().to_numpy()[len(self.tr_tail):]
+
+        buy = (ma_fast > ma_slow) & (rsi > s.rsi_oversold) & (rsi < s.rsi_overbought)
+        sell = (ma_fast < ma_slow) | (rsi > s.rsi_overbought)
+        signal = np.zeros(len(close), dtype=np.int64)
+        signal[buy] = 1
+        signal[sell] = -1
+
+        sized = (signal == 1) & (atr > 0)
+        stop_distance = atr[sized] * s.atr_multiplier
+        position_size = np.zeros(len(close))
+        stop_loss = np.zeros(len(close))
+        position_size[sized] = np.minimum(s.risk_per_trade / (stop_distance / close[sized]), 1.0)
+        stop_loss[sized] = close[sized] - stop_distance
+
+        latch = latch_positions(signal, initial=self.latched)
+        position = np.r_[self.latched, latch[:-1]].astype(float)
+
+        self.prev_close = close[-1]
+        self.ma_fast, self.ma_slow = ma_fast[-1], ma_slow[-1]
+        self.gain, self.loss = gain[-1], loss[-1]
+        self.tr_tail = window[-(s.atr_period - 1):] if s.atr_period > 1 else np.zeros(0)
+        self.latched = int(latch[-1])
+
+        return {
+            'returns': close / prev_close - 1, 'signal': signal, 'latch': latch,
+            'position': position, 'position_size': position_size, 'stop_loss': stop_loss,
+        }
+
+
+class ChunkedBacktester:
+    """Backtester for histories too large to hold in memory
+
+    Reads bars from any iterable of column chunks (see
+    data.cache.OHLCVCache.chunks), runs ChunkedSignals and the chosen
+    engine on each chunk and folds it into running metrics, so memory is
+    bounded by chunk_bars (plus the trade ledger) rather than the length
+    of the history. The
+    metrics and trade ledger match Backtester.run_backtest on the same
+    bars (Sharpe and commission totals are summed chunk-wise, so they
+    agree to rounding). Per-bar RESULT_COLUMNS can be streamed to .npy
+    files in output_dir for plotting or inspection.
+    """
+
+    ENGINES = ('vectorized', 'event')
+
+    def __init__(self, initial_capital=10000, commission=0.001, engine='vectorized',
+                 chunk_bars=BACKTEST_CHUNK_BARS, periods_per_year=252, verbose=True):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {self.ENGINES})")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.engine = engine
+        self.chunk_bars = chunk_bars
+        self.periods_per_year = periods_per_year
+        self.verbose = verbose
+        self.stats = {}
+
+    def run_symbol(self, cache, symbol, strategy, start_date=None, end_date=None, output_dir=None):
+        """Backtest one symbol straight from an OHLCVCache"""
+        chunks = cache.chunks(symbol, self.chunk_bars, start_date, end_date)
+        if len(chunks) == 0:
+            raise ValueError(f"No cached bars for {symbol}")
+        return self.run(chunks, strategy, output_dir=output_dir)
+
+    def run(self, chunks, strategy, output_dir=None):
+        """Backtest an iterable of column chunks; returns BacktestMetrics (timings in .stats)"""
+        started = time.perf_counter()
+        signals = ChunkedSignals(strategy)
+        writers = self._open_outputs(output_dir, len(chunks)) if output_dir else None
+        initial = float(self.initial_capital)
+
+        # Engine carry-over
+        prev_position = None
+        cash, event_state, prev_equity = initial, {}, initial
+        strategy_carry, market_carry = 1.0, 1.0
+
+        # Metric accumulators
+        count, mean, m2 = 0, 0.0, 0.0
+        running_max, max_drawdown = np.nan, np.nan
+        commission_total = 0.0
+        last = {}
+        # Fill price and growth of the two bars before the chunk, for trades
+        # whose fill or pre-entry growth falls on the previous chunk
+        halo_price, halo_growth = np.array([np.nan, np.nan]), np.array([1.0, 1.0])
+        trades, open_trade = [], None
+        offset = n_chunks = 0
+
+        for chunk in chunks:
+            m = len(chunk['close'])
+            if m == 0:
+                continue
+            bars = signals.process(chunk)
+            close = np.asarray(chunk['close'], dtype=float)
+            high = np.asarray(chunk['high'], dtype=float)
+            low = np.asarray(chunk['low'], dtype=float)
+
+            if self.engine == 'event':
+                equity, held = [0.0] * m, [0] * m
+                fees, stopped, fills = [0.0] * m, [0] * m, [np.nan] * m
+                cash = simulate_bars(
+                    np.asarray(chunk['open'], dtype=float).tolist(), high.tolist(), low.tolist(),
+                    close.tolist(), bars['latch'].tolist(), bars['position_size'].tolist(),
+                    bars['stop_loss'].tolist(), cash, self.commission,
+                    equity, held, fees, stopped, fills, state=event_state,
+                )
+                equity, fees = np.array(equity), np.array(fees)
+                before = np.r_[prev_equity, equity[:-1]]
+                prev_equity = equity[-1]
+                position = np.array(held, dtype=float)
+                change = np.diff(np.r_[position[0] if prev_position is None else prev_position, position])
+                strategy_returns = equity / before - 1
+                cumulative = equity / initial
+                _, growth = cumprod_continue(1 + strategy_returns, strategy_carry)
+                portfolio_value = equity
+                commission_total += float(fees.sum())
+                prices = np.array(fills)
+                prices = np.where(np.isnan(prices), close, prices)
+            else:
+                position = bars['position']
+                change = np.diff(np.r_[position[0] if prev_position is None else prev_position, position])
+                commission_adj = np.zeros(m)
+                commission_adj[(change == 1) | (change == -1)] = -self.commission
+                strategy_returns = position * bars['returns'] + commission_adj
+                cumulative, growth = cumprod_continue(1 + strategy_returns, strategy_carry)
+                portfolio_value = initial * cumulative
+                commission_total += float(commission_adj.sum())
+                prices = close
+            prev_position = position[-1]
+            strategy_carry = growth[-1]
+            market, market_product = cumprod_continue(1 + bars['returns'], market_carry)
+            market_carry = market_product[-1]
+
+            # Sharpe: merge the chunk's mean/variance into the running totals
+            valid = strategy_returns[~np.isnan(strategy_returns)]
+            if len(valid):
+                chunk_mean = valid.mean()
+                chunk_m2 = float(((valid - chunk_mean) ** 2).sum())
+                total = count + len(valid)
+                delta = chunk_mean - mean
+                m2 += chunk_m2 + delta * delta * count * len(valid) / total
+                mean += delta * len(valid) / total
+                count = total
+
+            # Drawdown against the running peak carried across chunks
+            peaks = np.fmax.accumulate(np.r_[running_max, cumulative])[1:]
+            running_max = peaks[-1]
+            with np.errstate(invalid='ignore'):
+                drawdown = (cumulative - peaks) / peaks
+            if not np.all(np.isnan(drawdown)):
+                max_drawdown = np.fmin(max_drawdown, np.nanmin(drawdown))
+
+            ext_price, ext_growth = np.r_[halo_price, prices], np.r_[halo_growth, growth]
+            open_trade = self._collect_trades(change, offset, ext_price, ext_growth, trades, open_trade)
+            halo_price, halo_growth = ext_price[-2:], ext_growth[-2:]
+
+            if writers:
+                columns = {'signal': bars['signal'], 'position': position,
+                           'strategy_returns': strategy_returns, 'cumulative_strategy': cumulative,
+                           'cumulative_market': market, 'portfolio_value': portfolio_value}
+                for name, values in columns.items():
+                    writers[name][offset:offset + m] = values
+                writers['index'][offset:offset + m] = chunk['index']
+
+            last = {'cumulative': cumulative[-1], 'market': market[-1], 'value': portfolio_value[-1],
+                    'price': prices[-1], 'growth': growth[-1]}
+            offset += m
+            n_chunks += 1
+            if self.verbose:
+                print(f"   chunk {n_chunks}: {offset:,} bars, equity ${last['value']:,.2f}")
+
+        if offset == 0:
+            raise ValueError("No bars to backtest")
+        if open_trade is not None:
+            entry, entry_price, before = open_trade
+            trades.append((entry, offset - 1, entry_price, last['price'], offset - 1 - entry,
+                           last['growth'] / before - 1, False))
+        if writers:
+            for array in writers.values():
+                array.flush()
+
+        ledger = np.array(trades, dtype=TRADE_DTYPE)
+        closed = ledger[ledger['closed']]
+        sharpe = 0.0
+        if count > 1:
+            std = np.sqrt(m2 / (count - 1))
+            if std > 0:
+                sharpe = float(np.sqrt(self.periods_per_year) * mean / std)
+        if self.engine == 'vectorized':
+            commission_total = initial * abs(commission_total)
+
+        elapsed = time.perf_counter() - started
+        self.stats = {'bars': offset, 'chunks': n_chunks, 'seconds': elapsed,
+                      'bars_per_second': offset / elapsed if elapsed > 0 else float('inf'),
+                      'peak_rss_mb': peak_rss_mb()}
+        return BacktestMetrics(
+            total_return=float(last['cumulative'] - 1),
+            market_return=float(last['market'] - 1),
+            sharpe=sharpe,
+            max_drawdown=float(max_drawdown),
+            win_rate=float((closed['pnl'] > 0).mean()) if len(closed) else 0.0,
+            num_trades=int(len(closed)),
+            final_value=float(last['value']),
+            total_commission=float(commission_total),
+            trades=ledger,
+        )
+
+    def _collect_trades(self, change, offset, prices, growth, trades, open_trade):
+        """Append the round trips closed in this chunk; returns the trade still open
+
+        prices/growth are the chunk's arrays with the previous two bars in
+        front, so global bar g sits at g - offset + 2. Same conventions as
+        trade_ledger: fills on the bar before the change, and with the
+        event engine both commissions booked on the fill bars.
+        """
+        event = self.engine == 'event'
+        for i in np.flatnonzero(change):
+            bar = offset + int(i)
+            at = int(i) + 2
+            if change[i] > 0 and open_trade is None:
+                first = at - 1 if event else at
+                open_trade = (bar, prices[at - 1], growth[first - 1])
+            elif change[i] < 0 and open_trade is not None:
+                entry, entry_price, before = open_trade
+                last = at - 1 if event else at
+                trades.append((entry, bar, entry_price, prices[at - 1], bar - entry,
+                               growth[last] / before - 1, True))
+                open_trade = None
+        return open_trade
+
+    @staticmethod
+    def _open_outputs(output_dir, n_bars):
+        os.makedirs(output_dir, exist_ok=True)
+        writers = {'index': np.lib.format.open_memmap(
+            os.path.join(output_dir, 'index.npy'), mode='w+', dtype=np.int64, shape=(n_bars,))}
+        for name in RESULT_COLUMNS:
+            dtype = np.int64 if name == 'signal' else np.float64
+            writers[name] = np.lib.format.open_memmap(
+                os.path.join(output_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=(n_bars,))
+        return writers
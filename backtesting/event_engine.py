@@ -0,0 +1,111 @@
+# backtesting/event_engine.py - Bar-by-bar simulation with stops and sizing
+import numpy as np
+
+from strategies.main_strategy import latch_positions
+
+
+def simulate_bars(open_, high, low, close, latch, size, stop_level,
+                  cash, commission, equity, held, fees, stopped, fills, state=None):
+    """Walk the bars once, carrying cash/share state
+
+    Inputs are plain sequences indexed by bar; equity/held/fees/stopped/
+    fills (price of the bar's last fill, NaN if none) are preallocated
+    outputs filled in place. Trading rules:
+      - an entry is armed when the strategy's latched position turns on
+        and filled at that bar's close (or the first later bar with a
+        non-zero ATR size), buying position_size x equity of fractional
+        shares with the stop at that bar's stop_loss
+      - from the next bar on, a low at or below the stop exits at the
+        stop, or at the open if the bar gapped through it
+      - the latch turning off exits at the close
+      - after a stop-out the engine stays flat until the next entry
+    Commission is charged on traded notional. Returns the final cash.
+    Passing a state dict resumes from (and updates) the shares/stop/latch
+    left by a previous call, so a long history can be walked in pieces.
+    """
+    shares = 0.0
+    stop = 0.0
+    prev_latch = 0
+    armed = False
+    if state:
+        shares, stop = state['shares'], state['stop']
+        prev_latch, armed = state['prev_latch'], state['armed']
+    for i in range(len(close)):
+        fee = 0.0
+        if shares > 0.0:
+            held[i] = 1
+            if low[i] <= stop:
+                bar_open = open_[i]
+                fill = bar_open if bar_open < stop else stop
+                value = shares * fill
+                fee = value * commission
+                fills[i] = fill
+                cash += value - fee
+                shares = 0.0
+                stopped[i] = 1
+
+        price = close[i]
+        on = latch[i]
+        if on != prev_latch:
+            armed = on == 1
+            if shares > 0.0 and on == 0:
+                value = shares * price
+                exit_fee = value * commission
+                fills[i] = price
+                cash += value - exit_fee
+                fee += exit_fee
+                shares = 0.0
+        if armed and shares == 0.0 and size[i] > 0.0:
+            shares = cash * size[i] / (price * (1.0 + commission))
+            value = shares * price
+            entry_fee = value * commission
+            fills[i] = price
+            cash -= value + entry_fee
+            fee += entry_fee
+            stop = stop_level[i]
+            armed = False
+        prev_latch = on
+
+        fees[i] = fee
+        equity[i] = cash + shares * price
+    if state is not None:
+        state.update(shares=shares, stop=stop, prev_latch=prev_latch, armed=armed)
+    return cash
+
+
+def run_event_engine(df, initial_capital, commission):
+    """Simulate a signal frame from generate_signals; returns the per-bar arrays
+
+    Columns are pulled out as NumPy arrays once and handed to the loop as
+    lists (indexing a list is several times cheaper than indexing an
+    ndarray element by element), so no DataFrame access happens per bar.
+    df may also be a dict of OHLC and signal arrays.
+    """
+    close = np.asarray(df['close'], dtype=float)
+    n = len(close)
+    # A window cut from a longer history may open already in a position
+    initial = int(np.asarray(df['position'])[0]) if 'position' in df and n else 0
+    latch = latch_positions(np.asarray(df['signal']), initial=initial)
+
+    equity = [0.0] * n
+    held = [0] * n
+    fees = [0.0] * n
+    stopped = [0] * n
+    fills = [np.nan] * n
+    simulate_bars(
+        np.asarray(df['open'], dtype=float).tolist(),
+        np.asarray(df['high'], dtype=float).tolist(),
+        np.asarray(df['low'], dtype=float).tolist(),
+        close.tolist(),
+        latch.tolist(),
+        np.asarray(df['position_size'], dtype=float).tolist(),
+        np.asarray(df['stop_loss'], dtype=float).tolist(),
+        float(initial_capital), commission, equity, held, fees, stopped, fills,
+    )
+    return {
+        'equity': np.array(equity),
+        'held': np.array(held, dtype=np.int64),
+        'fees': np.array(fees),
+        'stopped': np.array(stopped, dtype=bool),
+        'fills': np.array(fills),
+    }
@@ -0,0 +1,68 @@
+# backtesting/lean.py - Compact backtest result with lazily materialized diagnostic columns
+import numpy as np
+import pandas as pd
+
+
+class LeanResult:
+    """What a sweep or universe run needs to keep from a backtest, and no more
+
+    Stores the equity curve as float32, the signal as int8 and the
+    position as bool: about 6 bytes a bar against roughly 170 for the
+    full result frame. Indexing works like the frame for the stored
+    columns (result['portfolio_value'] is a Series on the bar index);
+    any other column (indicators, strategy_returns, commission_adj, ...)
+    triggers one recomputation of the full frame from the bars reloaded
+    through the backtest's source, which is then cached until release().
+    The bars themselves are never kept.
+    """
+
+    STORED = ('portfolio_value', 'cumulative_strategy', 'position', 'signal')
+
+    def __init__(self, index, portfolio_value, position, signal, initial_capital, materialize=None):
+        self.index = index
+        self.portfolio_value = np.asarray(portfolio_value, dtype=np.float32)
+        self.position = np.asarray(position).astype(bool)
+        self.signal = np.asarray(signal).astype(np.int8)
+        self.initial_capital = initial_capital
+        self._materialize = materialize
+        self._frame = None
+
+    def __len__(self):
+        return len(self.portfolio_value)
+
+    def __contains__(self, name):
+        return name in self.STORED or self._materialize is not None
+
+    def __getitem__(self, name):
+        if name in self.STORED:
+            return pd.Series(self.values(name), index=self.index, name=name)
+        return self.frame()[name]
+
+    def values(self, name):
+        """Stored column as a compact NumPy array (no frame is built)"""
+        if name == 'cumulative_strategy':
+            return self.portfolio_value / np.float32(self.initial_capital)
+        if name not in self.STORED:
+            raise KeyError(f"{name} is not stored; use result[{name!r}] to compute it")
+        return getattr(self, name)
+
+    def frame(self):
+        """The full result frame, as the non-lean backtester returns it (computed once)"""
+        if self._frame is None:
+            if self._materialize is None:
+                raise ValueError("This result has no source data to rebuild the full frame from")
+            self._frame = self._materialize()
+        return self._frame
+
+    def release(self):
+        """Drop a materialized full frame, going back to the compact arrays only"""
+        self._frame = None
+
+    @property
+    def nbytes(self):
+        """Bytes held by the compact arrays (not counting the shared index or a cached frame)"""
+        return self.portfolio_value.nbytes + self.position.nbytes + self.signal.nbytes
+
+    def __repr__(self):
+        state = ', full frame cached' if self._frame is not None else ''
+        return f"LeanResult({len(self)} bars, {self.nbytes:,} bytes{state})"
@@ -0,0 +1,170 @@
+# backtesting/metrics.py - Numeric backtest metrics and the round-trip trade ledger
+import numpy as np
+import pandas as pd
+
+# One row per round trip. entry/exit_index are the bars where the position
+# changes (the fill happened at the previous bar's close, or intrabar for
+# event-engine stops); pnl is the compounded strategy return over the trade,
+# commissions included.
+TRADE_DTYPE = np.dtype([
+    ('entry_index', np.int64),
+    ('exit_index', np.int64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('holding_bars', np.int64),
+    ('pnl', np.float64),
+    ('closed', np.bool_),
+])
+
+
+def trade_ledger(df):
+    """Structured array of round trips, found by run-length detection on position_change
+
+    Each entry is paired with the first exit after it (searchsorted), so a
+    missing exit at the end of the data leaves one open trade instead of
+    shifting every pairing. A frame that starts already in a position
+    (e.g. a walk-forward window) opens its first trade at bar 0.
+    """
+    position = np.asarray(df['position'])
+    change = np.asarray(df['position_change'])
+    n = len(position)
+
+    entries = np.flatnonzero(change > 0)
+    if n and position[0] > 0 and change[0] <= 0:
+        entries = np.r_[0, entries]
+    exits = np.flatnonzero(change < 0)
+
+    ledger = np.zeros(len(entries), dtype=TRADE_DTYPE)
+    if len(entries) == 0:
+        return ledger
+
+    pair = np.searchsorted(exits, entries, side='right')
+    closed = pair < len(exits)
+    exit_index = np.full(len(entries), n - 1)
+    exit_index[closed] = exits[pair[closed]]
+
+    # Fills happen on the bar before the position change shows up
+    entry_fill = np.maximum(entries - 1, 0)
+    exit_fill = np.where(closed, np.maximum(exit_index - 1, 0), n - 1)
+    if 'fill_price' in df:
+        prices = np.asarray(df['fill_price'], dtype=float)
+        prices = np.where(np.isnan(prices), np.asarray(df['close'], dtype=float), prices)
+        # The event engine books both commissions on the fill bars
+        first_bar = np.where(entries > 0, entry_fill, 0)
+        last_bar = exit_fill
+    else:
+        prices = np.asarray(df['close'], dtype=float)
+        first_bar = entries
+        last_bar = exit_index
+
+    # Compounded return over each trade: cumulative growth at its last bar
+    # (which carries the exit commission) over growth before its first bar
+    growth = np.cumprod(1 + np.nan_to_num(np.asarray(df['strategy_returns'], dtype=float)))
+    before = np.ones(len(entries))
+    later = first_bar > 0
+    before[later] = growth[first_bar[later] - 1]
+
+    ledger['entry_index'] = entries
+    ledger['exit_index'] = exit_index
+    ledger['entry_price'] = prices[entry_fill]
+    ledger['exit_price'] = prices[exit_fill]
+    ledger['holding_bars'] = exit_index - entries
+    ledger['pnl'] = growth[last_bar] / before - 1
+    ledger['closed'] = closed
+    return ledger
+
+
+class BacktestMetrics:
+    """Numeric backtest results; formatting only happens for display"""
+
+    # (attribute, display label, formatter)
+    FIELDS = [
+        ('total_return', 'Total Return (Strategy)', lambda v: f"{v * 100:.2f}%"),
+        ('market_return', 'Total Return (Market)', lambda v: f"{v * 100:.2f}%"),
+        ('sharpe', 'Sharpe Ratio', lambda v: f"{v:.2f}"),
+        ('max_drawdown', 'Max Drawdown', lambda v: f"{v * 100:.2f}%"),
+        ('win_rate', 'Win Rate', lambda v: f"{v * 100:.2f}%"),
+        ('num_trades', 'Number of Trades', lambda v: f"{v}"),
+        ('final_value', 'Final Portfolio Value', lambda v: f"${v:,.2f}"),
+        ('total_commission', 'Total Commission Paid', lambda v: f"${v:.2f}"),
+    ]
+
+    def __init__(self, total_return, market_return, sharpe, max_drawdown, win_rate,
+                 num_trades, final_value, total_commission, trades=None):
+        self.total_return = total_return
+        self.market_return = market_return
+        self.sharpe = sharpe
+        self.max_drawdown = max_drawdown
+        self.win_rate = win_rate
+        self.num_trades = num_trades
+        self.final_value = final_value
+        self.total_commission = total_commission
+        self.trades = trades if trades is not None else np.zeros(0, dtype=TRADE_DTYPE)
+
+    def as_dict(self):
+        """Plain numeric dict (JSON-serialisable)"""
+        return {name: getattr(self, name) for name, _, _ in self.FIELDS}
+
+    def formatted(self):
+        """Display label -> formatted string, as printed in the results table"""
+        return {label: fmt(getattr(self, name)) for name, label, fmt in self.FIELDS}
+
+    def items(self):
+        return self.formatted().items()
+
+    def trade_frame(self):
+        return pd.DataFrame(self.trades)
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name, _, _ in self.FIELDS)
+        return f"BacktestMetrics({values})"
+
+
+def compute_metrics(df, initial_capital, periods_per_year=252, trades=None):
+    """BacktestMetrics for a backtest result frame, using NumPy reductions only
+
+    df may also be a plain dict of result arrays (the lean backtest path).
+    trades: a ready trade ledger (e.g. a portfolio's per-symbol round
+    trips) instead of the one found from df's position columns.
+    """
+    cumulative = np.asarray(df['cumulative_strategy'], dtype=float)
+    market = np.asarray(df['cumulative_market'], dtype=float)
+
+    returns = np.asarray(df['strategy_returns'], dtype=float)
+    returns = returns[~np.isnan(returns)]
+    sharpe = 0.0
+    if len(returns) > 1:
+        std = returns.std(ddof=1)
+        if std > 0:
+            sharpe = float(np.sqrt(periods_per_year) * returns.mean() / std)
+
+    # fmax/nanmin skip the NaN first bar the way pandas cummax/min do
+    running_max = np.fmax.accumulate(cumulative)
+    max_drawdown = float(np.nanmin((cumulative - running_max) / running_max))
+
+    if trades is None:
+        trades = trade_ledger(df)
+    closed = trades[trades['closed']]
+    win_rate = float((closed['pnl'] > 0).mean()) if len(closed) else 0.0
+
+    if 'commission_paid' in df:
+        total_commission = float(np.nansum(np.asarray(df['commission_paid'], dtype=float)))
+    else:
+        total_commission = float(initial_capital * abs(np.nansum(np.asarray(df['commission_adj'], dtype=float))))
+
+    return BacktestMetrics(
+        total_return=float(cumulative[-1] - 1),
+        market_return=float(market[-1] - 1),
+        sharpe=sharpe,
+        max_drawdown=max_drawdown,
+        win_rate=win_rate,
+        num_trades=int(len(closed)),
+        final_value=float(np.asarray(df['portfolio_value'])[-1]),
+        total_commission=total_commission,
+        trades=trades,
+    )
+
+
+def metrics_table(results):
+    """DataFrame of many BacktestMetrics (e.g. a sweep), one row each"""
+    return pd.DataFrame([m.as_dict() for m in results])
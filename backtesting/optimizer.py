@@ -0,0 +1,245 @@
+# backtesting/optimizer.py - Parallel parameter sweeps
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtesting.backtester import Backtester
+from config.settings import INITIAL_CAPITAL, COMMISSION, BACKTEST_ENGINE
+from strategies.indicators import IndicatorCache
+from strategies.main_strategy import SimpleCombinedWithATR
+
+# Keyword arguments of SimpleCombinedWithATR that a sweep may vary
+PARAMETER_NAMES = [
+    'fast_ma', 'slow_ma', 'rsi_period', 'rsi_oversold', 'rsi_overbought',
+    'atr_period', 'atr_multiplier',
+]
+
+# Parameters that only change position sizing and stops, which the
+# vectorized engine ignores (it holds a full 0/1 position)
+SIZING_PARAMETERS = ('atr_period', 'atr_multiplier')
+
+DEFAULT_SPACE = {
+    'fast_ma': [5, 10, 15, 20, 25, 30],
+    'slow_ma': [30, 40, 50, 60, 70, 80, 90, 100],
+    'rsi_oversold': [30, 35, 40, 45],
+    'rsi_overbought': [70, 75, 80, 85],
+    'atr_period': [10, 14, 20],
+    'atr_multiplier': [1.0, 1.5, 2.0, 2.5],
+}
+
+
+def is_valid(params):
+    """Reject combinations that cannot make sense (fast MA slower than slow MA, etc.)"""
+    if 'fast_ma' in params and 'slow_ma' in params and params['fast_ma'] >= params['slow_ma']:
+        return False
+    if ('rsi_oversold' in params and 'rsi_overbought' in params
+            and params['rsi_oversold'] >= params['rsi_overbought']):
+        return False
+    return True
+
+
+def engine_for(combos, engine=BACKTEST_ENGINE):
+    """Backtest engine for a sweep: 'event' if the combinations differ in sizing/stop parameters"""
+    varied = any(len({ResultStore.key(combo.get(name)) for combo in combos}) > 1 for name in SIZING_PARAMETERS)
+    return 'event' if varied else engine
+
+
+def grid_search_space(space):
+    """Every valid combination of the candidate values in `space`"""
+    names = list(space)
+    combos = (dict(zip(names, values)) for values in itertools.product(*space.values()))
+    return [combo for combo in combos if is_valid(combo)]
+
+
+def random_search_space(space, n_samples, seed=None):
+    """Up to n_samples distinct valid combinations drawn uniformly from `space`"""
+    rng = random.Random(seed)
+    names = list(space)
+    total = int(np.prod([len(values) for values in space.values()]))
+    seen, combos = set(), []
+    attempts = 0
+    while len(combos) < n_samples and attempts < 20 * n_samples and len(seen) < total:
+        attempts += 1
+        combo = {name: rng.choice(space[name]) for name in names}
+        key = ResultStore.key(combo)
+        if key in seen:
+            continue
+        seen.add(key)
+        if is_valid(combo):
+            combos.append(combo)
+    return combos
+
+
+class SharedPriceArrays:
+    """Price history copied once into shared memory and attached zero-copy by workers
+
+    Layout of the block: n int64 timestamps followed by an n x k float64
+    matrix of the price columns.
+    """
+
+    COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'returns']
+
+    def __init__(self, df):
+        columns = [col for col in self.COLUMNS if col in df.columns]
+        n = len(df)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, n * 8 * (len(columns) + 1)))
+        stamps, values = self._views(self.shm, n, len(columns))
+
+        index = df.index
+        tz = str(index.tz) if getattr(index, 'tz', None) is not None else None
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        stamps[:] = index.values.astype('datetime64[ns]').view(np.int64)
+        values[:] = df[columns].to_numpy(dtype=np.float64)
+
+        self.spec = (self.shm.name, n, columns, tz)
+
+    @staticmethod
+    def _views(shm, n, k):
+        stamps = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        values = np.ndarray((n, k), dtype=np.float64, buffer=shm.buf, offset=n * 8)
+        return stamps, values
+
+    @classmethod
+    def attach(cls, spec):
+        """Map the block in a worker and wrap it in a DataFrame without copying"""
+        name, n, columns, tz = spec
+        shm = shared_memory.SharedMemory(name=name)
+        stamps, values = cls._views(shm, n, len(columns))
+        index = pd.DatetimeIndex(stamps.view('datetime64[ns]'))
+        index = index.tz_localize('UTC').tz_convert(tz) if tz else index
+        df = pd.DataFrame(values, index=index, columns=columns, copy=False)
+        return shm, df
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ResultStore:
+    """Append-only JSON-lines file of sweep results, keyed by parameter set
+
+    Each finished combination is flushed as one line, so an interrupted
+    sweep loses at most the combinations still in flight and a rerun with
+    the same file picks up where it stopped. Combinations that failed are
+    retried on the next run; the latest line for a parameter set wins.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def key(params):
+        return json.dumps(params, sort_keys=True)
+
+    def load(self):
+        results = {}
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Line cut short by an interruption
+                # A retried combination replaces its earlier (failed) line
+                results.pop(self.key(result['params']), None)
+                results[self.key(result['params'])] = result
+        return list(results.values())
+
+    def completed(self):
+        """Keys of the parameter sets that finished without an error"""
+        return {self.key(result['params']) for result in self.load() if 'error' not in result}
+
+    def open(self):
+        """Open for appending, terminating a partially written last line first"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, 'a+')
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != '\n':
+                f.write('\n')
+        return f
+
+    def best(self, n=10, metric='sharpe'):
+        results = [r for r in self.load() if r.get(metric) is not None]
+        return sorted(results, key=lambda r: r[metric], reverse=True)[:n]
+
+
+# Per-process state populated by _init_worker
+_worker = {}
+
+
+def _init_worker(spec, initial_capital, commission, engine):
+    shm, df = SharedPriceArrays.attach(spec)
+    _worker['shm'] = shm  # Keep the mapping alive for the life of the worker
+    _worker['df'] = df
+    # Memoized per worker: combinations sharing a span reuse the same series
+    _worker['cache'] = IndicatorCache()
+    # Only the metrics are kept, so skip building the full result frame
+    _worker['backtester'] = Backtester(initial_capital=initial_capital, commission=commission,
+                                       verbose=False, engine=engine, lean=True)
+
+
+def _evaluate(params):
+    try:
+        strategy = SimpleCombinedWithATR(verbose=False, cache=_worker['cache'], **params)
+        _, metrics = _worker['backtester'].run_backtest(_worker['df'], strategy)
+        result = metrics.as_dict()
+        result['params'] = params
+        return result
+    except Exception as e:
+        return {'params': params, 'error': str(e)}
+
+
+class ParameterSweep:
+    """Run Backtester.run_backtest over many parameter sets on a process pool
+
+    engine=None uses BACKTEST_ENGINE, or the event engine when the
+    combinations vary ATR sizing/stop parameters (see engine_for).
+    """
+
+    def __init__(self, df, results_path, initial_capital=INITIAL_CAPITAL, commission=COMMISSION,
+                 max_workers=None, engine=None):
+        self.df = df
+        self.engine = engine
+        self.store = ResultStore(results_path)
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_workers = max_workers or os.cpu_count()
+
+    def run(self, combos):
+        """Evaluate every combination not already in the store, then return all results"""
+        done = self.store.completed()
+        pending = [combo for combo in combos if ResultStore.key(combo) not in done]
+        engine = self.engine or engine_for(combos)
+        print(f"🔎 Sweep: {len(combos)} combinations, {len(combos) - len(pending)} already done, "
+              f"{len(pending)} to run on {self.max_workers} workers ({engine} engine)")
+        if not pending:
+            return self.store.load()
+
+        # Small chunks keep progress flowing to disk; large ones cut IPC overhead
+        chunksize = max(1, min(64, len(pending) // (self.max_workers * 8)))
+        shared = SharedPriceArrays(self.df)
+        try:
+            with mp.Pool(self.max_workers, initializer=_init_worker,
+                         initargs=(shared.spec, self.initial_capital, self.commission, engine)) as pool, \
+                    self.store.open() as out:
+                step = max(1, len(pending) // 10)
+                for i, result in enumerate(pool.imap_unordered(_evaluate, pending, chunksize), 1):
+                    out.write(json.dumps(result) + '\n')
+                    out.flush()
+                    if i % step == 0 or i == len(pending):
+                        print(f"   {i}/{len(pending)} done")
+        finally:
+            shared.close()
+
+        return self.store.load()
@@ -0,0 +1,330 @@
+# backtesting/portfolio.py - Vectorized multi-asset backtest over a time x symbol matrix
+import numpy as np
+import pandas as pd
+
+from config.settings import PORTFOLIO_MAX_GROSS, PORTFOLIO_REBALANCE_BARS
+from backtesting.metrics import TRADE_DTYPE, compute_metrics
+from strategies.engine import StrategyEngine
+from utils.telemetry import telemetry
+
+# Round trips of a portfolio run: the single-asset ledger plus the symbol column
+PORTFOLIO_TRADE_DTYPE = np.dtype([('symbol', np.int64)] + TRADE_DTYPE.descr)
+
+
+def _bars(n):
+    return np.arange(n)[:, None]
+
+
+def forward_fill(values):
+    """Each column's last non-NaN value carried down (NaN before its first)"""
+    last = np.where(np.isnan(values), -1, _bars(len(values)))
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    filled[last < 0] = np.nan
+    return filled
+
+
+def hold_unlisted(weights, listed):
+    """Targets that can be traded: zero before a symbol lists, never raised while it has no close
+
+    On a bar without a close (halt, gap) a symbol's weight is the lowest
+    target since its last listed bar, so an existing holding carries
+    through the gap and may only be reduced, never bought.
+    """
+    T = len(weights)
+    last = np.where(listed, _bars(T), -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    weights[last < 0] = 0.0
+    gaps = (~listed & (last >= 0)).any(axis=0)
+    if gaps.any():
+        # Running minimum over each (symbol, last listed bar) run, symbol-major
+        held = weights[:, gaps]
+        keys = (last[:, gaps] + 1 + np.arange(held.shape[1]) * (T + 1)).T.ravel()
+        held = pd.Series(held.T.ravel()).groupby(keys, sort=False).cummin().to_numpy()
+        weights[:, gaps] = held.reshape(-1, T).T
+    return weights
+
+
+def close_delisted(weights, listed):
+    """Targets zeroed after each symbol's last close, so a delisted holding is sold at that close"""
+    T = len(weights)
+    last = T - 1 - np.argmax(listed[::-1], axis=0)
+    weights[_bars(T) > last] = 0.0
+    return weights
+
+
+def hold_from_entry(latched, values):
+    """values at the bar each run of a 0/1 latched position began, held for the run (0 when flat)"""
+    held = latched.astype(bool)
+    entries = held.copy()
+    entries[1:] &= ~held[:-1]
+    start = np.where(entries, _bars(len(held)), -1)
+    np.maximum.accumulate(start, axis=0, out=start)
+    out = np.take_along_axis(values, np.maximum(start, 0), axis=0)
+    out[~held] = 0.0
+    return out
+
+
+def signal_weights(signals):
+    """Target weights from a strategy's (time x symbol) signal arrays
+
+    A symbol is held from a buy until the next sell, at the position_size
+    of the bar it was bought on (RISK_PER_TRADE over the ATR_MULTIPLIER x
+    ATR stop distance, see atr_sized_signals). Weights are decided on a
+    bar's close and traded at that close.
+    """
+    signal, position = signals['signal'], signals['position']
+    # position is the latched signal a bar late; only the last bar needs latching
+    latched = np.empty(position.shape)
+    latched[:-1] = position[1:]
+    latched[-1] = np.where(signal[-1] != 0, signal[-1] == 1, position[-1])
+    return hold_from_entry(latched, np.asarray(signals['position_size'], dtype=float))
+
+
+def portfolio_trades(weights, prices, commission):
+    """Per-symbol round trips (PORTFOLIO_TRADE_DTYPE) of a target weight matrix
+
+    A trade runs from the bar a symbol's weight turns positive to the bar
+    it returns to zero; pnl is the price move over it less commission on
+    both fills (trims and top-ups from rebalancing are not attributed).
+    """
+    T = len(weights)
+    held = weights > 0
+    change = np.zeros(held.shape, dtype=np.int8)
+    change[0] = held[0]
+    change[1:] = held[1:].astype(np.int8) - held[:-1]
+    # Symbol-major positions (symbol * T + bar) keep each symbol's trades together
+    entries = np.flatnonzero(change.T == 1)
+    exits = np.flatnonzero(change.T == -1)
+
+    ledger = np.zeros(len(entries), dtype=PORTFOLIO_TRADE_DTYPE)
+    if len(entries) == 0:
+        return ledger
+    pair = np.searchsorted(exits, entries, side='right')
+    closed = pair < len(exits)
+    closed[closed] = exits[pair[closed]] // T == entries[closed] // T
+
+    symbol, entry_index = np.divmod(entries, T)
+    exit_index = np.full(len(entries), T - 1)
+    exit_index[closed] = exits[pair[closed]] % T
+    entry_price = prices[entry_index, symbol]
+    exit_price = prices[exit_index, symbol]
+
+    ledger['symbol'] = symbol
+    ledger['entry_index'] = entry_index
+    ledger['exit_index'] = exit_index
+    ledger['entry_price'] = entry_price
+    ledger['exit_price'] = exit_price
+    ledger['holding_bars'] = exit_index - entry_index
+    ledger['pnl'] = exit_price * (1 - commission) / (entry_price * (1 + commission)) - 1
+    ledger['closed'] = closed
+    return ledger
+
+
+def equal_weight_market(prices, listed):
+    """Cumulative return of holding every listed symbol in equal weight, rebalanced each bar"""
+    both = listed[1:] & listed[:-1]
+    returns = np.zeros((len(prices) - 1, prices.shape[1]))
+    np.divide(prices[1:], prices[:-1], out=returns, where=both)
+    returns[both] -= 1.0
+    growth = np.ones(len(prices))
+    growth[1:] += returns.sum(axis=1) / np.maximum(both.sum(axis=1), 1)
+    return np.cumprod(growth)
+
+
+def simulate(close, weights, initial_capital, commission, max_gross=1.0, rebalance_every=0):
+    """Equity and trading arrays of a target weight matrix
+
+    close, weights: (time x symbol). Only symbols whose target changes
+    on a bar are traded, at that bar's close: sells (exits, trims) go
+    first, then entries and top-ups are bought with the cash they free
+    plus what was idle, scaled down together if that falls short of
+    their targets (or would take the book past max_gross of equity).
+    Holdings whose target is unchanged keep their share counts and drift
+    with prices. Every rebalance_every bars (if set) the whole book is
+    traded back to its targets instead, scaled pro rata to max_gross.
+    Commission is paid on the traded notional. Targets are long-only.
+    Symbols without a close on a bar can't be bought or added to there
+    (see hold_unlisted); a holding carries through a gap at its last
+    price, and is sold at its last close once the symbol never trades
+    again (delisted, see close_delisted). The returned weights are the
+    book as held after each bar's trades.
+    """
+    close = np.asarray(close, dtype=float)
+    weights = np.nan_to_num(np.asarray(weights, dtype=float))
+    if close.shape != weights.shape:
+        raise ValueError(f"Price matrix {close.shape} and weight matrix {weights.shape} differ in shape")
+    if (weights < 0).any():
+        raise ValueError("Portfolio weights must be long-only (>= 0)")
+
+    T, S = close.shape
+    listed = ~np.isnan(close)
+    prices = forward_fill(close)
+    # Unlisted bars only ever meet zero holdings; 1.0 keeps them out of the sums
+    marks = np.nan_to_num(prices, nan=1.0)
+    weights = close_delisted(hold_unlisted(weights, listed), listed)
+
+    changed = np.zeros(T, dtype=bool)
+    changed[0] = weights[0].any()
+    changed[1:] = (weights[1:] != weights[:-1]).any(axis=1)
+    drift = np.zeros(T, dtype=bool)
+    if rebalance_every and changed.any():
+        drift[np.argmax(changed)::rebalance_every] = True
+    rebalance = changed | drift
+    bars = np.flatnonzero(rebalance)
+
+    equity = np.full(T, float(initial_capital))
+    held = np.zeros((T, S))
+    turnover = np.zeros(T)
+    fees = np.zeros(T)
+    if len(bars):
+        # Book after each trading bar: share counts and cash
+        units = np.empty((len(bars), S))
+        cash = np.empty(len(bars))
+        shares = np.zeros(S)
+        money = float(initial_capital)
+        previous = np.zeros(S)
+        for k, t in enumerate(bars):
+            price, target = marks[t], weights[t]
+            position = shares * price
+            value = money + position.sum()
+            if drift[t]:
+                gross = target.sum()
+                goal = target * min(1.0, max_gross / gross) if gross > 0 else target
+                notional = np.abs(goal * value - position).sum()
+                after = value - commission * notional
+                shares = goal * after / price
+                money = after * (1.0 - goal.sum())
+            else:
+                delta = np.where(target != previous, target * value - position, 0.0)
+                sells = np.minimum(delta, 0.0)
+                sold = -sells.sum()
+                position += sells
+                money += sold * (1.0 - commission)
+                buys = np.maximum(delta, 0.0)
+                wanted = buys.sum()
+                if wanted > 0:
+                    room = max_gross * (money + position.sum()) - position.sum()
+                    buys *= min(1.0, max(room, 0.0) / (wanted * (1.0 + commission)))
+                bought = buys.sum()
+                money -= bought * (1.0 + commission)
+                shares = (position + buys) / price
+                notional = sold + bought
+            turnover[t] = notional / value if value > 0 else 0.0
+            fees[t] = commission * notional
+            units[k], cash[k] = shares, money
+            previous = target
+
+        # Mark every later bar to market against the book of its last trading bar
+        segment = np.searchsorted(bars, np.arange(T), side='right') - 1
+        live = segment >= 0
+        book = segment[live]
+        held[live] = units[book] * marks[live]
+        equity[live] = cash[book] + held[live].sum(axis=1)
+        held[live] /= equity[live][:, None]
+
+    return {
+        'weights': held, 'prices': prices, 'listed': listed,
+        'rebalance': rebalance, 'equity': equity, 'turnover': turnover, 'fees': fees,
+    }
+
+
+class PortfolioResult:
+    """Equity curve, held weights and per-bar turnover/fees of a portfolio run"""
+
+    def __init__(self, index, symbols, equity, weights, turnover, fees, rebalance, initial_capital):
+        self.index = index
+        self.symbols = list(symbols)
+        self.equity = equity
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.turnover = turnover
+        self.fees = fees
+        self.rebalance = rebalance
+        self.initial_capital = initial_capital
+
+    def __len__(self):
+        return len(self.equity)
+
+    def frame(self):
+        """Per-bar DataFrame: portfolio_value, returns, gross exposure, turnover, fees"""
+        return pd.DataFrame({
+            'portfolio_value': self.equity,
+            'strategy_returns': pd.Series(self.equity).pct_change().to_numpy(),
+            'cumulative_strategy': self.equity / self.initial_capital,
+            'gross_exposure': self.weights.sum(axis=1),
+            'positions': np.count_nonzero(self.weights, axis=1),
+            'turnover': self.turnover,
+            'commission_paid': self.fees,
+            'rebalance': self.rebalance,
+        }, index=self.index)
+
+    def holdings(self):
+        """Weights held after each bar's trades, time x symbol"""
+        return pd.DataFrame(self.weights, index=self.index, columns=self.symbols)
+
+    def __repr__(self):
+        return (f"PortfolioResult({len(self)} bars x {len(self.symbols)} symbols, "
+                f"{int(self.rebalance.sum())} rebalances)")
+
+
+class PortfolioBacktester:
+    """Backtest one strategy across a whole universe with shared capital
+
+    Where Backtester runs one symbol at a 0/1 position, this sizes every
+    symbol with the strategy's ATR position_size, caps the book at
+    max_gross of equity, and compounds one equity curve from the
+    (time x symbol) price and weight matrices, stepping only through the
+    bars where something trades (vectorized across symbols). Stops are
+    used for sizing only, as in the vectorized single-asset engine.
+    """
+
+    def __init__(self, initial_capital=10000, commission=0.001, max_gross=None, rebalance_every=None,
+                 verbose=True):
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_gross = PORTFOLIO_MAX_GROSS if max_gross is None else max_gross
+        self.rebalance_every = PORTFOLIO_REBALANCE_BARS if rebalance_every is None else rebalance_every
+        self.verbose = verbose
+
+    def target_weights(self, panel, strategy):
+        """(time x symbol) target weights of a strategy on a PricePanel"""
+        for _, signals in StrategyEngine([strategy]).signal_arrays(panel):
+            return signal_weights(signals)
+
+    @telemetry.timed('portfolio_backtest')
+    def run(self, panel, strategy=None, weights=None):
+        """Backtest a PricePanel on a strategy's signals or on a given weight matrix
+
+        Returns (PortfolioResult, BacktestMetrics); the metrics' trades are
+        per-symbol round trips (PORTFOLIO_TRADE_DTYPE).
+        """
+        if weights is None:
+            if strategy is None:
+                raise ValueError("Pass a strategy or a weight matrix")
+            weights = self.target_weights(panel, strategy)
+        if self.verbose:
+            print(f"🔄 Running portfolio backtest ({len(panel.index)} bars x {len(panel.symbols)} symbols)...")
+        return self.run_weights(panel.field('close'), weights, panel.index, panel.symbols)
+
+    def run_weights(self, close, weights, index=None, symbols=None):
+        """Backtest (time x symbol) close and target weight matrices"""
+        close = np.asarray(close, dtype=float)
+        sim = simulate(close, weights, self.initial_capital, self.commission,
+                       self.max_gross, self.rebalance_every)
+        index = pd.RangeIndex(len(close)) if index is None else index
+        symbols = range(close.shape[1]) if symbols is None else symbols
+        result = PortfolioResult(index, symbols, sim['equity'], sim['weights'], sim['turnover'],
+                                 sim['fees'], sim['rebalance'], self.initial_capital)
+
+        equity = sim['equity']
+        returns = np.full(len(equity), np.nan)
+        returns[1:] = equity[1:] / equity[:-1] - 1
+        columns = {
+            'cumulative_strategy': equity / self.initial_capital,
+            'cumulative_market': equal_weight_market(sim['prices'], sim['listed']),
+            'strategy_returns': returns,
+            'portfolio_value': equity,
+            'commission_paid': sim['fees'],
+        }
+        trades = portfolio_trades(sim['weights'], sim['prices'], self.commission)
+        return result, compute_metrics(columns, self.initial_capital, trades=trades)
@@ -0,0 +1,144 @@
+# backtesting/robustness.py - Monte Carlo / bootstrap analysis of backtest results
+import numpy as np
+import pandas as pd
+
+from backtesting.metrics import trade_ledger
+
+METHODS = ('block', 'shuffle', 'trade_bootstrap')
+
+# Path-sized (8 bytes per path-bar) arrays alive at once in monte_carlo:
+# the paths plus path_statistics' two intermediates (generating the paths
+# takes at most two, the index matrix and the paths)
+MC_LIVE_ARRAYS = 3
+
+
+def block_bootstrap_indices(n_bars, n_paths, block_size, rng):
+    """(n_paths x n_bars) indices built from randomly placed contiguous blocks
+
+    Moving-block bootstrap: keeping runs of consecutive bars together
+    preserves the short-range autocorrelation and volatility clustering
+    that an i.i.d. resample would destroy.
+    """
+    block_size = max(1, min(block_size, n_bars))
+    n_blocks = -(-n_bars // block_size)
+    starts = rng.integers(0, n_bars - block_size + 1, size=(n_paths, n_blocks))
+    indices = starts[:, :, None] + np.arange(block_size)
+    return indices.reshape(n_paths, -1)[:, :n_bars]
+
+
+def trade_returns(df):
+    """Compounded return of every round trip (open trade at the end included)"""
+    return trade_ledger(df)['pnl']
+
+
+def path_statistics(returns, periods_per_year=252):
+    """Total return, Sharpe and max drawdown of every row of a (paths x bars) matrix
+
+    Works in place: besides returns, at most two arrays of its size are
+    alive at any point (MC_LIVE_ARRAYS counts them for chunk sizing).
+    """
+    equity = np.add(returns, 1.0)
+    np.cumprod(equity, axis=1, out=equity)
+    total_return = equity[:, -1] - 1
+
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(returns))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, np.sqrt(periods_per_year) * returns.mean(axis=1) / std, 0.0)
+
+    running_max = np.maximum.accumulate(equity, axis=1)
+    drawdown = np.subtract(equity, running_max, out=equity)
+    np.divide(drawdown, running_max, out=drawdown)
+    max_drawdown = drawdown.min(axis=1)
+    return total_return, sharpe, max_drawdown
+
+
+class RobustnessReport:
+    """Distributions of total return, Sharpe and max drawdown across simulated paths"""
+
+    STATISTICS = ('total_return', 'sharpe', 'max_drawdown')
+
+    def __init__(self, method, observed, total_return, sharpe, max_drawdown):
+        self.method = method
+        self.observed = observed
+        self.total_return = total_return
+        self.sharpe = sharpe
+        self.max_drawdown = max_drawdown
+
+    @property
+    def n_paths(self):
+        return len(self.total_return)
+
+    def confidence_intervals(self, level=0.90):
+        """(low, high) percentile interval per statistic"""
+        tail = (1 - level) / 2 * 100
+        return {
+            name: tuple(np.percentile(getattr(self, name), [tail, 100 - tail]))
+            for name in self.STATISTICS
+        }
+
+    def probability(self, statistic, threshold, above=True):
+        """Share of paths where a statistic ends above (or below) a threshold"""
+        values = getattr(self, statistic)
+        return float(np.mean(values > threshold if above else values < threshold))
+
+    def summary(self, level=0.90):
+        """One row per statistic: observed value, mean, median and interval bounds"""
+        intervals = self.confidence_intervals(level)
+        rows = []
+        for name in self.STATISTICS:
+            values = getattr(self, name)
+            low, high = intervals[name]
+            rows.append({
+                'statistic': name,
+                'observed': self.observed[name],
+                'mean': values.mean(),
+                'median': np.median(values),
+                f'p{(1 - level) / 2 * 100:g}': low,
+                f'p{(1 + level) / 2 * 100:g}': high,
+            })
+        return pd.DataFrame(rows).set_index('statistic')
+
+
+def monte_carlo(df, n_paths=10000, method='block', block_size=20, seed=None,
+                periods_per_year=252, max_bytes=256 * 1024 * 1024):
+    """Resample a backtest's returns into many paths and measure the spread of outcomes
+
+    method='block' resamples per-bar strategy_returns with a moving-block
+    bootstrap; 'shuffle' permutes the order of round-trip trades (final
+    return unchanged, drawdown path varies); 'trade_bootstrap' draws trades
+    with replacement. Paths are generated as one 2-D matrix per chunk, with
+    chunks sized so a chunk stays under max_bytes.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method} (expected one of {METHODS})")
+    rng = np.random.default_rng(seed)
+
+    if method == 'block':
+        source = df['strategy_returns'].fillna(0).to_numpy(dtype=float)
+        scale = periods_per_year
+    else:
+        source = trade_returns(df)
+        years = len(df) / periods_per_year
+        scale = len(source) / years if years > 0 else 1.0
+    n = len(source)
+    if n == 0:
+        raise ValueError("No returns to resample (no bars or no completed trades)")
+
+    observed = dict(zip(RobustnessReport.STATISTICS,
+                        (float(v[0]) for v in path_statistics(source[None, :], scale))))
+
+    chunk_size = max(1, int(max_bytes // (n * 8 * MC_LIVE_ARRAYS)))
+    results = [[], [], []]
+    for start in range(0, n_paths, chunk_size):
+        rows = min(chunk_size, n_paths - start)
+        if method == 'block':
+            paths = source[block_bootstrap_indices(n, rows, block_size, rng)]
+        elif method == 'shuffle':
+            paths = source[np.argsort(rng.random((rows, n)), axis=1)]
+        else:
+            paths = source[rng.integers(0, n, size=(rows, n))]
+        for collected, values in zip(results, path_statistics(paths, scale)):
+            collected.append(values)
+
+    total_return, sharpe, max_drawdown = (np.concatenate(values) for values in results)
+    return RobustnessReport(method, observed, total_return, sharpe, max_drawdown)
@@ -0,0 +1,201 @@
+# backtesting/walk_forward.py - Rolling out-of-sample evaluation
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtesting.backtester import Backtester
+from backtesting.optimizer import DEFAULT_SPACE, SharedPriceArrays, grid_search_space
+from config.settings import INITIAL_CAPITAL, COMMISSION
+from strategies.engine import StrategyEngine
+from strategies.main_strategy import SimpleCombinedWithATR
+
+
+def make_folds(n_bars, train_bars, test_bars, step=None):
+    """(train_start, train_end, test_end) bar offsets for each rolling fold"""
+    step = step or test_bars
+    folds = []
+    start = 0
+    while start + train_bars + test_bars <= n_bars:
+        folds.append((start, start + train_bars, start + train_bars + test_bars))
+        start += step
+    return folds
+
+
+def window_frame(df, signals, start, end):
+    """Bars [start, end) of df with the matching slice of full-history signal arrays
+
+    A window that opens in a position gets, on its first bar, the size
+    and stop of the bar that position was entered on, so the event
+    engine buys it back in there just as the vectorized engine does.
+    """
+    frame = df.iloc[start:end].copy()
+    for name, values in signals.items():
+        frame[name] = values[start:end]
+    position = signals['position']
+    if start > 0 and position[start] == 1:
+        flat = np.flatnonzero(position[:start] == 0)
+        entry = flat[-1] if len(flat) else 0
+        frame.iloc[0, frame.columns.get_loc('position_size')] = signals['position_size'][entry]
+        frame.iloc[0, frame.columns.get_loc('stop_loss')] = signals['stop_loss'][entry]
+    return frame
+
+
+# Per-process state populated by _init_worker
+_worker = {}
+
+
+def _init_worker(specs, combos, objective, initial_capital, commission, engine):
+    _worker['combos'] = combos
+    _worker['objective'] = objective
+    _worker['shms'] = []
+    _worker['frames'] = {}
+    # One engine over every parameter set: each distinct indicator is
+    # computed once per symbol, over its full history
+    _worker['engine'] = StrategyEngine(SimpleCombinedWithATR(verbose=False, **params) for params in combos)
+    _worker['indicators'] = (None, None)
+    for symbol, spec in specs.items():
+        shm, df = SharedPriceArrays.attach(spec)
+        _worker['shms'].append(shm)
+        _worker['frames'][symbol] = df
+    _worker['backtester'] = Backtester(initial_capital=initial_capital, commission=commission,
+                                       verbose=False, engine=engine)
+
+
+def _symbol_indicators(symbol):
+    """Every parameter set's indicators over a symbol's full history (kept for one symbol at a time)"""
+    if _worker['indicators'][0] != symbol:
+        _worker['indicators'] = (None, None)  # Free the previous symbol's first
+        _worker['indicators'] = (symbol, _worker['engine'].indicators(_worker['frames'][symbol]))
+    return _worker['indicators'][1]
+
+
+def _run_fold(task):
+    symbol, fold_id, (train_start, train_end, test_end) = task
+    combos, objective = _worker['combos'], _worker['objective']
+    df = _worker['frames'][symbol]
+    backtester = _worker['backtester']
+
+    # Signals come from full-history indicators, so a fold sees exactly the
+    # values a run over the whole history would; only the backtest is cut
+    values = _symbol_indicators(symbol)
+    best_score, best_params, best_signals = None, None, None
+    for params, (_, signals) in zip(combos, _worker['engine'].signal_arrays(df, values)):
+        # In-sample: pick the parameter set with the best objective on the train window
+        _, train_metrics = backtester.backtest_signals(window_frame(df, signals, train_start, train_end))
+        score = getattr(train_metrics, objective)
+        if best_score is None or score > best_score:
+            best_score, best_params, best_signals = score, params, signals
+
+    # Out-of-sample: run the chosen parameters on the following window
+    test, metrics = backtester.backtest_signals(window_frame(df, best_signals, train_end, test_end))
+    return {
+        'symbol': symbol,
+        'fold': fold_id,
+        'train_start': df.index[train_start],
+        'train_end': df.index[train_end - 1],
+        'test_start': df.index[train_end],
+        'test_end': df.index[test_end - 1],
+        'params': best_params,
+        'train_score': best_score,
+        'test': metrics.as_dict(),
+        'trades': metrics.trades,
+        'test_returns': pd.Series(test['strategy_returns'].to_numpy(), index=test.index),
+    }
+
+
+class WalkForwardResult:
+    """Per-fold results plus stitched out-of-sample equity curves"""
+
+    def __init__(self, folds, initial_capital):
+        self.folds = sorted(folds, key=lambda f: (f['symbol'], f['fold']))
+        self.initial_capital = initial_capital
+
+    def summary(self):
+        """One row per (symbol, fold) with the chosen parameters and OOS figures"""
+        rows = []
+        for fold in self.folds:
+            row = {k: fold[k] for k in ('symbol', 'fold', 'train_start', 'train_end',
+                                        'test_start', 'test_end', 'train_score')}
+            row.update({f'test_{k}': v for k, v in fold['test'].items()})
+            row.update(fold['params'])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def fold_equity(self, symbol, fold_id):
+        """Equity curve of one test window, starting from the initial capital"""
+        for fold in self.folds:
+            if fold['symbol'] == symbol and fold['fold'] == fold_id:
+                return self.initial_capital * (1 + fold['test_returns']).cumprod()
+        raise KeyError((symbol, fold_id))
+
+    def stitched_equity(self, symbol):
+        """All test windows of a symbol chained into one out-of-sample curve"""
+        returns = pd.concat([f['test_returns'] for f in self.folds if f['symbol'] == symbol])
+        returns = returns[~returns.index.duplicated(keep='first')]
+        return self.initial_capital * (1 + returns).cumprod()
+
+    @property
+    def symbols(self):
+        return list(dict.fromkeys(f['symbol'] for f in self.folds))
+
+
+class WalkForward:
+    """Optimize on a training window, test on the next, roll forward and repeat
+
+    Folds (across all symbols) run in parallel worker processes. Price
+    arrays are shared with the workers through shared memory. A worker
+    computes every parameter set's indicators once per symbol over the
+    full history (one StrategyEngine pass, shared indicators computed
+    once) and cuts each fold's train and test windows out of the
+    resulting signals, so no window starts from unsettled indicators. A
+    window that opens already in a position buys in on its first bar, in
+    either engine, and pays the entry commission there.
+    """
+
+    def __init__(self, train_bars=504, test_bars=126, step=None, combos=None,
+                 objective='sharpe', initial_capital=INITIAL_CAPITAL, commission=COMMISSION,
+                 engine='vectorized', max_workers=None):
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step = step
+        self.combos = combos if combos is not None else grid_search_space(DEFAULT_SPACE)
+        self.objective = objective
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count()
+
+    def run(self, data):
+        """Run on one DataFrame or a {symbol: DataFrame} mapping"""
+        if isinstance(data, pd.DataFrame):
+            data = {'data': data}
+
+        tasks = []
+        for symbol, df in data.items():
+            folds = make_folds(len(df), self.train_bars, self.test_bars, self.step)
+            tasks.extend((symbol, i, bounds) for i, bounds in enumerate(folds))
+        print(f"🔁 Walk-forward: {len(tasks)} folds over {len(data)} symbol(s), "
+              f"{len(self.combos)} parameter sets per fold, {self.max_workers} workers")
+        if not tasks:
+            print("⚠️  Not enough bars for a single train + test window")
+            return WalkForwardResult([], self.initial_capital)
+
+        shared = {symbol: SharedPriceArrays(df) for symbol, df in data.items()}
+        try:
+            specs = {symbol: arrays.spec for symbol, arrays in shared.items()}
+            with ProcessPoolExecutor(self.max_workers, initializer=_init_worker,
+                                     initargs=(specs, self.combos, self.objective, self.initial_capital,
+                                               self.commission, self.engine)) as pool:
+                folds = []
+                for fold in pool.map(_run_fold, tasks):
+                    folds.append(fold)
+                    print(f"   {fold['symbol']} fold {fold['fold']}: "
+                          f"train {self.objective} {fold['train_score']:.2f} -> "
+                          f"test return {fold['test']['total_return']*100:+.2f}%")
+        finally:
+            for arrays in shared.values():
+                arrays.close()
+
+        return WalkForwardResult(folds, self.initial_capital)
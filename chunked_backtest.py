@@ -0,0 +1,116 @@
+import sys
+import os
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config.settings import (
+    SYMBOL, DATA_CACHE_DIR, INITIAL_CAPITAL, COMMISSION, BACKTEST_ENGINE, BACKTEST_CHUNK_BARS
+)
+from data.cache import OHLCVCache
+from data.synthetic import synthetic_bars
+from strategies.main_strategy import SimpleCombinedWithATR
+from backtesting.chunked import ChunkedBacktester, peak_rss_mb
+
+
+def write_synthetic(cache, symbol, n_bars, chunk_bars, seed=7):
+    """Fill the cache with n_bars of data.synthetic regular-hours minute bars, one chunk at a time
+
+    Each chunk is its own synthetic_bars series (seed + chunk number)
+    starting at the previous chunk's last close, so memory stays at one chunk.
+    """
+    cache.create_columns(symbol, n_bars, tz='UTC')
+    last = 100.0
+    for k, start in enumerate(range(0, n_bars, chunk_bars)):
+        i = np.arange(start, min(start + chunk_bars, n_bars))
+        # 390 bars per business day from 14:30 UTC
+        days = np.busday_offset('2015-01-02', i // 390, roll='forward')
+        stamps = days.astype('datetime64[ns]') + np.timedelta64(870, 'm') + (i % 390).astype('timedelta64[m]')
+        bars = synthetic_bars(len(i), seed=seed + k, price=last)
+        # Map the files per chunk so written pages do not pile up in RSS
+        arrays = cache.columns(symbol, mmap_mode='r+')
+        arrays['index'][i] = stamps.view(np.int64)
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            arrays[field][i] = bars[field]
+        for array in arrays.values():
+            array.flush()
+        del arrays
+        last = bars['close'][-1]
+
+def verify(cache, symbol, metrics, args):
+    """Re-run the in-memory Backtester on the same bars and compare"""
+    from backtesting.backtester import Backtester
+
+    df = cache.read(symbol, args.start, args.end)
+    df['returns'] = df['close'].pct_change()
+    _, expected = Backtester(INITIAL_CAPITAL, COMMISSION, verbose=False,
+                             engine=args.engine).run_backtest(df, SimpleCombinedWithATR(verbose=False))
+    worst = 0.0
+    for name, _, _ in metrics.FIELDS:
+        a, b = getattr(metrics, name), getattr(expected, name)
+        worst = max(worst, abs(a - b) / max(abs(b), 1e-12))
+    same_trades = len(metrics.trades) == len(expected.trades) and all(
+        np.array_equal(metrics.trades[f], expected.trades[f]) for f in metrics.trades.dtype.names)
+    print(f"   In-memory check: max relative metric difference {worst:.1e}, "
+          f"trade ledger {'identical' if same_trades else 'DIFFERENT'}")
+    print(f"   Peak RSS after in-memory run: {peak_rss_mb():.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core backtest over cached bars, chunk by chunk")
+    parser.add_argument('symbols', nargs='*', default=[SYMBOL], help="cached symbols to backtest")
+    parser.add_argument('--cache-dir', default=None, help=f"OHLCV cache (default: {DATA_CACHE_DIR})")
+    parser.add_argument('--chunk-bars', type=int, default=BACKTEST_CHUNK_BARS)
+    parser.add_argument('--engine', choices=ChunkedBacktester.ENGINES, default=BACKTEST_ENGINE)
+    parser.add_argument('--start', default=None, help="first date (inclusive)")
+    parser.add_argument('--end', default=None, help="last date (exclusive)")
+    parser.add_argument('--output', default=None, help="directory for per-bar result columns (.npy)")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="first write N synthetic minute bars per symbol (into a scratch cache "
+                             "unless --cache-dir is given)")
+    parser.add_argument('--verify', action='store_true',
+                        help="also run the in-memory backtester and compare (needs the history to fit in RAM)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🧱 TRADING BOT - CHUNKED BACKTEST")
+    print("="*60)
+
+    cache_dir = args.cache_dir
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'trading_bot_synthetic') if args.synthetic else DATA_CACHE_DIR
+    cache = OHLCVCache(cache_dir)
+    if args.synthetic:
+        for symbol in args.symbols:
+            print(f"📝 Writing {args.synthetic:,} synthetic minute bars for {symbol} to {cache_dir}")
+            write_synthetic(cache, symbol, args.synthetic, args.chunk_bars)
+
+    print(f"   Engine: {args.engine} | chunk: {args.chunk_bars:,} bars | peak RSS before: {peak_rss_mb():.0f} MB")
+    backtester = ChunkedBacktester(INITIAL_CAPITAL, COMMISSION, engine=args.engine,
+                                   chunk_bars=args.chunk_bars, verbose=False)
+    for symbol in args.symbols:
+        output_dir = os.path.join(args.output, symbol) if args.output else None
+        try:
+            metrics = backtester.run_symbol(cache, symbol, SimpleCombinedWithATR(verbose=False),
+                                            args.start, args.end, output_dir=output_dir)
+        except ValueError as e:
+            print(f"❌ {symbol}: {e}")
+            continue
+        stats = backtester.stats
+
+        print(f"\n📊 {symbol}: {stats['bars']:,} bars in {stats['chunks']} chunks")
+        for key, value in metrics.items():
+            print(f"{key:25}: {value}")
+        print(f"⏱️  {stats['seconds']:.2f}s, {stats['bars_per_second']:,.0f} bars/s | "
+              f"peak RSS {stats['peak_rss_mb']:.0f} MB")
+        if output_dir:
+            print(f"📄 Result columns saved to: {output_dir}")
+        if args.verify:
+            verify(cache, symbol, metrics, args)
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
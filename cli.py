@@ -0,0 +1,69 @@
+import sys
+import os
+import argparse
+import importlib
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Subcommand -> (module, function, help). Nothing below is imported until its
+# subcommand runs, so quick commands never pay for pandas/matplotlib/yfinance.
+# Each function parses its own options from sys.argv.
+COMMANDS = {
+    'backtest': ('main', 'main', "Historical backtest with metrics, Monte Carlo and charts"),
+    'chunked': ('chunked_backtest', 'main', "Out-of-core backtest over cached bars, chunk by chunk"),
+    'optimize': ('optimize', 'main', "Parallel parameter sweep"),
+    'walk-forward': ('walk_forward', 'main', "Rolling out-of-sample evaluation"),
+    'compare': ('compare_strategies', 'main', "Many strategy variants over one shared indicator pass"),
+    'portfolio': ('portfolio_backtest', 'main', "Universe backtest with shared capital (time x symbol matrices)"),
+    'bench': ('perf_benchmark', 'main', "Pipeline benchmarks on synthetic bars vs the recorded baseline"),
+    'signal': ('utils.status', 'show_signal', "Today's signal from the saved state (--live to refresh)"),
+    'position': ('utils.status', 'show_position', "Account equity and open position (--all for every one)"),
+    'account': ('utils.status', 'show_account', "Account balances and total return"),
+    'trade': ('auto_trading_system', 'main', "Run one trading session now"),
+    'daemon': ('trading.daemon', 'main', "Resident scheduler with health endpoint"),
+    'stream': ('trading.stream', 'main', "Strategy on streamed minute bars (websocket)"),
+    'replay': ('trading.replay', 'main', "Local websocket server replaying minute bars"),
+    'dashboard': ('enhanced_dashboard', 'main', "Live account dashboard and performance chart"),
+    'monitor': ('trading_monitor', 'monitor_trading_bot', "Follow the session log in real time"),
+    'journal': ('trading.journal', 'main', "Query or follow the session/trade journal"),
+    'execution': ('trading.execution', 'main', "Batched order execution demo against a local stand-in broker"),
+    'cache': ('trading.cache', 'main', "Shared broker cache daemon (--serve) and its hit/miss stats"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description="Trading bot command line",
+        epilog="Run 'cli.py <command> --help' for the options of a command")
+    parser.add_argument('--imports-only', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('command', choices=COMMANDS, metavar='command',
+                        help=' | '.join(COMMANDS))
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def load(command):
+    """Import a subcommand's module and return its entry point"""
+    module, function, _ = COMMANDS[command]
+    return getattr(importlib.import_module(module), function)
+
+
+def main():
+    parser = build_parser()
+    if len(sys.argv) == 1:
+        parser.print_help()
+        print("\nCommands:")
+        for name, (_, _, help_text) in COMMANDS.items():
+            print(f"  {name:14} {help_text}")
+        return
+    args = parser.parse_args()
+
+    entry = load(args.command)
+    if args.imports_only:
+        # Used by startup_benchmark.py: measure a command's import cost only
+        return
+    sys.argv = [f"cli.py {args.command}"] + args.args
+    entry()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import SYMBOL
+from trading.broker import AsyncAlpacaBroker
+from trading.standin import StandInAlpaca, StandInServer
+
+KEY, SECRET = 'stand-in-key', 'stand-in-secret'
+
+
+def sequential_session(url, start, end):
+    """The old flow: one REST client, every call waits for the previous one"""
+    import alpaca_trade_api as tradeapi
+    from alpaca_trade_api.rest import TimeFrame
+
+    api = tradeapi.REST(KEY, SECRET, url, api_version='v2')
+    api.get_clock()
+    account = api.get_account()
+    bars = api.get_bars(symbol=SYMBOL, timeframe=TimeFrame.Day, start=start, end=end, feed='iex').df
+    try:
+        api.get_position(SYMBOL)
+    except Exception:
+        pass
+    equity = api.get_account().equity  # log_session's second account call
+    return float(account.equity), len(bars), float(equity)
+
+
+async def concurrent_session(url, start, end):
+    """The new flow: one pooled aiohttp session, independent calls gathered"""
+    async with AsyncAlpacaBroker(KEY, SECRET, url, url) as broker:
+        snapshot = await broker.session_snapshot(SYMBOL, start, end)
+    return snapshot.equity, len(snapshot.bars), snapshot.equity
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return times, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session wall-clock: sequential REST vs async broker")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="simulated round trip per request in seconds (default 0.05)")
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    # The data URL is read from the environment by alpaca_trade_api
+    api = StandInAlpaca(latency=args.latency)
+    with StandInServer(api) as server:
+        os.environ['APCA_API_DATA_URL'] = server.url
+        end = datetime(2023, 12, 31, tzinfo=timezone.utc)
+        start, end = (end - timedelta(days=60)).isoformat(), end.isoformat()
+
+        print(f"⏱️  SESSION WALL-CLOCK ({args.runs} runs, {args.latency*1000:.0f} ms per request)")
+        print("="*60)
+
+        api.requests = 0
+        seq_times, seq_result = timed(lambda: sequential_session(server.url, start, end), args.runs)
+        seq_requests = api.requests / args.runs
+
+        api.requests = 0
+        async_times, async_result = timed(
+            lambda: asyncio.run(concurrent_session(server.url, start, end)), args.runs)
+        async_requests = api.requests / args.runs
+
+    if seq_result[:2] != async_result[:2]:
+        print(f"⚠️  Results differ: {seq_result} vs {async_result}")
+
+    for name, times, requests in (("Sequential REST", seq_times, seq_requests),
+                                  ("Async broker", async_times, async_requests)):
+        print(f"{name:>16}: median {statistics.median(times)*1000:7.1f} ms | "
+              f"mean {statistics.mean(times)*1000:7.1f} ms | {requests:.0f} requests")
+    print(f"🚀 Speedup: {statistics.median(seq_times) / statistics.median(async_times):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import argparse
+import itertools
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import (
+    SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE, INITIAL_CAPITAL, COMMISSION, BACKTEST_ENGINE,
+    FAST_MA, SLOW_MA, RSI_OVERSOLD, ATR_MULTIPLIER
+)
+from strategies.main_strategy import SimpleCombinedWithATR
+from strategies.variants import TrendFilteredATR, ChannelBreakout, FixedFractionEMA
+from strategies.engine import StrategyEngine, rank
+from backtesting.backtester import Backtester
+
+
+def values(spec, cast=float):
+    return [cast(v) for v in str(spec).split(',')]
+
+
+def channels(spec):
+    return [tuple(int(p) for p in pair.split('/')) for pair in str(spec).split(',')]
+
+
+def build_variants(args):
+    """The SimpleCombinedWithATR grid plus the other entry filters, exits and sizing rules"""
+    grid = itertools.product(values(args.fast, int), values(args.slow, int),
+                             values(args.rsi_oversold), values(args.atr_multiplier))
+    variants = [SimpleCombinedWithATR(verbose=False, fast_ma=fast, slow_ma=slow, rsi_oversold=oversold,
+                                      atr_multiplier=multiplier)
+                for fast, slow, oversold, multiplier in grid if fast < slow]
+    crosses = [(fast, slow) for fast, slow in itertools.product(values(args.fast, int), values(args.slow, int))
+               if fast < slow]
+    variants += [TrendFilteredATR(trend_period=trend, verbose=False, fast_ma=fast, slow_ma=slow)
+                 for (fast, slow), trend in itertools.product(crosses, values(args.trend, int))]
+    variants += [ChannelBreakout(entry_period=entry, exit_period=exit_, atr_multiplier=multiplier)
+                 for (entry, exit_), multiplier in itertools.product(channels(args.breakout),
+                                                                     values(args.atr_multiplier))]
+    variants += [FixedFractionEMA(fast_ma=fast, slow_ma=slow, fraction=fraction)
+                 for (fast, slow), fraction in itertools.product(crosses, values(args.fraction))]
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest many strategy variants over one shared indicator pass")
+    parser.add_argument('--symbol', default=SYMBOL)
+    parser.add_argument('--synthetic', type=int, metavar='BARS',
+                        help="use this many synthetic bars instead of market data")
+    parser.add_argument('--fast', default=f"10,{FAST_MA},30", help="fast EMA spans (comma separated)")
+    parser.add_argument('--slow', default=f"{SLOW_MA},100", help="slow EMA spans")
+    parser.add_argument('--rsi-oversold', default=f"30,{RSI_OVERSOLD}", help="RSI buy thresholds")
+    parser.add_argument('--atr-multiplier', default=f"{ATR_MULTIPLIER},2.0", help="ATR stop multipliers")
+    parser.add_argument('--trend', default="100,200", help="SMA trend filter periods")
+    parser.add_argument('--breakout', default="20/10,55/20", help="channel breakout entry/exit periods")
+    parser.add_argument('--fraction', default="0.5,1.0", help="fixed-fraction position sizes")
+    parser.add_argument('--engine', choices=Backtester.ENGINES, default=BACKTEST_ENGINE)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--naive', action='store_true',
+                        help="also time every variant computing its own indicators, for comparison")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from data.synthetic import synthetic_ohlcv
+        df, source = synthetic_ohlcv(args.synthetic), f"{args.synthetic:,} synthetic bars"
+    else:
+        from data.data_fetcher import DataFetcher
+        df = DataFetcher(args.symbol, BACKTEST_START_DATE, BACKTEST_END_DATE, verbose=False).fetch_historical_data()
+        if df is None:
+            print("❌ No data")
+            return
+        source = f"{args.symbol}, {len(df):,} bars"
+
+    variants = build_variants(args)
+    backtester = Backtester(INITIAL_CAPITAL, COMMISSION, verbose=False, engine=args.engine, lean=True)
+    print(f"🧪 STRATEGY COMPARISON: {len(variants)} variants on {source} ({args.engine} engine)")
+    print("="*88)
+
+    engine = StrategyEngine(variants)
+    started = time.perf_counter()
+    results = engine.backtest(df, backtester)
+    shared = time.perf_counter() - started
+    stats = engine.last_stats
+    print(f"⚡ Shared pass: {shared:.2f}s | indicators: {stats['requested']} requested, "
+          f"{stats['distinct']} distinct, {stats['computed']} computed (intermediates included)")
+
+    if args.naive:
+        started = time.perf_counter()
+        for strategy in variants:
+            backtester.run_lean(df, strategy)
+        naive = time.perf_counter() - started
+        print(f"🐢 Independent runs: {naive:.2f}s ({naive / shared:.1f}x the shared pass)")
+
+    print(f"\n🏆 TOP {min(args.top, len(results))} BY SHARPE")
+    print(f"   {'variant':56} {'sharpe':>7} {'return':>9} {'max dd':>8} {'trades':>7}")
+    for strategy, metrics in rank(results, 'sharpe', args.top):
+        print(f"   {strategy.describe():56} {metrics.sharpe:>7.2f} {metrics.total_return*100:>8.2f}% "
+              f"{metrics.max_drawdown*100:>7.2f}% {metrics.num_trades:>7}")
+    print("="*88)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,19 @@ INITIAL_CAPITAL = float(os.getenv("INITIAL_CAPITAL", "1000"))
 BACKTEST_START_DATE = "2020-01-01"
 BACKTEST_END_DATE = "2023-12-31"
 
+# "vectorized" (close-to-close, 0/1 position) or "event" (bar-by-bar with stops and ATR sizing)
+BACKTEST_ENGINE = os.getenv("BACKTEST_ENGINE", "vectorized")
+
+# Bars held in memory at a time by the out-of-core backtest (chunked_backtest.py)
+BACKTEST_CHUNK_BARS = int(os.getenv("BACKTEST_CHUNK_BARS", "250000"))
+
+# Bootstrap paths for the robustness report in main.py (0 disables it)
+MONTE_CARLO_PATHS = int(os.getenv("MONTE_CARLO_PATHS", "10000"))
+
+# Local OHLCV cache - set DATA_OFFLINE=1 to never touch the network
+DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "data_cache")
+DATA_OFFLINE = os.getenv("DATA_OFFLINE", "0") == "1"
+
 # =============================================================================
 # STRATEGY PARAMETERS
 # =============================================================================
@@ -33,6 +46,9 @@ RSI_OVERSOLD = 40     # RSI buy threshold
 RSI_OVERBOUGHT = 85   # RSI sell threshold
 ATR_PERIOD = 14       # ATR calculation period
 
+# Memory budget for memoized indicator series (strategies/indicators.py)
+INDICATOR_CACHE_BYTES = int(os.getenv("INDICATOR_CACHE_BYTES", str(512 * 1024 * 1024)))
+
 # =============================================================================
 # RISK MANAGEMENT
 # =============================================================================
@@ -40,12 +56,98 @@ RISK_PER_TRADE = 0.02   # 2% risk per trade
 ATR_MULTIPLIER = 1.5    # Stop loss = ATR * multiplier
 COMMISSION = 0.001      # 0.1% commission per trade
 
+# Portfolio backtest (backtesting/portfolio.py): cap on the summed position
+# weights (1.0 = fully invested, no leverage), and rebalance the whole book
+# back to target every N bars (0 = never; otherwise only symbols whose
+# target changes are traded)
+PORTFOLIO_MAX_GROSS = float(os.getenv("PORTFOLIO_MAX_GROSS", "1.0"))
+PORTFOLIO_REBALANCE_BARS = int(os.getenv("PORTFOLIO_REBALANCE_BARS", "0"))
+
+# Persisted incremental indicator/position state for the live path
+SIGNAL_STATE_FILE = os.getenv("SIGNAL_STATE_FILE", "signal_state.json")
+
 # =============================================================================
 # API CONFIGURATION
 # =============================================================================
 ALPACA_API_KEY = os.getenv("APCA_API_KEY_ID")
 ALPACA_SECRET_KEY = os.getenv("APCA_API_SECRET_KEY")
-ALPACA_BASE_URL = "https://paper-api.alpaca.markets"
+ALPACA_BASE_URL = os.getenv("APCA_API_BASE_URL", "https://paper-api.alpaca.markets")
+ALPACA_DATA_URL = os.getenv("APCA_API_DATA_URL", "https://data.alpaca.markets")
+ALPACA_STREAM_URL = os.getenv("APCA_API_STREAM_URL", "wss://stream.data.alpaca.markets")
+DATA_FEED = os.getenv("DATA_FEED", "iex")
+
+# Async broker (trading/broker.py): pooled keep-alive connections per host
+BROKER_MAX_CONNECTIONS = int(os.getenv("BROKER_MAX_CONNECTIONS", "10"))
+BROKER_TIMEOUT = float(os.getenv("BROKER_TIMEOUT", "30"))
+
+# Batched order execution (trading/execution.py). Alpaca allows 200 requests
+# a minute per account; the token bucket stays under it with a small burst
+EXECUTION_RATE = float(os.getenv("EXECUTION_RATE", "3.0"))  # requests per second
+EXECUTION_BURST = int(os.getenv("EXECUTION_BURST", "10"))
+EXECUTION_CONCURRENCY = int(os.getenv("EXECUTION_CONCURRENCY", "8"))  # orders in flight at once
+EXECUTION_RETRIES = int(os.getenv("EXECUTION_RETRIES", "3"))  # extra attempts after a timeout / 5xx / 429
+EXECUTION_ORDER_TIMEOUT = float(os.getenv("EXECUTION_ORDER_TIMEOUT", "10"))  # seconds per attempt
+EXECUTION_ORDER_PREFIX = os.getenv("EXECUTION_ORDER_PREFIX", "tb")  # client_order_id prefix
+
+# =============================================================================
+# BROKER CACHE (trading/cache.py)
+# =============================================================================
+# Read calls are answered from memory while younger than their resource's TTL
+# in seconds (0 = always ask the API; concurrent identical calls still share one)
+CACHE_TTL_ACCOUNT = float(os.getenv("CACHE_TTL_ACCOUNT", "5"))
+CACHE_TTL_POSITIONS = float(os.getenv("CACHE_TTL_POSITIONS", "5"))
+CACHE_TTL_ORDERS = float(os.getenv("CACHE_TTL_ORDERS", "5"))
+CACHE_TTL_CLOCK = float(os.getenv("CACHE_TTL_CLOCK", "30"))
+CACHE_TTL_BARS = float(os.getenv("CACHE_TTL_BARS", "60"))
+CACHE_ERROR_TTL = float(os.getenv("CACHE_ERROR_TTL", "2"))  # failures remembered this long
+# Shared cache daemon (python -m trading.cache --serve). With BROKER_CACHE_URL
+# set (e.g. http://127.0.0.1:8789) every tool's API calls go through it
+BROKER_CACHE_HOST = os.getenv("BROKER_CACHE_HOST", "127.0.0.1")
+BROKER_CACHE_PORT = int(os.getenv("BROKER_CACHE_PORT", "8789"))
+BROKER_CACHE_URL = os.getenv("BROKER_CACHE_URL")
+
+# =============================================================================
+# TRADING DAEMON (python -m trading.daemon)
+# =============================================================================
+# Session trigger times, US/Eastern, comma separated (10:05 ET = the old cron slot)
+DAEMON_SESSION_TIMES = os.getenv("DAEMON_SESSION_TIMES", "10:05")
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8787"))
+DAEMON_PREWARM_SECONDS = float(os.getenv("DAEMON_PREWARM_SECONDS", "30"))
+DAEMON_MAX_SLEEP = float(os.getenv("DAEMON_MAX_SLEEP", "300"))  # re-check wall clock at least this often
+
+# =============================================================================
+# STREAMING (python -m trading.stream)
+# =============================================================================
+STREAM_SYMBOLS = os.getenv("STREAM_SYMBOLS", SYMBOL)
+STREAM_STATE_FILE = os.getenv("STREAM_STATE_FILE", "stream_state.json")  # minute-bar state, kept apart from the daily one
+STREAM_MAX_LAG = float(os.getenv("STREAM_MAX_LAG", "5"))  # seconds after bar close; older signals are not traded
+
+# =============================================================================
+# MONITOR (trading_monitor.py)
+# =============================================================================
+SESSION_LOG_FILE = os.getenv("SESSION_LOG_FILE", "trading_sessions.log")
+MONITOR_STATUS_SECONDS = float(os.getenv("MONITOR_STATUS_SECONDS", "60"))
+MONITOR_BROKER_TTL = float(os.getenv("MONITOR_BROKER_TTL", "180"))  # account/position re-fetched at most this often
+
+# =============================================================================
+# JOURNAL (trading/journal.py)
+# =============================================================================
+JOURNAL_FILE = os.getenv("JOURNAL_FILE", "trading_journal.db")  # SQLite (WAL): sessions, signals, orders, fills, equity
+
+# =============================================================================
+# DASHBOARD (enhanced_dashboard.py)
+# =============================================================================
+DASHBOARD_STATE_FILE = os.getenv("DASHBOARD_STATE_FILE", "dashboard_state.json")  # running aggregates between runs
+DASHBOARD_CHART_FILE = os.getenv("DASHBOARD_CHART_FILE", "trading_dashboard.png")
+DASHBOARD_HOST = os.getenv("DASHBOARD_HOST", "127.0.0.1")
+DASHBOARD_PORT = int(os.getenv("DASHBOARD_PORT", "8788"))
+
+# =============================================================================
+# TELEMETRY (utils/telemetry.py)
+# =============================================================================
+TELEMETRY_ENABLED = os.getenv("TELEMETRY", "0") == "1"  # stage / broker / signal-to-order latency histograms
+TELEMETRY_EXPORT = os.getenv("TELEMETRY_EXPORT")  # at exit: *.prom -> Prometheus text, else JSON lines appended
 
 # =============================================================================
 # TELEGRAM (Optional)
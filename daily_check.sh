@@ -4,71 +4,24 @@ echo "========================================"
 
 # 1. Check if bot ran today
 echo "1. TODAY'S RUNS:"
-if [ -f "trading_sessions.log" ]; then
-    if grep -q "AUTOMATED TRADING SESSION" trading_sessions.log; then
-        echo "   Last run found in log"
-        grep "AUTOMATED TRADING SESSION" trading_sessions.log | tail -1
-    else
-        echo "   No 'SESSION' entries found"
-        echo "   Last 2 lines of log:"
-        tail -2 trading_sessions.log
-    fi
+if [ -f "trading_journal.db" ]; then
+    python3 cli.py journal --kind session --since "$(date +%Y-%m-%d)"
+    echo "   Last session:"
+    python3 cli.py journal --kind session --last 1
 else
-    echo "   No log file yet"
+    echo "   No journal yet"
 fi
 
 # 2. Current positions
 echo ""
 echo "2. CURRENT POSITIONS:"
-python3 << 'PYEOF'
-import alpaca_trade_api as tradeapi
-import os
-from dotenv import load_dotenv
-load_dotenv()
-try:
-    api = tradeapi.REST(os.getenv('APCA_API_KEY_ID'), os.getenv('APCA_API_SECRET_KEY'), 'https://paper-api.alpaca.markets')
-    positions = api.list_positions()
-    if positions:
-        total_pnl = 0
-        for p in positions:
-            pnl = float(p.unrealized_pl)
-            total_pnl += pnl
-            print(f'   {p.symbol}: {p.qty} shares')
-            print(f'        Cost: ${float(p.avg_entry_price):.2f}')
-            print(f'        Current: ${float(p.current_price):.2f}')
-            print(f'        P&L: ${pnl:+.2f} ({float(p.unrealized_plpc)*100:+.2f}%)')
-        print(f'   TOTAL P&L: ${total_pnl:+.2f}')
-    else:
-        print('   No positions')
-except Exception as e:
-    print(f'   Error: {e}')
-PYEOF
+# Served by the shared broker cache daemon when BROKER_CACHE_URL is set
+python3 cli.py position --all 2>/dev/null || echo "   Error fetching positions"
 
 # 3. Account summary
 echo ""
 echo "3. ACCOUNT SUMMARY:"
-python3 << 'PYEOF'
-import alpaca_trade_api as tradeapi
-import os
-from dotenv import load_dotenv
-load_dotenv()
-try:
-    api = tradeapi.REST(os.getenv('APCA_API_KEY_ID'), os.getenv('APCA_API_SECRET_KEY'), 'https://paper-api.alpaca.markets')
-    acc = api.get_account()
-    print(f'   Equity: ${float(acc.equity):,.2f}')
-    print(f'   Buying Power: ${float(acc.buying_power):,.2f}')
-    print(f'   Cash: ${float(acc.cash):,.2f}')
-    
-    # Calculate returns
-    starting_equity = 100000.00
-    current_equity = float(acc.equity)
-    total_return = ((current_equity - starting_equity) / starting_equity) * 100
-    print(f'   Total Return: {total_return:+.3f}%')
-    print(f'   Total P&L: ${(current_equity - starting_equity):+.2f}')
-    
-except Exception as e:
-    print(f'   Error: {e}')
-PYEOF
+python3 cli.py account --starting-equity 100000 2>/dev/null || echo "   Error fetching account"
 
 # 4. Next scheduled run
 echo ""
@@ -80,6 +33,7 @@ echo "   Cron job: $(crontab -l | grep trading_bot | wc -l) active"
 echo ""
 echo "5. SYSTEM STATUS:"
 echo "   Log file: $(ls -la trading_sessions.log 2>/dev/null | awk '{print $5}' || echo 'Missing') bytes"
+echo "   Journal: $(python3 cli.py journal --stats 2>/dev/null || echo 'Missing')"
 echo "   Dashboard: $(ls -la trading_dashboard.png 2>/dev/null | awk '{print $5}' || echo 'Missing') bytes"
 echo "   Strategy: $(ls -la strategies/main_strategy.py 2>/dev/null | awk '{print $5}' || echo 'Missing') bytes"
 
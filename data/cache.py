@@ -0,0 +1,228 @@
+# data/cache.py - On-disk OHLCV cache
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _to_date(value):
+    return pd.Timestamp(value).date()
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) date ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class BarChunks:
+    """Iterable over a cached symbol's bars as fixed-size chunks of column arrays
+
+    Each chunk is a dict of plain arrays (index + OHLCV) read from the
+    column files, so at most chunk_bars rows are resident at a time. len()
+    is the total number of bars in the range.
+    """
+
+    def __init__(self, arrays, lo, hi, chunk_bars):
+        self.arrays = arrays
+        self.lo = lo
+        self.hi = hi
+        self.chunk_bars = chunk_bars
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __iter__(self):
+        for start in range(self.lo, self.hi, self.chunk_bars):
+            stop = min(start + self.chunk_bars, self.hi)
+            yield {name: self._read(values, start, stop) for name, values in self.arrays.items()}
+
+    @staticmethod
+    def _read(values, start, stop):
+        # A plain read instead of slicing the memmap: pages touched through
+        # a mapping stay in the process's RSS until it is unmapped
+        if isinstance(values, np.memmap):
+            return np.fromfile(values.filename, dtype=values.dtype, count=stop - start,
+                               offset=values.offset + start * values.itemsize)
+        return np.array(values[start:stop])
+
+
+class OHLCVCache:
+    """Columnar per-symbol OHLCV store backed by memory-mapped .npy files
+
+    Each symbol gets a directory holding one .npy file per column plus the
+    bar timestamps (UTC nanoseconds), and a meta.json recording the
+    timezone and the [start, end) date ranges already downloaded. Ranges
+    are tracked separately from the bars so that holidays and weekends are
+    not re-requested on every run.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.cache_dir, symbol.upper())
+
+    def load_meta(self, symbol):
+        path = os.path.join(self._symbol_dir(symbol), 'meta.json')
+        if not os.path.exists(path):
+            return {'tz': None, 'ranges': []}
+        with open(path) as f:
+            return json.load(f)
+
+    def covered_ranges(self, symbol):
+        """Date ranges already stored for a symbol, as (start, end) dates"""
+        return [
+            (date.fromisoformat(start), date.fromisoformat(end))
+            for start, end in self.load_meta(symbol)['ranges']
+        ]
+
+    def missing_ranges(self, symbol, start_date, end_date):
+        """Sub-ranges of [start_date, end_date) that still need downloading"""
+        start, end = _to_date(start_date), _to_date(end_date)
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.covered_ranges(symbol):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def columns(self, symbol, mmap_mode='r'):
+        """Raw column arrays for a symbol (memory-mapped by default)"""
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.exists(os.path.join(symbol_dir, 'index.npy')):
+            return None
+        arrays = {'index': np.load(os.path.join(symbol_dir, 'index.npy'), mmap_mode=mmap_mode)}
+        for col in OHLCV_COLUMNS:
+            arrays[col] = np.load(os.path.join(symbol_dir, f'{col}.npy'), mmap_mode=mmap_mode)
+        return arrays
+
+    def _bounds(self, symbol, stamps, start_date, end_date):
+        # Dates are interpreted in the exchange timezone, like yfinance does
+        tz = self.load_meta(symbol)['tz']
+        lo, hi = 0, len(stamps)
+        if start_date is not None:
+            lo = int(np.searchsorted(stamps, self._boundary(start_date, tz), side='left'))
+        if end_date is not None:
+            hi = int(np.searchsorted(stamps, self._boundary(end_date, tz), side='left'))
+        return lo, hi
+
+    def read(self, symbol, start_date=None, end_date=None):
+        """Load cached bars for a symbol, optionally limited to [start_date, end_date)"""
+        arrays = self.columns(symbol)
+        if arrays is None:
+            return pd.DataFrame(columns=OHLCV_COLUMNS, dtype=float)
+        tz = self.load_meta(symbol)['tz']
+        stamps = arrays['index']
+        lo, hi = self._bounds(symbol, stamps, start_date, end_date)
+
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(stamps[lo:hi]), utc=True))
+        index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        index.name = 'Date'
+        return pd.DataFrame(
+            {col: np.array(arrays[col][lo:hi]) for col in OHLCV_COLUMNS},
+            index=index,
+        )
+
+    def chunks(self, symbol, chunk_bars, start_date=None, end_date=None):
+        """BarChunks over [start_date, end_date) without loading the whole history"""
+        arrays = self.columns(symbol)
+        if arrays is None:
+            return BarChunks({}, 0, 0, chunk_bars)
+        lo, hi = self._bounds(symbol, arrays['index'], start_date, end_date)
+        return BarChunks(arrays, lo, hi, chunk_bars)
+
+    def create_columns(self, symbol, n_bars, tz=None):
+        """Preallocate writable memory-mapped columns for n_bars bars
+
+        For bulk imports too large to pass through write() as one DataFrame:
+        fill the returned arrays (index in UTC nanoseconds) chunk by chunk
+        and flush them. Replaces whatever the symbol had; no date range is
+        marked as downloaded.
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        arrays = {'index': np.lib.format.open_memmap(
+            os.path.join(symbol_dir, 'index.npy'), mode='w+', dtype=np.int64, shape=(n_bars,))}
+        for col in OHLCV_COLUMNS:
+            arrays[col] = np.lib.format.open_memmap(
+                os.path.join(symbol_dir, f'{col}.npy'), mode='w+', dtype=np.float64, shape=(n_bars,))
+        with open(os.path.join(symbol_dir, 'meta.json'), 'w') as f:
+            json.dump({'tz': tz, 'ranges': []}, f, indent=2)
+        return arrays
+
+    @staticmethod
+    def _boundary(value, tz):
+        stamp = pd.Timestamp(_to_date(value))
+        stamp = stamp.tz_localize(tz) if tz else stamp.tz_localize('UTC')
+        return stamp.value
+
+    def write(self, symbol, df, start_date, end_date):
+        """Merge freshly downloaded bars into the cache and mark the range as stored
+
+        An empty download only marks its range when the range has no
+        weekday at all. Otherwise it may be an error or a rate limit, not a
+        gap in trading, so the range stays missing and is requested again.
+        Returns whether the range was marked.
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        meta = self.load_meta(symbol)
+
+        if len(df) > 0:
+            tz = str(df.index.tz) if df.index.tz is not None else None
+            if meta['tz'] is None:
+                meta['tz'] = tz
+            new = df[OHLCV_COLUMNS].astype(float)
+            existing = self.read(symbol)
+            if len(existing):
+                if existing.index.tz is not None and new.index.tz is not None:
+                    new = new.tz_convert(existing.index.tz)
+                new = pd.concat([existing, new])
+            merged = new[~new.index.duplicated(keep='last')].sort_index()
+
+            index = merged.index
+            if index.tz is not None:
+                index = index.tz_convert('UTC').tz_localize(None)
+            self._save(symbol_dir, 'index', index.values.astype('datetime64[ns]').view(np.int64))
+            for col in OHLCV_COLUMNS:
+                self._save(symbol_dir, col, merged[col].to_numpy(dtype=np.float64))
+
+        # Never mark today or the future as complete - those bars may still change
+        start = _to_date(start_date)
+        end = min(_to_date(end_date), date.today())
+        confirmed = len(df) > 0 or np.busday_count(start, end) == 0
+        if start < end and confirmed:
+            ranges = [[date.fromisoformat(a), date.fromisoformat(b)] for a, b in meta['ranges']]
+            ranges.append([start, end])
+            meta['ranges'] = [[a.isoformat(), b.isoformat()] for a, b in merge_ranges(ranges)]
+
+        tmp_path = os.path.join(symbol_dir, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(symbol_dir, 'meta.json'))
+        return confirmed
+
+    @staticmethod
+    def _save(symbol_dir, name, values):
+        # Write then rename so readers never see a half-written column
+        tmp_path = os.path.join(symbol_dir, f'{name}.tmp.npy')
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(symbol_dir, f'{name}.npy'))
+
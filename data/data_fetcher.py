@@ -1,39 +1,87 @@
 # data/data_fetcher.py - Data acquisition module
-import yfinance as yf
 import pandas as pd
 
+from config.settings import DATA_CACHE_DIR, DATA_OFFLINE
+from data.cache import OHLCVCache
+from utils.telemetry import telemetry
+
 class DataFetcher:
-    def __init__(self, symbol, start_date, end_date):
+    def __init__(self, symbol, start_date, end_date, cache_dir=None, offline=None, use_cache=True,
+                 verbose=True):
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
-        
+        self.offline = DATA_OFFLINE if offline is None else offline
+        self.cache = OHLCVCache(cache_dir or DATA_CACHE_DIR) if use_cache else None
+        self.verbose = verbose
+
     def fetch_historical_data(self):
-        """Fetch OHLCV data from Yahoo Finance"""
+        """Fetch OHLCV data, serving stored ranges from the local cache"""
         try:
-            print(f"📥 Fetching data for {self.symbol}...")
-            ticker = yf.Ticker(self.symbol)
-            df = ticker.history(start=self.start_date, end=self.end_date)
-            
-            # Clean the data
-            df.columns = [col.lower() for col in df.columns]
-            if 'adj close' in df.columns:
-                df.rename(columns={'adj close': 'close'}, inplace=True)
-            
-            # Ensure we have required columns
-            required_cols = ['open', 'high', 'low', 'close', 'volume']
-            for col in required_cols:
-                if col not in df.columns:
-                    raise ValueError(f"Missing column: {col}")
-            
-            # Calculate daily returns
-            df['returns'] = df['close'].pct_change()
-            
-            print(f"✅ Successfully fetched {len(df)} trading days")
-            print(f"   Date range: {df.index[0].date()} to {df.index[-1].date()}")
-            
+            self._log(f"📥 Fetching data for {self.symbol}...")
+            df = self.load()
+
+            self._log(f"✅ Successfully fetched {len(df)} trading days")
+            self._log(f"   Date range: {df.index[0].date()} to {df.index[-1].date()}")
+
             return df
-            
+
         except Exception as e:
-            print(f"❌ Error fetching data: {e}")
-            return None
\ No newline at end of file
+            self._log(f"❌ Error fetching data: {e}")
+            return None
+
+    @telemetry.timed('fetch')
+    def load(self):
+        """Fetch and clean the bars, raising on failure instead of returning None"""
+        if self.cache is None:
+            df = self._download(self.start_date, self.end_date)
+        else:
+            df = self._fetch_cached()
+
+        # Calculate daily returns
+        df['returns'] = df['close'].pct_change()
+        return df
+
+    def _fetch_cached(self):
+        """Download only the date ranges the cache does not hold yet"""
+        missing = self.cache.missing_ranges(self.symbol, self.start_date, self.end_date)
+        if missing and self.offline:
+            self._log(f"⚠️  Offline mode: {len(missing)} range(s) not cached, using stored bars only")
+        elif missing:
+            for start, end in missing:
+                self._log(f"   🌐 Downloading {start} to {end}")
+                if not self.cache.write(self.symbol, self._download(start, end), start, end):
+                    self._log(f"   ⚠️  No bars returned for {start} to {end} - not cached, will retry next run")
+        else:
+            self._log(f"   💾 Served from cache")
+
+        df = self.cache.read(self.symbol, self.start_date, self.end_date)
+        if len(df) == 0:
+            raise ValueError(f"No cached data for {self.symbol}")
+        return df
+
+    def _download(self, start_date, end_date):
+        """Fetch OHLCV data from Yahoo Finance"""
+        import yfinance as yf  # Only needed on a cache miss
+
+        ticker = yf.Ticker(self.symbol)
+        df = ticker.history(start=start_date, end=end_date)
+        if len(df) == 0:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], dtype=float)
+
+        # Clean the data
+        df.columns = [col.lower() for col in df.columns]
+        if 'adj close' in df.columns:
+            df.rename(columns={'adj close': 'close'}, inplace=True)
+
+        # Ensure we have required columns
+        required_cols = ['open', 'high', 'low', 'close', 'volume']
+        for col in required_cols:
+            if col not in df.columns:
+                raise ValueError(f"Missing column: {col}")
+
+        return df
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
@@ -0,0 +1,138 @@
+# data/synthetic.py - Deterministic synthetic OHLCV (regime-switching GBM with gaps)
+import numpy as np
+import pandas as pd
+
+# (name, log drift per bar, volatility per bar) of the regimes the walk switches
+# between; drifts cancel out on average so long histories stay at a sane price
+REGIMES = (
+    ('bull', 0.00002, 0.0010),
+    ('bear', -0.00002, 0.0020),
+    ('sideways', 0.0, 0.0006),
+)
+
+# The same regimes scaled for daily bars (a few months each, mild upward drift)
+DAILY_REGIMES = (
+    ('bull', 0.0008, 0.012),
+    ('bear', -0.0006, 0.022),
+    ('sideways', 0.0001, 0.008),
+)
+
+
+def regime_path(n, rng, regimes=REGIMES, mean_length=2000):
+    """Regime index per bar: runs of geometric length (mean `mean_length` bars)"""
+    lengths = []
+    total = 0
+    while total < n:
+        block = rng.geometric(1.0 / mean_length, size=max(16, 2 * n // mean_length))
+        lengths.append(block)
+        total += int(block.sum())
+    lengths = np.concatenate(lengths)
+    lengths = lengths[:np.searchsorted(np.cumsum(lengths), n) + 1]
+    # Each run picks a different regime than the previous one
+    steps = rng.integers(1, len(regimes), size=len(lengths))
+    ids = np.cumsum(steps) % len(regimes)
+    return np.repeat(ids, lengths)[:n]
+
+
+def synthetic_bars(n, seed=42, price=100.0, regimes=REGIMES, mean_regime_length=2000,
+                   gap_probability=0.002, gap_volatility=0.01):
+    """open/high/low/close/volume arrays of synthetic_ohlcv, without the frame and index"""
+    rng = np.random.default_rng(seed)
+    regime = regime_path(n, rng, regimes, mean_regime_length)
+    drift = np.array([r[1] for r in regimes])[regime]
+    vol = np.array([r[2] for r in regimes])[regime]
+
+    # Log return of each bar: GBM step plus an occasional gap at the open
+    body = drift + vol * rng.standard_normal(n)
+    gaps = np.where(rng.random(n) < gap_probability, rng.normal(0.0, gap_volatility, n), 0.0)
+    gaps[0] = 0.0
+    log_close = np.log(price) + np.cumsum(gaps + body)
+    close = np.exp(log_close)
+    open_ = np.exp(log_close - body)
+    del log_close, body, gaps
+
+    # Intrabar range beyond the open/close, scaled by the regime's volatility
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0.0, 0.5, n)) * vol)
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0.0, 0.5, n)) * vol)
+    volume = np.round(rng.lognormal(10.0, 0.5, n) * (vol / regimes[0][2])).astype(float)
+
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+def synthetic_frame(index, seed=42, price=100.0, **kwargs):
+    """synthetic_bars laid on a given index (no returns column); kwargs go to synthetic_bars"""
+    return pd.DataFrame(synthetic_bars(len(index), seed, price, **kwargs), index=index)
+
+
+def synthetic_ohlcv(n, seed=42, start='2000-01-03', freq='min', price=100.0, regimes=REGIMES,
+                    mean_regime_length=2000, gap_probability=0.002, gap_volatility=0.01):
+    """n bars of geometric Brownian motion whose drift/volatility switch between regimes
+
+    With probability gap_probability a bar opens away from the previous
+    close (log gap ~ N(0, gap_volatility)), like an overnight or news gap.
+    The same (n, seed, ...) always gives the same bars. The frame has
+    the columns DataFetcher returns, 'returns' included, on a regular
+    `freq` index (minutes by default: 10M daily bars would run past the
+    last date pandas can represent).
+    """
+    df = synthetic_frame(pd.date_range(start, periods=n, freq=freq), seed, price, regimes=regimes,
+                         mean_regime_length=mean_regime_length, gap_probability=gap_probability,
+                         gap_volatility=gap_volatility)
+    df['returns'] = df['close'].pct_change()
+    return df
+
+
+def session_minutes(start, sessions):
+    """UTC index of regular-hours minute bars (09:30-16:00 ET, 390 a session) over business days"""
+    days = pd.bdate_range(start, periods=sessions, tz='US/Eastern')
+    return pd.DatetimeIndex(np.concatenate([
+        (day + pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(390), unit='min')).values
+        for day in days
+    ])).tz_localize('UTC')
+
+
+def synthetic_minute_bars(symbols, sessions=5, seed=11, start='2024-01-02'):
+    """{symbol: regular-hours minute bars}, an independent series per symbol (for stream replay)"""
+    index = session_minutes(start, sessions)
+    frames = {}
+    for k, symbol in enumerate(symbols):
+        df = synthetic_frame(index, seed=seed + k)
+        df['volume'] = df['volume'].astype(np.int64)
+        frames[symbol] = df
+    return frames
+
+
+def synthetic_daily_bars(start='2015-01-01', end='2030-12-31', seed=7, price=150.0):
+    """Business-day bars stamped at 04:00 UTC, like the Alpaca daily bars API"""
+    index = pd.bdate_range(start, end, tz='UTC') + pd.Timedelta(hours=4)
+    df = synthetic_frame(index, seed, price, regimes=DAILY_REGIMES, mean_regime_length=60,
+                         gap_probability=0.05, gap_volatility=0.02)
+    df['volume'] = (df['volume'] * 100).astype(np.int64)
+    return df
+
+
+def synthetic_panel(n, symbols, seed=42, start='2000-01-03', freq='B', listing_probability=0.2, **kwargs):
+    """A data.universe.PricePanel of `symbols` independent synthetic_ohlcv series
+
+    symbols is a count or a list of names. With probability
+    listing_probability a symbol lists later than the first bar or
+    delists before the last (NaN outside its life), like a real universe.
+    Business-day bars by default, so 20 years is about 5,040 bars.
+    """
+    from data.universe import PricePanel
+
+    names = [f"SYN{i:04d}" for i in range(symbols)] if isinstance(symbols, int) else list(symbols)
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq=freq)
+    fields = ['open', 'high', 'low', 'close', 'volume']
+    values = np.empty((n, len(names), len(fields)))
+    for column in range(len(names)):
+        bars = synthetic_bars(n, seed=seed + 1 + column, price=float(rng.uniform(10, 500)), **kwargs)
+        for k, field in enumerate(fields):
+            values[:, column, k] = bars[field]
+        if rng.random() < listing_probability:
+            listed, delisted = np.sort(rng.integers(0, n, size=2))
+            values[:listed, column, :] = np.nan
+            if rng.random() < 0.5:
+                values[delisted + 1:, column, :] = np.nan
+    return PricePanel(index, names, fields, values)
@@ -0,0 +1,134 @@
+# data/universe.py - Concurrent multi-symbol data loading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data.cache import OHLCV_COLUMNS
+from data.data_fetcher import DataFetcher
+
+
+class PricePanel:
+    """Dense time x symbol x field price array on a shared calendar
+
+    Bars a symbol does not have on a calendar date (not yet listed,
+    halted, failed download) are NaN.
+    """
+
+    def __init__(self, index, symbols, fields, values, errors=None):
+        self.index = index
+        self.symbols = list(symbols)
+        self.fields = list(fields)
+        self.values = values
+        self.errors = errors or {}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def field(self, name):
+        """2-D (time x symbol) array for one field, e.g. panel.field('close')"""
+        return self.values[:, :, self.fields.index(name)]
+
+    def __getitem__(self, name):
+        """time x symbol DataFrame of one field, so panel['close'] reads like a frame column"""
+        return pd.DataFrame(self.field(name), index=self.index, columns=self.symbols)
+
+    def frame(self, symbol):
+        """Single-symbol OHLCV DataFrame with returns, as DataFetcher returns it"""
+        column = self.symbols.index(symbol)
+        df = pd.DataFrame(self.values[:, column, :], index=self.index, columns=self.fields)
+        df = df.dropna(how='all')
+        if 'close' in df.columns:
+            df['returns'] = df['close'].pct_change()
+        return df
+
+    def __repr__(self):
+        return (f"PricePanel({len(self.index)} bars x {len(self.symbols)} symbols "
+                f"x {len(self.fields)} fields, {len(self.errors)} errors)")
+
+
+class YahooSource:
+    """Default universe source: DataFetcher, including its on-disk cache"""
+
+    def __init__(self, cache_dir=None, offline=None, use_cache=True):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.use_cache = use_cache
+
+    def __call__(self, symbol, start_date, end_date):
+        fetcher = DataFetcher(symbol, start_date, end_date, cache_dir=self.cache_dir,
+                              offline=self.offline, use_cache=self.use_cache, verbose=False)
+        return fetcher.load()
+
+
+class UniverseLoader:
+    """Fetch many symbols concurrently and align them into a PricePanel
+
+    `source` is any callable taking (symbol, start_date, end_date) and
+    returning an OHLCV DataFrame indexed by timestamp; it defaults to
+    Yahoo Finance through DataFetcher. A failing symbol is recorded in
+    panel.errors and left out of the panel instead of aborting the load.
+    """
+
+    def __init__(self, start_date, end_date, source=None, max_workers=8, fields=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.source = source or YahooSource()
+        self.max_workers = max_workers
+        self.fields = fields or OHLCV_COLUMNS
+
+    def fetch_all(self, symbols):
+        """Fetch every symbol with bounded concurrency, returning (frames, errors)"""
+        frames, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.source, symbol, self.start_date, self.end_date): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    df = future.result()
+                    if df is None or len(df) == 0:
+                        raise ValueError("no data returned")
+                    frames[symbol] = df
+                except Exception as e:
+                    errors[symbol] = str(e)
+        return frames, errors
+
+    def load(self, symbols):
+        """Fetch and align a universe into a time x symbol x field panel"""
+        symbols = list(dict.fromkeys(symbols))
+        print(f"📥 Loading universe of {len(symbols)} symbols ({self.max_workers} workers)...")
+        frames, errors = self.fetch_all(symbols)
+
+        # Keep the requested symbol order, minus the ones that failed
+        loaded = [s for s in symbols if s in frames]
+        index = self._shared_calendar([frames[s] for s in loaded])
+
+        values = np.full((len(index), len(loaded), len(self.fields)), np.nan)
+        for column, symbol in enumerate(loaded):
+            df = frames[symbol]
+            if df.index.tz is not None and index.tz is not None:
+                df = df.tz_convert(index.tz)
+            values[:, column, :] = df.reindex(index)[self.fields].to_numpy(dtype=float)
+
+        print(f"✅ Loaded {len(loaded)} symbols over {len(index)} bars")
+        for symbol, error in errors.items():
+            print(f"   ❌ {symbol}: {error}")
+
+        return PricePanel(index, loaded, self.fields, values, errors)
+
+    @staticmethod
+    def _shared_calendar(frames):
+        if not frames:
+            return pd.DatetimeIndex([])
+        tz = frames[0].index.tz
+        index = frames[0].index
+        for df in frames[1:]:
+            other = df.index
+            if tz is not None and other.tz is not None:
+                other = other.tz_convert(tz)
+            index = index.union(other)
+        return index.sort_values()
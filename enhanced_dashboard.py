@@ -1,31 +1,47 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-import alpaca_trade_api as tradeapi
+import argparse
+from datetime import datetime
 import os
 from dotenv import load_dotenv
-import numpy as np
 
-from config.settings import ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL
+from config.settings import (
+    JOURNAL_FILE,
+    DASHBOARD_STATE_FILE, DASHBOARD_CHART_FILE, DASHBOARD_HOST, DASHBOARD_PORT
+)
+from trading.journal import Journal
+from utils.performance import PerformanceStats, StatsRefresher
 
 load_dotenv()
 
 class LiveDashboard:
-    def __init__(self):
-        self.api = tradeapi.REST(
-            ALPACA_API_KEY,
-            ALPACA_SECRET_KEY,
-            ALPACA_BASE_URL,
-            api_version='v2'
-        )
+    def __init__(self, journal_path=JOURNAL_FILE, state_file=DASHBOARD_STATE_FILE,
+                 chart_file=DASHBOARD_CHART_FILE, broker=None):
+        self.journal_path = journal_path
+        self.state_file = state_file
+        self.chart_file = chart_file
+        self.broker = broker
     
-    def show_dashboard(self):
+    def fetch_live(self):
+        """Account, positions and the last 5 orders in one concurrent round (shared broker cache)"""
+        import asyncio
+        from trading.cache import cached_broker
+
+        async def fetch():
+            async with (self.broker or cached_broker()) as broker:
+                return await asyncio.gather(
+                    broker.get_account(), broker.list_positions(), broker.list_orders(status='all', limit=5),
+                    return_exceptions=True)
+        return asyncio.run(fetch())
+    
+    def show_dashboard(self, show_chart=False):
         print("\n" + "="*70)
         print("📊 LIVE TRADING BOT DASHBOARD")
         print("="*70)
         
+        account, positions, orders = self.fetch_live()
+        
         # 1. LIVE ACCOUNT STATUS
-        account = self.api.get_account()
+        if isinstance(account, Exception):
+            raise account
         equity = float(account.equity)
         buying_power = float(account.buying_power)
         
@@ -37,7 +53,8 @@ class LiveDashboard:
         # 2. CURRENT POSITIONS
         print(f"\n📦 LIVE POSITIONS:")
         try:
-            positions = self.api.list_positions()
+            if isinstance(positions, Exception):
+                raise positions
             if positions:
                 total_value = 0
                 total_pnl = 0
@@ -57,7 +74,8 @@ class LiveDashboard:
         # 3. RECENT ORDERS
         print(f"\n📝 RECENT ORDERS (Last 5):")
         try:
-            orders = self.api.list_orders(limit=5, status='all')
+            if isinstance(orders, Exception):
+                raise orders
             for order in orders:
                 filled_price = f"@ ${order.filled_avg_price}" if order.filled_avg_price else ""
                 print(f"   {order.side.upper()} {order.qty} {order.symbol} {filled_price}")
@@ -65,37 +83,32 @@ class LiveDashboard:
         except:
             print("   Error fetching orders")
         
-        # 4. HISTORICAL PERFORMANCE
-        if os.path.exists('trading_log.csv'):
-            df = pd.read_csv('trading_log.csv')
-            if len(df) > 0:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df['equity'] = df['equity'].astype(float)
-                
-                initial = df['equity'].iloc[0]
-                current = df['equity'].iloc[-1]
-                total_return = ((current - initial) / initial) * 100
-                
+        # 4. HISTORICAL PERFORMANCE (running aggregates, new journal events only)
+        if os.path.exists(self.journal_path):
+            stats = PerformanceStats.load(self.state_file, self.journal_path)
+            new_events = stats.update(Journal(self.journal_path))
+            summary = stats.summary()
+            if stats.sessions > 0:
                 print(f"\n📈 PERFORMANCE SUMMARY:")
-                print(f"   Starting Equity: ${initial:,.2f}")
-                print(f"   Current Equity: ${current:,.2f}")
-                print(f"   Total Return: {total_return:+.3f}%")
-                print(f"   Total P&L: ${(current - initial):+.2f}")
-                print(f"   Trading Days: {len(df)}")
+                print(f"   Starting Equity: ${summary['initial_equity']:,.2f}")
+                print(f"   Current Equity: ${summary['current_equity']:,.2f}")
+                print(f"   Total Return: {summary['total_return_pct']:+.3f}%")
+                print(f"   Total P&L: ${summary['total_pnl']:+.2f}")
+                print(f"   Trading Days: {stats.sessions}")
                 
                 # Daily returns
-                if len(df) > 1:
-                    df['daily_return'] = df['equity'].pct_change() * 100
-                    avg_daily = df['daily_return'].mean()
-                    best_day = df['daily_return'].max()
-                    worst_day = df['daily_return'].min()
-                    
-                    print(f"   Avg Daily Return: {avg_daily:+.3f}%")
-                    print(f"   Best Day: {best_day:+.3f}%")
-                    print(f"   Worst Day: {worst_day:+.3f}%")
+                if stats.sessions > 1:
+                    print(f"   Avg Daily Return: {summary['avg_return_pct']:+.3f}%")
+                    print(f"   Best Day: {summary['best_return_pct']:+.3f}%")
+                    print(f"   Worst Day: {summary['worst_return_pct']:+.3f}%")
+                print(f"   Max Drawdown: {summary['max_drawdown_pct']:.3f}%")
                 
-                # Generate chart
-                self.generate_chart(df)
+                # Chart only redrawn when the journal has new events
+                if stats.render(self.chart_file, show=show_chart):
+                    print(f"📊 Dashboard chart saved: {self.chart_file} ({new_events} new journal events)")
+                else:
+                    print(f"📊 Dashboard chart up to date: {self.chart_file}")
+            stats.save(self.state_file)
         
         # 5. NEXT SESSION INFO
         print(f"\n⏰ NEXT SESSION:")
@@ -106,63 +119,51 @@ class LiveDashboard:
         print(f"\n" + "="*70)
         print("💡 Commands: python auto_trading_system.py | ./run_daily.sh | crontab -l")
         print("="*70)
-    
-    def generate_chart(self, df):
-        """Generate performance chart"""
-        plt.figure(figsize=(12, 8))
-        
-        # Equity curve
-        plt.subplot(2, 2, 1)
-        plt.plot(df['timestamp'], df['equity'], 'b-', linewidth=2, label='Equity')
-        plt.fill_between(df['timestamp'], df['equity'], df['equity'].min(), alpha=0.1)
-        plt.title('Account Equity Over Time', fontsize=12)
-        plt.xlabel('Date')
-        plt.ylabel('Equity ($)')
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # Daily returns
-        plt.subplot(2, 2, 2)
-        if 'daily_return' in df.columns:
-            colors = ['green' if x >= 0 else 'red' for x in df['daily_return']]
-            plt.bar(range(len(df)), df['daily_return'], color=colors, alpha=0.7)
-            plt.axhline(y=0, color='black', linestyle='-', alpha=0.3)
-            plt.title('Daily Returns (%)', fontsize=12)
-            plt.xlabel('Session')
-            plt.ylabel('Return %')
-            plt.grid(True, alpha=0.3)
-        
-        # Signal distribution
-        plt.subplot(2, 2, 3)
-        if 'signal' in df.columns:
-            signals = df['signal'].value_counts()
-            plt.pie(signals.values, labels=signals.index, autopct='%1.1f%%', 
-                   colors=['green', 'red', 'gray'])
-            plt.title('Signal Distribution', fontsize=12)
-        
-        # Drawdown
-        plt.subplot(2, 2, 4)
-        if 'equity' in df.columns:
-            running_max = df['equity'].expanding().max()
-            drawdown = (df['equity'] - running_max) / running_max * 100
-            plt.fill_between(df['timestamp'], drawdown, 0, color='red', alpha=0.3)
-            plt.plot(df['timestamp'], drawdown, 'r-', alpha=0.7)
-            plt.title('Drawdown (%)', fontsize=12)
-            plt.xlabel('Date')
-            plt.ylabel('Drawdown %')
-            plt.grid(True, alpha=0.3)
-            plt.ylim([drawdown.min() - 1, 1])
-        
-        plt.tight_layout()
-        plt.savefig('trading_dashboard.png', dpi=120, bbox_inches='tight')
-        print(f"📊 Dashboard chart saved: trading_dashboard.png")
-        
-        # Show if in interactive environment
-        try:
-            plt.show()
-        except:
-            pass
 
-if __name__ == "__main__":
+
+def serve(journal_path=JOURNAL_FILE, state_file=DASHBOARD_STATE_FILE, chart_file=DASHBOARD_CHART_FILE,
+          host=DASHBOARD_HOST, port=DASHBOARD_PORT):
+    """Serve the precomputed stats as JSON (GET /stats) and the chart (GET /chart.png)
+
+    Each request first folds in journal events written since the previous
+    one, so a refresh costs a primary-key lookup, not a recomputation.
+    No broker calls are made.
+    """
+    from aiohttp import web
+
+    refresher = StatsRefresher(Journal(journal_path), PerformanceStats.load(state_file, journal_path),
+                               state_file)
+
+    async def stats(request):
+        return web.json_response(refresher.refresh().summary())
+
+    async def chart(request):
+        performance = refresher.refresh()
+        if performance.sessions == 0:
+            raise web.HTTPNotFound(text="No equity snapshots in the journal yet")
+        if performance.render(chart_file):
+            performance.save(state_file)
+        return web.FileResponse(chart_file)
+
+    app = web.Application()
+    app.router.add_get('/stats', stats)
+    app.router.add_get('/chart.png', chart)
+    print(f"📡 Dashboard stats: http://{host}:{port}/stats (chart: /chart.png)")
+    web.run_app(app, host=host, port=port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live account dashboard and performance chart")
+    parser.add_argument('--serve', action='store_true', help="serve the stats as JSON over HTTP instead")
+    parser.add_argument('--port', type=int, default=DASHBOARD_PORT)
+    parser.add_argument('--show', action='store_true', help="open the chart in a window (interactive backend)")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(port=args.port)
+        return
     dashboard = LiveDashboard()
-    dashboard.show_dashboard()
+    dashboard.show_dashboard(show_chart=args.show)
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import (
     SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE, 
-    INITIAL_CAPITAL, COMMISSION
+    INITIAL_CAPITAL, COMMISSION, BACKTEST_ENGINE, MONTE_CARLO_PATHS
 )
 from data.data_fetcher import DataFetcher
 from strategies.main_strategy import SimpleCombinedWithATR
 from backtesting.backtester import Backtester
-import matplotlib.pyplot as plt
+from backtesting.robustness import monte_carlo
+from utils.telemetry import telemetry
 
 def main():
     print("="*60)
@@ -19,7 +20,8 @@ def main():
     # Initialize
     fetcher = DataFetcher(SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE)
     strategy = SimpleCombinedWithATR()
-    backtester = Backtester(initial_capital=INITIAL_CAPITAL, commission=COMMISSION)
+    backtester = Backtester(initial_capital=INITIAL_CAPITAL, commission=COMMISSION,
+                            engine=BACKTEST_ENGINE)
     
     # Fetch data
     print(f"\n1. Fetching {SYMBOL} data...")
@@ -37,20 +39,33 @@ def main():
         print(f"{key:25}: {value}")
     print("="*60)
     
+    # Robustness: how much could these numbers move on a different path?
+    if MONTE_CARLO_PATHS > 0:
+        report = monte_carlo(results, n_paths=MONTE_CARLO_PATHS, method='block')
+        intervals = report.confidence_intervals(0.90)
+        print(f"\n🎲 MONTE CARLO ({report.n_paths:,} block-bootstrap paths, 90% interval)")
+        low, high = intervals['total_return']
+        print(f"{'Total Return':25}: {low*100:+.2f}% to {high*100:+.2f}%")
+        low, high = intervals['sharpe']
+        print(f"{'Sharpe Ratio':25}: {low:.2f} to {high:.2f}")
+        low, high = intervals['max_drawdown']
+        print(f"{'Max Drawdown':25}: {low*100:.2f}% to {high*100:.2f}%")
+    
     # Save to CSV
     results.to_csv(f'trading_results_{SYMBOL}.csv')
     print(f"\n📄 Results saved to: trading_results_{SYMBOL}.csv")
     
     # Plot
     print("\n3. Generating charts...")
-    fig = backtester.plot_results(results, SYMBOL)
-    fig.savefig('trading_charts.png', dpi=300, bbox_inches='tight')
+    with telemetry.span('plot'):
+        fig = backtester.plot_results(results, SYMBOL)
+        fig.savefig('trading_charts.png', dpi=300, bbox_inches='tight')
     
     print("\n✅ Trading bot complete!")
     print(f"   Strategy: {strategy.ma_fast}/{strategy.ma_slow} EMA + RSI + ATR")
     print(f"   Period: {BACKTEST_START_DATE} to {BACKTEST_END_DATE}")
     print(f"   Initial Capital: ${INITIAL_CAPITAL:,}")
-    print(f"   Final Portfolio: ${float(metrics['Final Portfolio Value'][1:].replace(',','')):,.2f}")
+    print(f"   Final Portfolio: ${metrics.final_value:,.2f}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import (
+    SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE,
+    INITIAL_CAPITAL, COMMISSION
+)
+from backtesting.backtester import Backtester
+from data.data_fetcher import DataFetcher
+from backtesting.optimizer import (
+    DEFAULT_SPACE, ParameterSweep, grid_search_space, random_search_space
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel strategy parameter sweep")
+    parser.add_argument('--random', type=int, metavar='N',
+                        help="evaluate N random combinations instead of the full grid")
+    parser.add_argument('--seed', type=int, default=None, help="seed for --random")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--results', default=f'sweep_results_{SYMBOL}.jsonl',
+                        help="resumable results file")
+    parser.add_argument('--top', type=int, default=10, help="number of best results to print")
+    parser.add_argument('--engine', choices=Backtester.ENGINES, default=None,
+                        help="backtest engine (default: BACKTEST_ENGINE, or event when ATR parameters vary)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🔎 TRADING BOT - PARAMETER SWEEP")
+    print("="*60)
+
+    df = DataFetcher(SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE).fetch_historical_data()
+    if df is None:
+        return
+
+    if args.random:
+        combos = random_search_space(DEFAULT_SPACE, args.random, seed=args.seed)
+    else:
+        combos = grid_search_space(DEFAULT_SPACE)
+
+    sweep = ParameterSweep(df, args.results, initial_capital=INITIAL_CAPITAL,
+                           commission=COMMISSION, max_workers=args.workers, engine=args.engine)
+    sweep.run(combos)
+
+    print("\n" + "="*60)
+    print(f"🏆 TOP {args.top} BY SHARPE")
+    print("="*60)
+    for result in sweep.store.best(args.top):
+        params = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"Sharpe {result['sharpe']:6.2f} | Return {result['total_return']*100:+7.2f}% | "
+              f"MaxDD {result['max_drawdown']*100:6.2f}% | {params}")
+    print("="*60)
+    print(f"📄 All results: {args.results}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import sys
+import os
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+import warnings
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import INITIAL_CAPITAL, COMMISSION
+from data.synthetic import synthetic_ohlcv
+from strategies.main_strategy import SimpleCombinedWithATR
+from backtesting.backtester import Backtester
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(ROOT, 'perf_baseline.json')
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+STAGES = ('indicators', 'signals', 'backtest', 'metrics', 'plot')
+
+
+class Pipeline:
+    """One strategy/backtester pair over one synthetic frame; each stage is a method"""
+
+    def __init__(self, df, engine):
+        self.df = df
+        self.strategy = SimpleCombinedWithATR(verbose=False)
+        self.backtester = Backtester(INITIAL_CAPITAL, COMMISSION, verbose=False, engine=engine)
+        self.results = None
+
+    def indicators(self):
+        return self.strategy.calculate_indicators(self.df)
+
+    def signals(self):
+        return self.strategy.generate_signals(self.df)
+
+    def backtest(self):
+        self.results = None  # Don't hold the previous run's frame while building the next
+        self.results, _ = self.backtester.run_backtest(self.df, self.strategy)
+        return self.results
+
+    def metrics(self):
+        return self.backtester.calculate_metrics(self.results)
+
+    def plot(self):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            # matplotlib warns that legend placement is slow on millions of points
+            warnings.simplefilter('ignore', UserWarning)
+            fig = self.backtester.plot_results(self.results, 'SYNTH')
+            fig.savefig(io.BytesIO(), format='png', dpi=100)
+        plt.close(fig)
+
+
+def measure(stage, n, runs):
+    """{seconds (median), bars_per_second, peak_mb (traced allocations)} of one stage"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        stage()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds = statistics.median(times)
+    return {'seconds': round(seconds, 6), 'bars_per_second': round(n / seconds),
+            'peak_mb': round(peak / 1e6, 2)}
+
+
+def check(result, base, tolerance, mem_tolerance, slack_ms):
+    """Regression messages of one stage against its baseline entry"""
+    problems = []
+    time_limit = base['seconds'] * (1 + tolerance) + slack_ms / 1000
+    if result['seconds'] > time_limit:
+        problems.append(f"time {result['seconds']*1000:.1f} ms > {time_limit*1000:.1f} ms")
+    mem_limit = base['peak_mb'] * (1 + mem_tolerance) + 1.0
+    if result['peak_mb'] > mem_limit:
+        problems.append(f"memory {result['peak_mb']:.1f} MB > {mem_limit:.1f} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest pipeline benchmarks on synthetic bars")
+    parser.add_argument('--sizes', default='1k,100k,1m',
+                        help=f"comma separated, from {', '.join(SIZES)} (10m needs ~4.5 GB of RAM)")
+    parser.add_argument('--stages', default=','.join(STAGES), help="comma separated subset of the stages")
+    parser.add_argument('--engine', choices=Backtester.ENGINES, default='vectorized')
+    parser.add_argument('--runs', type=int, default=3, help="timed runs per stage (median counts)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--update', action='store_true', help="record the results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="allowed slowdown over the baseline (default 0.3 = +30%%)")
+    parser.add_argument('--mem-tolerance', type=float, default=0.1,
+                        help="allowed growth of peak memory (default 0.1 = +10%%)")
+    parser.add_argument('--slack-ms', type=float, default=5.0,
+                        help="absolute time allowance on top, so tiny stages are not flaky")
+    args = parser.parse_args()
+
+    sizes = [s.strip().lower() for s in args.sizes.split(',')]
+    stages = [s.strip() for s in args.stages.split(',')]
+    unknown = [s for s in sizes if s not in SIZES] + [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown size/stage: {', '.join(unknown)}")
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+    recorded = baseline.setdefault(args.engine, {})
+
+    print(f"🏁 PIPELINE BENCHMARKS ({args.engine} engine, {args.runs} runs per stage, median counts)")
+    print("="*78)
+    print(f"   {'size':>5} {'stage':11} {'time':>11} {'bars/s':>13} {'peak mem':>10}")
+    failures = []
+    for size in sizes:
+        n = SIZES[size]
+        pipeline = Pipeline(synthetic_ohlcv(n, seed=args.seed), args.engine)
+        # metrics and plot run on a backtest result
+        if 'backtest' not in stages and {'metrics', 'plot'} & set(stages):
+            pipeline.backtest()
+        for name in stages:
+            result = measure(getattr(pipeline, name), n, args.runs)
+            line = (f"{size:>5} {name:11} {result['seconds']*1000:>8.1f} ms {result['bars_per_second']:>13,} "
+                    f"{result['peak_mb']:>7.1f} MB")
+            if args.update:
+                recorded.setdefault(size, {})[name] = result
+                print(f"📝 {line}")
+                continue
+            base = recorded.get(size, {}).get(name)
+            if base is None:
+                print(f"⚠️  {line}  (no baseline - run with --update)")
+                continue
+            problems = check(result, base, args.tolerance, args.mem_tolerance, args.slack_ms)
+            print(f"{'❌' if problems else '✅'} {line}  ({result['seconds'] / base['seconds']:.2f}x)"
+                  + (f"  {'; '.join(problems)}" if problems else ""))
+            if problems:
+                failures.append(f"{size}/{name}")
+        del pipeline
+
+    if args.update:
+        baseline['_machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                                'processor': platform.machine()}
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n📄 Baseline saved to: {os.path.basename(BASELINE_FILE)}")
+        return
+
+    print("="*78)
+    if failures:
+        print(f"❌ Performance regressions: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
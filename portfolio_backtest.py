@@ -0,0 +1,75 @@
+import sys
+import os
+import argparse
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config.settings import (
+    SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE, INITIAL_CAPITAL, COMMISSION
+)
+from strategies.main_strategy import SimpleCombinedWithATR
+from backtesting.portfolio import PortfolioBacktester
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the strategy across a universe with shared capital")
+    parser.add_argument('--symbols', default=SYMBOL, help="comma separated tickers")
+    parser.add_argument('--synthetic', type=int, metavar='SYMBOLS',
+                        help="use this many synthetic symbols instead of market data")
+    parser.add_argument('--bars', type=int, default=5040, help="bars per synthetic symbol (5040 = 20 years daily)")
+    parser.add_argument('--max-gross', type=float, help="cap on summed position weights")
+    parser.add_argument('--rebalance-every', type=int, help="also rebalance to target every N bars")
+    parser.add_argument('--output', help="save the per-bar portfolio frame to this CSV")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from data.synthetic import synthetic_panel
+        panel = synthetic_panel(args.bars, args.synthetic)
+    else:
+        from data.universe import UniverseLoader
+        symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+        panel = UniverseLoader(BACKTEST_START_DATE, BACKTEST_END_DATE).load(symbols)
+        if not panel.symbols:
+            print("❌ No data")
+            return
+
+    strategy = SimpleCombinedWithATR(verbose=False)
+    backtester = PortfolioBacktester(INITIAL_CAPITAL, COMMISSION, max_gross=args.max_gross,
+                                     rebalance_every=args.rebalance_every, verbose=False)
+    print("="*60)
+    print(f"🧺 PORTFOLIO BACKTEST: {len(panel.symbols)} symbols x {len(panel.index)} bars")
+    print("="*60)
+
+    started = time.perf_counter()
+    weights = backtester.target_weights(panel, strategy)
+    signals_done = time.perf_counter()
+    result, metrics = backtester.run(panel, weights=weights)
+    finished = time.perf_counter()
+    print(f"⚡ Signals: {signals_done - started:.2f}s | backtest: {finished - signals_done:.2f}s")
+
+    frame = result.frame()
+    print(f"   Rebalances: {int(frame['rebalance'].sum())} | avg gross exposure: "
+          f"{frame['gross_exposure'].mean()*100:.1f}% | avg positions: {frame['positions'].mean():.1f}")
+    print("\n" + "="*60)
+    print("📊 FINAL RESULTS (market = equal-weight universe)")
+    print("="*60)
+    for key, value in metrics.items():
+        print(f"{key:25}: {value}")
+    print("="*60)
+
+    trades = metrics.trades[metrics.trades['closed']]
+    if len(trades):
+        pnl = np.bincount(trades['symbol'], weights=trades['pnl'], minlength=len(panel.symbols))
+        print("\n🏆 BEST SYMBOLS (summed closed-trade return)")
+        for column in np.argsort(pnl)[::-1][:5]:
+            print(f"   {panel.symbols[column]:8} {pnl[column]*100:+.2f}%")
+
+    if args.output:
+        frame.to_csv(args.output)
+        print(f"\n📄 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
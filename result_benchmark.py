@@ -0,0 +1,88 @@
+import sys
+import os
+import argparse
+import functools
+import statistics
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from config.settings import INITIAL_CAPITAL, COMMISSION
+from data.synthetic import synthetic_ohlcv
+from strategies.main_strategy import SimpleCombinedWithATR
+from backtesting.backtester import Backtester
+
+
+def retained_bytes(result):
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    return result.nbytes
+
+
+def measure(backtester, df, runs):
+    """(median seconds, peak traced MB, retained bytes) of one backtest"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        backtester.run_backtest(df, SimpleCombinedWithATR(verbose=False))
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    result, _ = backtester.run_backtest(df, SimpleCombinedWithATR(verbose=False))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1e6, retained_bytes(result)
+
+
+def sweep_memory(lean, df, engine, runs):
+    """Traced MB still held after keeping `runs` results, as a sweep that keeps them would
+
+    Each run gets its own copy of the bars, like the windows of a walk
+    forward; lean results reload them from a source instead of keeping them.
+    """
+    backtester = Backtester(INITIAL_CAPITAL, COMMISSION, verbose=False, engine=engine, lean=lean)
+    source = functools.partial(synthetic_ohlcv, len(df), seed=5)
+    tracemalloc.start()
+    kept = [backtester.run_backtest(df.copy(), SimpleCombinedWithATR(verbose=False, fast_ma=5 + i), source=source)
+            for i in range(runs)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and speed of lean vs full backtest results")
+    parser.add_argument('--bars', default='2520,100000,1000000', help="comma separated history lengths")
+    parser.add_argument('--engine', choices=Backtester.ENGINES, default='vectorized')
+    parser.add_argument('--runs', type=int, default=5, help="timed runs per mode (median reported)")
+    parser.add_argument('--sweep', type=int, default=20, help="results kept in the sweep memory test")
+    args = parser.parse_args()
+
+    print(f"📏 RESULT MODES ({args.engine} engine)")
+    print("="*78)
+    print(f"{'bars':>10} {'mode':>5} {'time':>10} {'peak alloc':>12} {'kept':>12} {'kept/bar':>9}")
+    for n in [int(x) for x in args.bars.split(',')]:
+        df = synthetic_ohlcv(n, seed=5)
+        rows = {}
+        for lean in (False, True):
+            backtester = Backtester(INITIAL_CAPITAL, COMMISSION, verbose=False, engine=args.engine, lean=lean)
+            rows[lean] = measure(backtester, df, args.runs)
+            seconds, peak, kept = rows[lean]
+            print(f"{n:>10,} {'lean' if lean else 'full':>5} {seconds*1000:>8.1f}ms {peak:>10.1f}MB "
+                  f"{kept/1e6:>10.2f}MB {kept/n:>8.1f}B")
+        print(f"{'':>10} {'':>5} {rows[False][0]/rows[True][0]:>9.2f}x {rows[False][1]/rows[True][1]:>11.2f}x "
+              f"{rows[False][2]/rows[True][2]:>11.1f}x")
+
+    n = int(args.bars.split(',')[0])
+    df = synthetic_ohlcv(n, seed=5)
+    full, lean = sweep_memory(False, df, args.engine, args.sweep), sweep_memory(True, df, args.engine, args.sweep)
+    print("="*78)
+    print(f"🗃️  Keeping {args.sweep} results of {n:,} bars: full {full:.1f} MB, lean {lean:.1f} MB "
+          f"(metrics and trade ledgers included)")
+
+
+if __name__ == "__main__":
+    main()
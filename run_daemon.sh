@@ -0,0 +1,14 @@
+#!/bin/bash
+# Resident alternative to run_daily.sh: start once (e.g. from "@reboot" in crontab)
+# and the daemon wakes itself at DAEMON_SESSION_TIMES on the market clock
+cd /Users/ali/trading_bot
+source venv/bin/activate
+
+echo "========================================" >> trading_sessions.log
+echo "DAEMON START $(date)" >> trading_sessions.log
+echo "========================================" >> trading_sessions.log
+
+nohup python -u -m trading.daemon >> trading_sessions.log 2>&1 &
+
+echo "✅ Trading daemon started (PID $!)"
+echo "   Health: curl http://127.0.0.1:${DAEMON_PORT:-8787}/health"
@@ -0,0 +1,82 @@
+import sys
+import os
+import argparse
+import io
+import contextlib
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from data.synthetic import synthetic_ohlcv
+from strategies.main_strategy import SimpleCombinedWithATR
+
+
+def loop_signals(strategy, df):
+    """generate_signals as it was before vectorization: a per-row iloc loop for sizing
+    and a Python loop latching signals into positions (kept only for timing)"""
+    df = strategy.calculate_indicators(df)
+    df['signal'] = 0
+    df['position_size'] = 0.0
+    df['stop_loss'] = 0.0
+    buy_condition = ((df['ma_fast'] > df['ma_slow']) & (df['rsi'] > strategy.rsi_oversold) &
+                     (df['rsi'] < strategy.rsi_overbought))
+    sell_condition = (df['ma_fast'] < df['ma_slow']) | (df['rsi'] > strategy.rsi_overbought)
+    df.loc[buy_condition, 'signal'] = 1
+    df.loc[sell_condition, 'signal'] = -1
+
+    for i in range(len(df)):
+        if df['signal'].iloc[i] == 1 and df['atr'].iloc[i] > 0:
+            df.iloc[i, df.columns.get_loc('position_size')] = min(
+                strategy.risk_per_trade / (df['atr'].iloc[i] * strategy.atr_multiplier / df['close'].iloc[i]),
+                1.0
+            )
+            df.iloc[i, df.columns.get_loc('stop_loss')] = df['close'].iloc[i] - (df['atr'].iloc[i] * strategy.atr_multiplier)
+
+    position = 0
+    positions = []
+    for sig in df['signal']:
+        if sig == 1:
+            position = 1
+        elif sig == -1:
+            position = 0
+        positions.append(position)
+    df['position'] = positions
+    df['position'] = df['position'].shift(1).fillna(0)
+    return df
+
+
+def timed(fn, df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        result = fn(df)
+        return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate_signals: vectorized vs the original row loop")
+    parser.add_argument('--bars', default='10000,1000000,10000000', help="comma separated history lengths")
+    parser.add_argument('--loop-max', type=int, default=100_000,
+                        help="largest history to also run the loop version on (about 3 minutes per 1M bars)")
+    args = parser.parse_args()
+
+    strategy = SimpleCombinedWithATR(verbose=False)
+    print("⏱️  SIGNAL GENERATION (SimpleCombinedWithATR.generate_signals)")
+    print("="*66)
+    print(f"{'bars':>12} {'loop':>12} {'vectorized':>12} {'speedup':>9}  outputs")
+    for n in [int(x) for x in args.bars.split(',')]:
+        df = synthetic_ohlcv(n)
+        fast, vectorized = timed(strategy.generate_signals, df)
+        if n > args.loop_max:
+            print(f"{n:>12,} {'-':>12} {fast:>11.3f}s {'-':>9}")
+            continue
+        slow, looped = timed(lambda bars: loop_signals(strategy, bars), df)
+        same = all(np.array_equal(vectorized[c].to_numpy(), looped[c].to_numpy())
+                   for c in ('signal', 'position', 'position_size', 'stop_loss'))
+        print(f"{n:>12,} {slow:>11.3f}s {fast:>11.3f}s {slow / fast:>8.0f}x  {'identical' if same else 'DIFFER'}")
+        del looped
+    print("="*66)
+
+
+if __name__ == "__main__":
+    main()
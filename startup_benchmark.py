@@ -0,0 +1,101 @@
+import sys
+import os
+import argparse
+import json
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cli import COMMANDS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(ROOT, 'import_budgets.json')
+
+# Heavy third-party packages worth tracking per command; a command picking up
+# one it did not import when the budget was recorded is a regression even if
+# this machine happens to be fast enough to stay inside the time budget
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'yfinance', 'alpaca_trade_api',
+                 'aiohttp', 'requests', 'scipy', 'pytz')
+
+
+def measure(command, runs=3):
+    """(best total import ms, heavy top-level packages) for `cli.py --imports-only <command>`"""
+    best, heavy = None, set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', os.path.join(ROOT, 'cli.py'), '--imports-only', command],
+            capture_output=True, text=True, cwd=ROOT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{command} failed to import:\n{result.stderr[-2000:]}")
+
+        total_us = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            self_us, _, name = line[len('import time:'):].split('|')
+            if not self_us.strip().isdigit():
+                continue  # Header line
+            total_us += int(self_us)
+            package = name.strip().split('.')[0]
+            if package in HEAVY_MODULES:
+                heavy.add(package)
+        total_ms = total_us / 1000
+        best = total_ms if best is None else min(best, total_ms)
+    return best, sorted(heavy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-command import-time budgets (python -X importtime)")
+    parser.add_argument('commands', nargs='*', help="commands to check (default: all)")
+    parser.add_argument('--update', action='store_true', help="record the current timings as the budgets")
+    parser.add_argument('--runs', type=int, default=5, help="runs per command, best one counts")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="allowed slowdown over the recorded time (default 0.5 = +50%%)")
+    parser.add_argument('--slack-ms', type=float, default=25.0,
+                        help="absolute allowance on top, so tiny budgets are not flaky")
+    args = parser.parse_args()
+
+    budgets = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE) as f:
+            budgets = json.load(f)
+
+    commands = args.commands or list(COMMANDS)
+    print(f"⏱️  IMPORT-TIME BUDGETS ({args.runs} runs per command, best counts)")
+    print("="*72)
+    failures = []
+    for command in commands:
+        elapsed, heavy = measure(command, args.runs)
+        if args.update:
+            budgets[command] = {'import_ms': round(elapsed, 1), 'heavy_modules': heavy}
+            print(f"📝 {command:14} {elapsed:8.1f} ms  {', '.join(heavy) or '-'}")
+            continue
+
+        budget = budgets.get(command)
+        if budget is None:
+            print(f"⚠️  {command:14} {elapsed:8.1f} ms  (no budget recorded - run with --update)")
+            continue
+        limit = budget['import_ms'] * (1 + args.tolerance) + args.slack_ms
+        new_heavy = sorted(set(heavy) - set(budget['heavy_modules']))
+        ok = elapsed <= limit and not new_heavy
+        print(f"{'✅' if ok else '❌'} {command:14} {elapsed:8.1f} ms / {limit:7.1f} ms limit"
+              + (f"  new heavy imports: {', '.join(new_heavy)}" if new_heavy else ""))
+        if not ok:
+            failures.append(command)
+
+    if args.update:
+        with open(BUDGET_FILE, 'w') as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n📄 Budgets saved to: {os.path.basename(BUDGET_FILE)}")
+        return
+
+    print("="*72)
+    if failures:
+        print(f"❌ Import budget exceeded: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ All commands within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# strategies/base.py - Strategy interface for the shared indicator engine
+import numpy as np
+
+from strategies.engine import IndicatorGraph
+
+
+def latch_positions(signal, initial=0):
+    """Turn a 1/0/-1 signal array into a 0/1 position that holds between signals
+
+    initial is the position carried in from before the first bar (e.g. the
+    previous chunk of a longer history). A 2-D (time x symbol) signal
+    latches every column independently.
+    """
+    signal = np.asarray(signal)
+    n = len(signal)
+    # Index of the most recent non-zero signal at each bar (-1 before the first)
+    bars = np.arange(n).reshape((n,) + (1,) * (signal.ndim - 1))
+    last = np.where(signal != 0, bars, -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    positions = np.empty(signal.shape, dtype=np.int64)
+    positions[...] = initial
+    seen = last >= 0
+    if signal.ndim == 1:
+        positions[seen] = signal[last[seen]] == 1
+    else:
+        positions[seen] = np.take_along_axis(signal, np.maximum(last, 0), axis=0)[seen] == 1
+    return positions
+
+
+def atr_sized_signals(signal, close, atr, risk_per_trade, atr_multiplier):
+    """signal/position_size/stop_loss/position arrays from a 1/0/-1 signal and ATR sizing
+
+    Buy bars risk risk_per_trade of the portfolio on a stop atr_multiplier
+    ATRs below the close (position capped at 100%). The position latches
+    on at a buy and off at a sell, taking effect on the next bar. Arrays
+    may be 1-D or 2-D (time x symbol).
+    """
+    sized = (signal == 1) & (atr > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stop_distance = atr * atr_multiplier
+        position_size = np.where(sized, np.minimum(risk_per_trade / (stop_distance / close), 1.0), 0.0)
+        stop_loss = np.where(sized, close - stop_distance, 0.0)
+
+    latched = latch_positions(signal)
+    position = np.zeros(close.shape)
+    position[1:] = latched[:-1]
+    return {
+        'signal': signal, 'position_size': position_size,
+        'stop_loss': stop_loss, 'position': position,
+    }
+
+
+class Strategy:
+    """Signal logic over declared indicators
+
+    A strategy lists its inputs in requires() as {name: indicator key}
+    (keys as documented in strategies/engine.py, e.g. ('ema', 'close', 20))
+    and turns them into the signal/position_size/stop_loss/position
+    arrays in signal_arrays(df, indicators). StrategyEngine computes each
+    distinct key once for any number of strategies; run standalone, a
+    strategy computes its own through the same graph, memoized in its
+    cache (a strategies.indicators.IndicatorCache) when it has one.
+    """
+
+    verbose = False
+    cache = None
+
+    def requires(self):
+        raise NotImplementedError
+
+    def signal_arrays(self, df, indicators=None):
+        raise NotImplementedError
+
+    def indicator_arrays(self, df):
+        required = self.requires()
+        values = IndicatorGraph(df, cache=self.cache).compute(required.values())
+        return {name: values[key] for name, key in required.items()}
+
+    def calculate_indicators(self, df):
+        df = df.copy()
+        for name, values in self.indicator_arrays(df).items():
+            df[name] = values
+        return df
+
+    def generate_signals(self, df):
+        df = self.calculate_indicators(df)
+        for name, values in self.signal_arrays(df, indicators=df).items():
+            df[name] = values
+        return df
+
+    def describe(self):
+        return type(self).__name__
+
+    def __repr__(self):
+        return self.describe()
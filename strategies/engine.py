@@ -0,0 +1,258 @@
+# strategies/engine.py - Shared indicator dependency graph and multi-strategy evaluation
+import numpy as np
+import pandas as pd
+
+from strategies import indicators as kernels
+from utils.telemetry import telemetry
+
+# An indicator is identified by a key tuple: (kind, *params). A source is
+# either a raw column name or another key, so ('ema', 'close', 20) and
+# ('ema', ('gain', 'close'), 14) are both valid. EMAs, RSIs, true range
+# and rolling means go through the batched kernels in
+# strategies/indicators.py, which match the equivalent pandas calls bit
+# for bit; keys differing only in their period share one kernel call. The bars
+# may also be a data.universe.PricePanel: every key then comes out as a
+# (time x symbol) array, all symbols in the same kernel pass.
+#
+#   ('open',) ('high',) ('low',) ('close',) ('volume',)  raw columns
+#   ('ema', src, span)        ewm(span, adjust=False).mean()
+#   ('sma', src, period)      rolling(period).mean()
+#   ('highest', src, period)  rolling(period).max()
+#   ('lowest', src, period)   rolling(period).min()
+#   ('delta', src)            diff()
+#   ('gain', src) ('loss', src)  positive / negated negative deltas (0 otherwise)
+#   ('rsi', src, period)      EMA-smoothed RSI
+#   ('true_range',)           max(high - low, |high - prev close|, |low - prev close|)
+#   ('atr', period)           rolling mean of the true range
+
+RAW_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _source(src):
+    return (src,) if isinstance(src, str) else tuple(src)
+
+
+def normalize(key):
+    """Canonical form of an indicator key (plain ints, sources as tuples)"""
+    key = (key,) if isinstance(key, str) else tuple(key)
+    kind, params = key[0], key[1:]
+    if kind in RAW_COLUMNS:
+        return (kind,)
+    out = [kind]
+    for p in params:
+        if isinstance(p, (str, tuple, list)):
+            out.append(normalize(p))
+        else:
+            out.append(p.item() if hasattr(p, 'item') else p)
+    return tuple(out)
+
+
+def dependencies(key):
+    kind = key[0]
+    if kind in RAW_COLUMNS:
+        return []
+    if kind in ('ema', 'sma', 'highest', 'lowest', 'delta'):
+        return [_source(key[1])]
+    if kind in ('gain', 'loss'):
+        return [('delta', key[1])]
+    if kind == 'rsi':
+        return [_source(key[1])]
+    if kind == 'true_range':
+        return [('high',), ('low',), ('close',)]
+    if kind == 'atr':
+        return [('true_range',)]
+    raise ValueError(f"Unknown indicator: {key}")
+
+
+# Kinds whose last parameter is a period the kernel takes as a vector:
+# keys that differ only in that period are computed in one call
+BATCHED = {
+    'ema': kernels.ema,
+    'sma': kernels.rolling_mean,
+    'rsi': kernels.rsi,
+    'atr': kernels.rolling_mean,
+}
+
+
+def compute_batch(keys, inputs):
+    """{key: array} for keys sharing a BATCHED kind and source, in one kernel call"""
+    x = inputs[0]
+    batch = BATCHED[keys[0][0]](*inputs, [key[-1] for key in keys])
+    # Contiguous copies, so no result keeps the whole batch alive
+    return {key: np.ascontiguousarray(batch[:, :, k]).reshape(x.shape) for k, key in enumerate(keys)}
+
+
+def compute(key, inputs, df):
+    kind = key[0]
+    if kind in RAW_COLUMNS:
+        return df[kind].to_numpy(dtype=float)
+    if kind in BATCHED:
+        return compute_batch([key], inputs)[key]
+    x = inputs[0]
+    if kind in ('highest', 'lowest'):
+        rolling = (pd.DataFrame(x, copy=False) if x.ndim == 2 else pd.Series(x, copy=False)).rolling(key[2])
+        return (rolling.max() if kind == 'highest' else rolling.min()).to_numpy()
+    if kind == 'delta':
+        delta = np.empty_like(x)
+        delta[:1] = np.nan
+        np.subtract(x[1:], x[:-1], out=delta[1:])
+        return delta
+    if kind == 'gain':
+        return np.where(x > 0, x, 0.0)
+    if kind == 'loss':
+        return -np.where(x < 0, x, 0.0)
+    if kind == 'true_range':
+        return kernels.true_range(*inputs).reshape(x.shape)
+    raise ValueError(f"Unknown indicator: {key}")
+
+
+def _fingerprint(df):
+    """Content hash of the raw columns, identifying the bars in an IndicatorCache"""
+    fields = df.fields if hasattr(df, 'fields') else df.columns
+    return kernels.fingerprint(*(df[name].to_numpy(dtype=float) for name in RAW_COLUMNS if name in fields))
+
+
+class IndicatorGraph:
+    """Deduplicated indicator computation over one OHLCV frame
+
+    Requested keys and everything they depend on are put in topological
+    order; each distinct key is computed once however many requests share
+    it (the true range behind every ATR, the close behind every EMA, ...),
+    and keys differing only in their period (EMA 10 and 50, RSI 7 and 14)
+    come out of one batched kernel call. Intermediate results nobody asked
+    for are dropped as soon as their last consumer has run.
+
+    With a strategies.indicators.IndicatorCache, computed keys are also
+    memoized per (bar fingerprint, key), so graphs over identical bars
+    (e.g. every parameter set an optimizer worker evaluates) reuse them
+    instead of recomputing, and skip the inputs of anything found.
+    """
+
+    def __init__(self, df, cache=None):
+        self.df = df
+        self.cache = cache
+        self.fingerprint = _fingerprint(df) if cache is not None else None
+        self.values = {}
+        self.computed = 0
+        self.reused = 0
+
+    def _cached(self, key):
+        if self.cache is None or key[0] in RAW_COLUMNS:
+            return None
+        return self.cache.get((self.fingerprint, key))
+
+    def plan(self, keys):
+        """Keys to compute, dependencies first"""
+        order, seen = [], set()
+        for key in keys:
+            self._visit(normalize(key), order, seen)
+        return order
+
+    def _visit(self, key, order, seen):
+        if key in seen:
+            return
+        seen.add(key)
+        if key not in self.values:
+            value = self._cached(key)
+            if value is not None:
+                self.values[key] = value
+                self.reused += 1
+                return
+        for dep in dependencies(key):
+            self._visit(dep, order, seen)
+        order.append(key)
+
+    def compute(self, keys):
+        """{key: array} for the requested keys (as given)"""
+        keys = list(keys)
+        wanted = {normalize(k) for k in keys}
+        order = [k for k in self.plan(keys) if k not in self.values]
+        consumers = {}
+        for key in order:
+            for dep in dependencies(key):
+                consumers[dep] = consumers.get(dep, 0) + 1
+
+        for key in order:
+            deps = dependencies(key)
+            if key not in self.values:  # else computed with an earlier sibling
+                self._run(key, order, deps)
+            for dep in deps:
+                consumers[dep] -= 1
+                if consumers[dep] == 0 and dep not in wanted:
+                    del self.values[dep]
+        return {k: self.values[normalize(k)] for k in keys}
+
+    def _run(self, key, order, deps):
+        inputs = [self.values[d] for d in deps]
+        if key[0] in BATCHED:
+            siblings = [k for k in order if k[:-1] == key[:-1] and k not in self.values]
+            values = compute_batch(siblings, inputs)
+        else:
+            values = {key: compute(key, inputs, self.df)}
+        for k, value in values.items():
+            self.computed += 1
+            if self.cache is not None and k[0] not in RAW_COLUMNS:
+                # Shared with every later graph over these bars, so freeze it
+                value.flags.writeable = False
+                self.cache.put((self.fingerprint, k), value)
+            self.values[k] = value
+
+
+class StrategyEngine:
+    """Runs many strategies over the same bars with one shared indicator pass
+
+    Every strategy declares its inputs in requires() ({name: key}); the
+    union goes through one IndicatorGraph, then each strategy's
+    signal_arrays() runs on the shared arrays. Adding a variant that
+    reuses existing indicators costs only its signal logic. last_stats
+    holds the requested/computed indicator counts and stage timings. An
+    IndicatorCache carries indicators over from earlier runs on the same
+    bars (see IndicatorGraph).
+    """
+
+    def __init__(self, strategies, cache=None):
+        self.strategies = list(strategies)
+        self.cache = cache
+        self.last_stats = {}
+
+    def requirements(self):
+        return [strategy.requires() for strategy in self.strategies]
+
+    def indicators(self, df):
+        """{key: array} for every key any strategy requires"""
+        required = self.requirements()
+        keys = list(dict.fromkeys(normalize(k) for r in required for k in r.values()))
+        graph = IndicatorGraph(df, cache=self.cache)
+        with telemetry.span('engine_indicators'):
+            values = graph.compute(keys)
+        self.last_stats = {'strategies': len(self.strategies),
+                           'requested': sum(len(r) for r in required),
+                           'distinct': len(keys), 'computed': graph.computed, 'reused': graph.reused}
+        return values
+
+    def signal_arrays(self, df, values=None):
+        """Yields (strategy, signal arrays) for each strategy, sharing one indicator pass"""
+        values = self.indicators(df) if values is None else values
+        for strategy in self.strategies:
+            shared = {name: values[normalize(key)] for name, key in strategy.requires().items()}
+            # Close the span before yielding, so the caller's work isn't timed as ours
+            with telemetry.span('engine_signals'):
+                signals = strategy.signal_arrays(df, indicators=shared)
+            yield strategy, signals
+
+    def backtest(self, df, backtester):
+        """[(strategy, BacktestMetrics)] with compact results (one strategy's arrays in memory at a time)"""
+        results = []
+        for strategy, signals in self.signal_arrays(df):
+            _, metrics = backtester.run_lean(df, strategy, signals=signals)
+            results.append((strategy, metrics))
+        return results
+
+
+def rank(results, metric='sharpe', n=None):
+    """Results sorted by a BacktestMetrics attribute, best first (NaN last)"""
+    def score(item):
+        value = getattr(item[1], metric)
+        return -np.inf if value != value else value
+    ranked = sorted(results, key=score, reverse=True)
+    return ranked if n is None else ranked[:n]
@@ -0,0 +1,281 @@
+# strategies/incremental.py - Constant-time per-bar strategy state for live trading
+import copy
+import json
+import math
+import os
+from collections import deque
+
+import pandas as pd
+
+
+class EWMState:
+    """Running pandas ewm(adjust=False).mean() for a gap-free series"""
+
+    def __init__(self, alpha, value=None):
+        self.alpha = alpha
+        self.value = value
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        elif self.value != x:
+            # Same operation order as pandas so the result is bit-identical
+            one_minus = 1.0 - self.alpha
+            self.value = (one_minus * self.value + self.alpha * x) / (one_minus + self.alpha)
+        return self.value
+
+
+class RollingMeanState:
+    """Running pandas rolling(window).mean(), including its compensated summation
+
+    pandas keeps a Kahan-compensated running sum (separate compensation
+    terms for values entering and leaving the window) plus a few guards,
+    so a naive sum(window) / n differs in the last bits. Replicating the
+    same steps keeps live ATR identical to the backtest.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.nobs = 0
+        self.neg_ct = 0
+        self.num_same = 0
+        self.prev_value = None
+        self.value = math.nan
+
+    def update(self, x):
+        if self.window == 1 or self.prev_value is None:
+            # pandas restarts the sum whenever the window no longer overlaps
+            self.values.clear()
+            self.sum_x = self.compensation_add = self.compensation_remove = 0.0
+            self.nobs = self.neg_ct = self.num_same = 0
+            self.prev_value = x
+
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum_x + y
+                self.compensation_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        self.values.append(x)
+        if x == x:
+            self.nobs += 1
+            y = x - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, x) < 0:
+                self.neg_ct += 1
+            self.num_same = self.num_same + 1 if x == self.prev_value else 1
+            self.prev_value = x
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.num_same >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+        else:
+            result = math.nan
+        self.value = result
+        return result
+
+    def to_dict(self):
+        state = dict(self.__dict__)
+        state['values'] = list(self.values)
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.__dict__.update(state)
+        obj.values = deque(state['values'])
+        return obj
+
+
+def _span_alpha(span):
+    # pandas converts span -> centre of mass -> alpha
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+class IncrementalSignalState:
+    """SimpleCombinedWithATR, updated one bar at a time
+
+    Holds the EMA, RSI and ATR recursions plus the latched position, so
+    each new bar costs O(1) regardless of how much history came before.
+    Feeding it bars b0..bn gives exactly the same last-bar values as
+    strategy.generate_signals() on the frame b0..bn.
+    """
+
+    def __init__(self, strategy):
+        self.params = self.strategy_params(strategy)
+        self.rsi_oversold = strategy.rsi_oversold
+        self.rsi_overbought = strategy.rsi_overbought
+        self.risk_per_trade = strategy.risk_per_trade
+        self.atr_multiplier = strategy.atr_multiplier
+
+        self.ma_fast = EWMState(_span_alpha(strategy.ma_fast))
+        self.ma_slow = EWMState(_span_alpha(strategy.ma_slow))
+        self.gain = EWMState(_span_alpha(strategy.rsi_period))
+        self.loss = EWMState(_span_alpha(strategy.rsi_period))
+        self.atr = RollingMeanState(strategy.atr_period)
+
+        self.bars = 0
+        self.last_timestamp = None
+        self.close = None
+        self.rsi = math.nan
+        self.signal = 0
+        self.latched = 0     # Position after this bar's signal
+        self.position = 0    # Position held during this bar (previous latch)
+        self.position_size = 0.0
+        self.stop_loss = 0.0
+
+    @staticmethod
+    def strategy_params(strategy):
+        return {
+            'ma_fast': strategy.ma_fast, 'ma_slow': strategy.ma_slow,
+            'rsi_period': strategy.rsi_period, 'rsi_oversold': strategy.rsi_oversold,
+            'rsi_overbought': strategy.rsi_overbought, 'atr_period': strategy.atr_period,
+            'risk_per_trade': strategy.risk_per_trade, 'atr_multiplier': strategy.atr_multiplier,
+        }
+
+    def update(self, timestamp, high, low, close):
+        """Consume one bar and return its signal (1 buy, -1 sell, 0 hold)"""
+        high, low, close = float(high), float(low), float(close)
+        prev_close = self.close
+
+        ma_fast = self.ma_fast.update(close)
+        ma_slow = self.ma_slow.update(close)
+
+        # RSI: the first bar has no change, which pandas records as a 0 gain
+        # and a -0.0 loss
+        if prev_close is None:
+            gain, loss = 0.0, -0.0
+        else:
+            delta = close - prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -(delta if delta < 0 else 0.0)
+        gain_avg = self.gain.update(gain)
+        loss_avg = self.loss.update(loss)
+        if loss_avg == 0:
+            # Where pandas divides by zero: 0/0 -> NaN, x/0 -> inf -> RSI 100
+            self.rsi = math.nan if gain_avg == 0 else 100.0
+        else:
+            self.rsi = 100 - (100 / (1 + gain_avg / loss_avg))
+
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        atr = self.atr.update(true_range)
+
+        buy = ma_fast > ma_slow and self.rsi_oversold < self.rsi < self.rsi_overbought
+        sell = ma_fast < ma_slow or self.rsi > self.rsi_overbought
+        self.signal = -1 if sell else 1 if buy else 0
+
+        self.position_size = 0.0
+        self.stop_loss = 0.0
+        if self.signal == 1 and atr > 0:
+            stop_distance = atr * self.atr_multiplier
+            self.position_size = min(self.risk_per_trade / (stop_distance / close), 1.0)
+            self.stop_loss = close - stop_distance
+
+        self.position = self.latched
+        if self.signal == 1:
+            self.latched = 1
+        elif self.signal == -1:
+            self.latched = 0
+
+        self.close = close
+        self.bars += 1
+        self.last_timestamp = timestamp if isinstance(timestamp, pd.Timestamp) else pd.Timestamp(timestamp)
+        return self.signal
+
+    def update_frame(self, df):
+        """Consume every bar of an OHLC frame that is newer than the stored state"""
+        if self.last_timestamp is not None and len(df) > 0:
+            df = df[df.index > self.last_timestamp]
+        for timestamp, high, low, close in zip(df.index, df['high'].to_numpy(),
+                                               df['low'].to_numpy(), df['close'].to_numpy()):
+            self.update(timestamp, high, low, close)
+        return len(df)
+
+    def preview(self, df):
+        """State as it would be after `df`, leaving this state untouched"""
+        state = copy.deepcopy(self)
+        state.update_frame(df)
+        return state
+
+    @property
+    def ma_fast_value(self):
+        return self.ma_fast.value
+
+    @property
+    def ma_slow_value(self):
+        return self.ma_slow.value
+
+    @property
+    def atr_value(self):
+        return self.atr.value
+
+    @property
+    def signal_text(self):
+        return "BUY" if self.signal == 1 else "SELL" if self.signal == -1 else "HOLD"
+
+    def to_dict(self):
+        return {
+            'params': self.params,
+            'ma_fast': self.ma_fast.value, 'ma_slow': self.ma_slow.value,
+            'gain': self.gain.value, 'loss': self.loss.value,
+            'atr': self.atr.to_dict(),
+            'bars': self.bars,
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            'close': self.close, 'rsi': self.rsi, 'signal': self.signal,
+            'latched': self.latched, 'position': self.position,
+            'position_size': self.position_size, 'stop_loss': self.stop_loss,
+        }
+
+    def save(self, path):
+        """Persist atomically; floats round-trip exactly through JSON"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, strategy):
+        """Restore saved state, or start fresh if missing or built with other parameters"""
+        if not os.path.exists(path):
+            return cls(strategy)
+        with open(path) as f:
+            return cls.from_dict(json.load(f), strategy)
+
+    @classmethod
+    def from_dict(cls, saved, strategy):
+        """State from to_dict() output, or fresh if it was built with other parameters"""
+        state = cls(strategy)
+        if saved.get('params') != state.params:
+            print("⚠️  Strategy parameters changed - rebuilding signal state")
+            return state
+
+        state.ma_fast.value = saved['ma_fast']
+        state.ma_slow.value = saved['ma_slow']
+        state.gain.value = saved['gain']
+        state.loss.value = saved['loss']
+        state.atr = RollingMeanState.from_dict(saved['atr'])
+        state.bars = saved['bars']
+        if saved['last_timestamp']:
+            state.last_timestamp = pd.Timestamp(saved['last_timestamp'])
+        for name in ('close', 'rsi', 'signal', 'latched', 'position', 'position_size', 'stop_loss'):
+            setattr(state, name, saved[name])
+        return state
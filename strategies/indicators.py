@@ -0,0 +1,153 @@
+# strategies/indicators.py - Batched NumPy indicator kernels
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config.settings import INDICATOR_CACHE_BYTES
+
+# Kernels take a (time,) or (time x symbol) input plus a vector of K
+# spans/periods and return a (time x symbol x K) array: every symbol
+# comes out of one compiled pass over time per period.
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _as_periods(periods):
+    return np.atleast_1d(np.asarray(periods))
+
+
+def ewm_com(periods, method='ema'):
+    """Centre of mass per period: span-based ('ema') or Wilder's 1/period smoothing"""
+    periods = _as_periods(periods).astype(np.float64)
+    if method == 'wilder':
+        alpha = 1.0 / periods
+        return (1 - alpha) / alpha
+    return (periods - 1) / 2.0
+
+
+def ewm(values, coms):
+    """Exponentially weighted mean, equivalent to pandas ewm(adjust=False).mean()
+
+    values: (T,) or (T, S); coms: (K,) centres of mass. Returns (T, S, K).
+    Each com is one compiled pandas pass over all S columns, so the cost
+    is K passes over the data rather than a Python loop over time.
+    Passing the centre of mass (not alpha) keeps results bit-identical to
+    ewm(span=...), which pandas also reduces to a centre of mass.
+    """
+    x = _as_2d(values)
+    coms = _as_periods(coms).astype(np.float64)
+    out = np.empty(x.shape + (len(coms),))
+    frame = pd.DataFrame(x, copy=False)
+    for k, com in enumerate(coms):
+        out[:, :, k] = frame.ewm(com=com, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(values, spans):
+    """EMA for every span in one pass, matching pandas ewm(span=..., adjust=False)"""
+    return ewm(values, ewm_com(spans))
+
+
+def rsi(close, periods, method='ema'):
+    """RSI for every period in one pass
+
+    method='ema' smooths gains/losses with a span-based EMA exactly like
+    SimpleCombinedWithATR; method='wilder' uses Wilder's 1/period smoothing.
+    """
+    close = _as_2d(close)
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = -np.where(delta < 0, delta, 0.0)
+
+    coms = ewm_com(periods, method)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = ewm(gain, coms) / ewm(loss, coms)
+        return 100 - (100 / (1 + rs))
+
+
+def true_range(high, low, close):
+    """True range, ignoring the missing previous close on the first bar"""
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    tr = high - low
+    # One scratch array reused for both gaps keeps the peak at two series
+    gap = np.subtract(high[1:], close[:-1])
+    np.abs(gap, out=gap)
+    np.fmax(tr[1:], gap, out=tr[1:])
+    np.subtract(low[1:], close[:-1], out=gap)
+    np.abs(gap, out=gap)
+    np.fmax(tr[1:], gap, out=tr[1:])
+    return tr
+
+
+def rolling_mean(values, periods):
+    """Trailing simple mean per period, NaN until the window is full
+
+    One compiled pandas rolling(p).mean() pass over all S columns per
+    period, so values are bit-identical to pandas (compensated running
+    sum included) and to strategies.incremental.RollingMeanState.
+    """
+    x = _as_2d(values)
+    periods = _as_periods(periods)
+    out = np.empty(x.shape + (len(periods),))
+    frame = pd.DataFrame(x, copy=False)
+    for k, period in enumerate(periods):
+        out[:, :, k] = frame.rolling(int(period)).mean().to_numpy()
+    return out
+
+
+def fingerprint(*arrays):
+    """Content hash identifying a dataset for indicator memoization"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """Thread-safe LRU of computed indicator series, bounded by total bytes"""
+
+    def __init__(self, max_bytes=INDICATOR_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key).nbytes
+            self._entries[key] = value
+            self.nbytes += value.nbytes
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
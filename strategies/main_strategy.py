@@ -4,92 +4,80 @@ from config.settings import (
     FAST_MA, SLOW_MA, RSI_PERIOD, RSI_OVERSOLD, RSI_OVERBOUGHT,
     ATR_PERIOD, RISK_PER_TRADE, ATR_MULTIPLIER
 )
+from strategies.base import Strategy, atr_sized_signals, latch_positions
+from utils.telemetry import telemetry
 
-class SimpleCombinedWithATR:
-    def __init__(self, risk_per_trade=None):
-        self.ma_fast = FAST_MA
-        self.ma_slow = SLOW_MA
-        self.rsi_period = RSI_PERIOD
-        self.rsi_oversold = RSI_OVERSOLD
-        self.rsi_overbought = RSI_OVERBOUGHT
-        self.atr_period = ATR_PERIOD
+
+class SimpleCombinedWithATR(Strategy):
+    def __init__(self, risk_per_trade=None, fast_ma=None, slow_ma=None, rsi_period=None,
+                 rsi_oversold=None, rsi_overbought=None, atr_period=None, atr_multiplier=None,
+                 verbose=True, cache=None):
+        # Anything not passed falls back to config/settings.py
+        self.ma_fast = FAST_MA if fast_ma is None else fast_ma
+        self.ma_slow = SLOW_MA if slow_ma is None else slow_ma
+        self.rsi_period = RSI_PERIOD if rsi_period is None else rsi_period
+        self.rsi_oversold = RSI_OVERSOLD if rsi_oversold is None else rsi_oversold
+        self.rsi_overbought = RSI_OVERBOUGHT if rsi_overbought is None else rsi_overbought
+        self.atr_period = ATR_PERIOD if atr_period is None else atr_period
         self.risk_per_trade = risk_per_trade or RISK_PER_TRADE
-        self.atr_multiplier = ATR_MULTIPLIER
+        self.atr_multiplier = ATR_MULTIPLIER if atr_multiplier is None else atr_multiplier
+        self.verbose = verbose
+        # Optional strategies.indicators.IndicatorCache shared with other
+        # strategies over the same bars (see Strategy.indicator_arrays)
+        self.cache = cache
         
+    def requires(self):
+        """Indicator keys for the shared engine (strategies/engine.py)"""
+        return {
+            'ma_fast': ('ema', 'close', self.ma_fast), 'ma_slow': ('ema', 'close', self.ma_slow),
+            'rsi': ('rsi', 'close', self.rsi_period), 'atr': ('atr', self.atr_period),
+        }
+    
+    def describe(self):
+        return (f"EMA {self.ma_fast}/{self.ma_slow}, RSI {self.rsi_period} "
+                f"{self.rsi_oversold:g}-{self.rsi_overbought:g}, ATR {self.atr_period}x{self.atr_multiplier:g}")
+    
+    @telemetry.timed('indicators')
     def calculate_indicators(self, df):
         df = df.copy()
-        
-        # Moving Averages (EMA for faster response)
-        df['ma_fast'] = df['close'].ewm(span=self.ma_fast, adjust=False).mean()
-        df['ma_slow'] = df['close'].ewm(span=self.ma_slow, adjust=False).mean()
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).ewm(span=self.rsi_period, adjust=False).mean()
-        loss = (-delta.where(delta < 0, 0)).ewm(span=self.rsi_period, adjust=False).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # ATR (Average True Range) for risk management
-        high_low = df['high'] - df['low']
-        high_close = abs(df['high'] - df['close'].shift())
-        low_close = abs(df['low'] - df['close'].shift())
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['atr'] = true_range.rolling(self.atr_period).mean()
-        
+        for name, values in self.indicator_arrays(df).items():
+            df[name] = values
         return df
     
-    def generate_signals(self, df):
-        df = self.calculate_indicators(df)
-        
-        # Initialize
-        df['signal'] = 0
-        df['position_size'] = 0.0  # % of capital to risk
-        df['stop_loss'] = 0.0
+    def signal_arrays(self, df, indicators=None):
+        """signal/position_size/stop_loss/position arrays for df (indicators computed if not given)"""
+        if indicators is None:
+            indicators = self.indicator_arrays(df)
+        ma_fast, ma_slow, rsi, atr = (
+            np.asarray(indicators[name], dtype=float) for name in ('ma_fast', 'ma_slow', 'rsi', 'atr'))
+        close = df['close'].to_numpy(dtype=float)
         
         # Buy conditions
-        buy_condition = (
-            (df['ma_fast'] > df['ma_slow']) & 
-            (df['rsi'] > self.rsi_oversold) & 
-            (df['rsi'] < self.rsi_overbought)
-        )
+        buy_condition = (ma_fast > ma_slow) & (rsi > self.rsi_oversold) & (rsi < self.rsi_overbought)
         
         # Sell conditions
-        sell_condition = (
-            (df['ma_fast'] < df['ma_slow']) | 
-            (df['rsi'] > self.rsi_overbought)
-        )
-        
-        df.loc[buy_condition, 'signal'] = 1
-        df.loc[sell_condition, 'signal'] = -1
-        
-        # Calculate position size based on ATR (risk management)
-        # Position size = Risk per trade / (ATR * multiplier)
-        for i in range(len(df)):
-            if df['signal'].iloc[i] == 1 and df['atr'].iloc[i] > 0:
-                df.iloc[i, df.columns.get_loc('position_size')] = min(
-                    self.risk_per_trade / (df['atr'].iloc[i] * self.atr_multiplier / df['close'].iloc[i]),
-                    1.0  # Max 100% position
-                )
-                df.iloc[i, df.columns.get_loc('stop_loss')] = df['close'].iloc[i] - (df['atr'].iloc[i] * self.atr_multiplier)
+        sell_condition = (ma_fast < ma_slow) | (rsi > self.rsi_overbought)
         
-        # Position logic
-        position = 0
-        positions = []
-        for sig in df['signal']:
-            if sig == 1:
-                position = 1
-            elif sig == -1:
-                position = 0
-            positions.append(position)
+        signal = np.zeros(close.shape, dtype=np.int64)
+        signal[buy_condition] = 1
+        signal[sell_condition] = -1
         
-        df['position'] = positions
-        df['position'] = df['position'].shift(1).fillna(0)
+        # Position size = Risk per trade / (ATR * multiplier); the position
+        # latches on at a buy, off at a sell, and applies from the next bar
+        return atr_sized_signals(signal, close, atr, self.risk_per_trade, self.atr_multiplier)
+    
+    @telemetry.timed('signals')
+    def generate_signals(self, df):
+        df = self.calculate_indicators(df)
+        for name, values in self.signal_arrays(df, indicators=df).items():
+            df[name] = values
         
-        print(f"📊 Strategy with ATR:")
-        print(f"   Buy signals: {sum(df['signal'] == 1)}")
-        print(f"   Sell signals: {sum(df['signal'] == -1)}")
-        print(f"   Days invested: {sum(df['position'] == 1)} of {len(df)}")
-        print(f"   Avg ATR: ${df['atr'].mean():.2f} ({df['atr'].mean()/df['close'].mean()*100:.1f}% of price)")
+        if self.verbose:
+            signal = df['signal'].to_numpy()
+            print(f"📊 Strategy with ATR:")
+            print(f"   Buy signals: {(signal == 1).sum()}")
+            print(f"   Sell signals: {(signal == -1).sum()}")
+            print(f"   Days invested: {(df['position'] == 1).sum()} of {len(df)}")
+            print(f"   Avg ATR: ${df['atr'].mean():.2f} ({df['atr'].mean()/df['close'].mean()*100:.1f}% of price)")
         
         return df
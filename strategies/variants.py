@@ -0,0 +1,115 @@
+# strategies/variants.py - Alternative entry filters, exits and sizing for strategy comparison
+import numpy as np
+
+from config.settings import ATR_PERIOD, ATR_MULTIPLIER, RISK_PER_TRADE
+from strategies.base import Strategy, atr_sized_signals, latch_positions
+from strategies.main_strategy import SimpleCombinedWithATR
+
+
+def fixed_fraction_signals(signal, close, fraction):
+    """signal/position_size/stop_loss/position arrays with a constant size and no stop
+
+    Every buy bar commits `fraction` of the portfolio; exits come only
+    from the strategy's sell signals.
+    """
+    position_size = np.where(signal == 1, fraction, 0.0)
+    latched = latch_positions(signal)
+    position = np.zeros(np.shape(close))
+    position[1:] = latched[:-1]
+    return {
+        'signal': signal, 'position_size': position_size,
+        'stop_loss': np.zeros(np.shape(close)), 'position': position,
+    }
+
+
+class TrendFilteredATR(SimpleCombinedWithATR):
+    """SimpleCombinedWithATR that only buys above a long simple moving average"""
+
+    def __init__(self, trend_period=200, **kwargs):
+        super().__init__(**kwargs)
+        self.trend_period = trend_period
+
+    def requires(self):
+        required = super().requires()
+        required['trend'] = ('sma', 'close', self.trend_period)
+        return required
+
+    def describe(self):
+        return f"{super().describe()}, SMA {self.trend_period} filter"
+
+    def signal_arrays(self, df, indicators=None):
+        if indicators is None:
+            indicators = self.indicator_arrays(df)
+        signals = super().signal_arrays(df, indicators)
+        close = df['close'].to_numpy(dtype=float)
+        # NaN until the SMA has a full window, which blocks buys there too
+        below = ~(close > np.asarray(indicators['trend'], dtype=float))
+        signal = signals['signal'].copy()
+        signal[(signal == 1) & below] = 0
+        return atr_sized_signals(signal, close, np.asarray(indicators['atr'], dtype=float),
+                                 self.risk_per_trade, self.atr_multiplier)
+
+
+class ChannelBreakout(Strategy):
+    """Donchian breakout: buy a new entry_period high, exit on a new exit_period low
+
+    Sized like SimpleCombinedWithATR (risk_per_trade on an ATR stop).
+    """
+
+    def __init__(self, entry_period=55, exit_period=20, atr_period=None, atr_multiplier=None,
+                 risk_per_trade=None, verbose=False, cache=None):
+        self.entry_period = entry_period
+        self.exit_period = exit_period
+        self.atr_period = ATR_PERIOD if atr_period is None else atr_period
+        self.atr_multiplier = ATR_MULTIPLIER if atr_multiplier is None else atr_multiplier
+        self.risk_per_trade = risk_per_trade or RISK_PER_TRADE
+        self.verbose = verbose
+        self.cache = cache
+
+    def requires(self):
+        return {
+            'upper': ('highest', 'close', self.entry_period),
+            'lower': ('lowest', 'close', self.exit_period),
+            'atr': ('atr', self.atr_period),
+        }
+
+    def describe(self):
+        return (f"Breakout {self.entry_period}/{self.exit_period}, "
+                f"ATR {self.atr_period}x{self.atr_multiplier:g}")
+
+    def signal_arrays(self, df, indicators=None):
+        if indicators is None:
+            indicators = self.indicator_arrays(df)
+        upper, lower, atr = (np.asarray(indicators[name], dtype=float) for name in ('upper', 'lower', 'atr'))
+        close = df['close'].to_numpy(dtype=float)
+        signal = np.zeros(close.shape, dtype=np.int64)
+        signal[close >= upper] = 1
+        signal[close <= lower] = -1
+        return atr_sized_signals(signal, close, atr, self.risk_per_trade, self.atr_multiplier)
+
+
+class FixedFractionEMA(Strategy):
+    """EMA crossover holding a fixed fraction of the portfolio, without a stop"""
+
+    def __init__(self, fast_ma=10, slow_ma=50, fraction=0.5, verbose=False, cache=None):
+        self.ma_fast = fast_ma
+        self.ma_slow = slow_ma
+        self.fraction = fraction
+        self.verbose = verbose
+        self.cache = cache
+
+    def requires(self):
+        return {'ma_fast': ('ema', 'close', self.ma_fast), 'ma_slow': ('ema', 'close', self.ma_slow)}
+
+    def describe(self):
+        return f"EMA {self.ma_fast}/{self.ma_slow} cross, {self.fraction:.0%} fixed"
+
+    def signal_arrays(self, df, indicators=None):
+        if indicators is None:
+            indicators = self.indicator_arrays(df)
+        ma_fast = np.asarray(indicators['ma_fast'], dtype=float)
+        ma_slow = np.asarray(indicators['ma_slow'], dtype=float)
+        signal = np.zeros(ma_fast.shape, dtype=np.int64)
+        signal[ma_fast > ma_slow] = 1
+        signal[ma_fast < ma_slow] = -1
+        return fixed_fraction_signals(signal, df['close'].to_numpy(dtype=float), self.fraction)
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data.synthetic import synthetic_minute_bars
+from trading.replay import ReplayServer
+from trading.standin import StandInAlpaca, StandInServer
+from trading.stream import BarStream, StreamingTrader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the streaming pipeline against a local replay")
+    parser.add_argument('--symbols', type=int, default=10, help="number of synthetic symbols")
+    parser.add_argument('--sessions', type=int, default=5, help="trading days of minute bars per symbol")
+    parser.add_argument('--speed', type=float, default=0,
+                        help="replay speed (0 = as fast as possible, 60 = a bar per second)")
+    parser.add_argument('--trade', action='store_true',
+                        help="also send orders to a local REST stand-in")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    bars = synthetic_minute_bars(symbols, sessions=args.sessions)
+    total = sum(len(df) for df in bars.values())
+    print(f"📡 STREAM LOAD TEST: {args.symbols} symbols x {args.sessions} sessions = {total:,} bars, "
+          f"speed {args.speed:g}")
+    print("="*60)
+
+    with StandInServer(ReplayServer(bars, speed=args.speed)) as replay, \
+            StandInServer(StandInAlpaca()) as rest:
+        broker = None
+        if args.trade:
+            from trading.broker import AsyncAlpacaBroker
+            broker = AsyncAlpacaBroker('stand-in-key', 'stand-in-secret', rest.url, rest.url)
+        stream = BarStream(symbols, url=f"{replay.url}/v2/iex", key_id='stand-in-key',
+                           secret_key='stand-in-secret')
+        trader = StreamingTrader(symbols, stream=stream, broker=broker, trade=args.trade,
+                                 state_file=None, verbose=False)
+
+        started = time.perf_counter()
+        asyncio.run(trader.run(reconnect=False))
+        elapsed = time.perf_counter() - started
+
+    print(f"⏱️  {elapsed:.2f}s, {trader.bars / elapsed:,.0f} bars/s")
+    trader.report()
+
+
+if __name__ == "__main__":
+    main()
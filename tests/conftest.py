@@ -0,0 +1,27 @@
+# tests/conftest.py - Make the repo's top-level packages importable from the tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def serve():
+    """Start a local server for a stand-in app (e.g. a StandInAlpaca); returns its URL
+
+    Every server started through it is stopped when the test ends.
+    """
+    from trading.standin import StandInServer
+
+    servers = []
+
+    def start(api):
+        server = StandInServer(api)
+        servers.append(server)
+        return server.start()
+
+    yield start
+    for server in servers:
+        server.stop()
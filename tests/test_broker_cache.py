@@ -0,0 +1,127 @@
+# tests/test_broker_cache.py - BrokerCache TTLs, coalescing and write invalidation over the stand-in
+import asyncio
+
+import aiohttp
+import pytest
+
+from trading.broker import AsyncAlpacaBroker, BrokerError
+from trading.cache import BrokerCache, CacheServer
+from trading.standin import StandInAlpaca
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def cache_for(url, **kwargs):
+    return BrokerCache(AsyncAlpacaBroker('test', 'test', url, url), **kwargs)
+
+
+def test_reads_are_served_until_their_ttl_expires(serve):
+    api = StandInAlpaca()
+    clock = FakeClock()
+
+    async def run():
+        async with cache_for(serve(api), ttls={'account': 5.0, 'clock': 0.0}, clock=clock) as cache:
+            await cache.get_account()
+            await cache.get_account()
+            assert api.requests == 1
+            clock.now = 4.9
+            await cache.get_account()
+            assert api.requests == 1
+            clock.now = 5.1
+            await cache.get_account()
+            assert api.requests == 2
+            # A zero TTL is never stored
+            await cache.get_clock()
+            await cache.get_clock()
+            assert api.requests == 4
+            return cache.stats()['account']
+    stats = asyncio.run(run())
+    assert (stats['hits'], stats['misses']) == (2, 2)
+
+
+def test_concurrent_misses_share_one_request(serve):
+    api = StandInAlpaca(latency=0.1)
+
+    async def run():
+        async with cache_for(serve(api)) as cache:
+            accounts = await asyncio.gather(*(cache.get_account() for _ in range(10)))
+            return accounts, cache.stats()['account']
+    accounts, stats = asyncio.run(run())
+    assert api.requests == 1
+    assert all(account is accounts[0] for account in accounts)
+    assert (stats['misses'], stats['coalesced']) == (1, 9)
+
+
+def test_orders_invalidate_account_positions_and_orders_only(serve):
+    api = StandInAlpaca()
+
+    async def run():
+        async with cache_for(serve(api)) as cache:
+            assert await cache.get_position('AAA') is None
+            cash = float((await cache.get_account()).cash)
+            bars = await cache.get_bars('AAA', '2024-01-01', '2024-02-01')
+            before = api.requests
+
+            await cache.submit_order(symbol='AAA', qty=3, side='buy')
+            position = await cache.get_position('AAA')
+            assert position is not None and float(position.qty) == 3
+            assert float((await cache.get_account()).cash) < cash
+            assert len(await cache.get_bars('AAA', '2024-01-01', '2024-02-01')) == len(bars)
+            # The order, then fresh positions and account; bars still cached
+            assert api.requests == before + 3
+
+            # A refused order may still have reached the broker: invalidated too
+            with pytest.raises(BrokerError):
+                await cache.submit_order(symbol='BBB', qty=1, side='sell')
+            await cache.list_positions()
+            assert api.requests == before + 5
+    asyncio.run(run())
+
+
+def test_failures_are_remembered_for_the_error_ttl(serve):
+    api = StandInAlpaca(error_rate=1.0)
+    clock = FakeClock()
+
+    async def run():
+        async with cache_for(serve(api), error_ttl=2.0, clock=clock) as cache:
+            for _ in range(3):
+                with pytest.raises(BrokerError):
+                    await cache.get_account()
+            assert api.requests == 1
+            clock.now = 2.5
+            with pytest.raises(BrokerError):
+                await cache.get_account()
+            assert api.requests == 2
+            return cache.stats()['account']['errors']
+    assert asyncio.run(run()) == 2
+
+
+def test_daemon_requires_the_api_keys_and_serves_from_the_cache(serve):
+    api = StandInAlpaca()
+    upstream = serve(api)
+    daemon = serve(CacheServer(cache_for(upstream)))
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{daemon}/v2/account") as response:
+                assert response.status == 401
+        async with AsyncAlpacaBroker('test', 'wrong', daemon, daemon) as broker:
+            with pytest.raises(BrokerError) as refused:
+                await broker.get_account()
+            assert refused.value.status == 401
+        async with AsyncAlpacaBroker('test', 'test', daemon, daemon) as broker:
+            await broker.get_account()
+            await broker.get_account()
+            await broker.submit_order('AAA', 2, 'buy')
+            position = await broker.get_position('AAA')
+        return position
+    position = asyncio.run(run())
+    assert float(position.qty) == 2
+    # account once, the order, then the position list after invalidation
+    assert api.requests == 3
@@ -0,0 +1,106 @@
+# tests/test_data_cache.py - OHLCVCache range bookkeeping, served through DataFetcher from the stand-in
+import asyncio
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from data.cache import OHLCVCache
+from data.data_fetcher import DataFetcher
+from data.synthetic import synthetic_daily_bars
+from trading.broker import AsyncAlpacaBroker
+from trading.standin import StandInAlpaca
+
+
+class StandInFetcher(DataFetcher):
+    """DataFetcher downloading from a local StandInAlpaca instead of Yahoo, recording each request"""
+
+    def __init__(self, url, *args, **kwargs):
+        super().__init__(*args, verbose=False, **kwargs)
+        self.url = url
+        self.downloads = []
+
+    def _download(self, start_date, end_date):
+        self.downloads.append((str(start_date), str(end_date)))
+
+        async def fetch():
+            async with AsyncAlpacaBroker('test', 'test', self.url, self.url) as broker:
+                return await broker.get_bars(self.symbol, str(start_date), str(end_date))
+        return asyncio.run(fetch())
+
+
+@pytest.fixture
+def bars():
+    return synthetic_daily_bars('2019-01-01', '2021-12-31')
+
+
+@pytest.fixture
+def url(serve, bars):
+    return serve(StandInAlpaca(bars=bars, page_size=200))
+
+
+def fetch(url, cache_dir, start, end):
+    fetcher = StandInFetcher(url, 'AAA', start, end, cache_dir=str(cache_dir), offline=False)
+    return fetcher, fetcher.load()
+
+
+def test_only_missing_edges_are_downloaded(url, bars, tmp_path):
+    fetcher, df = fetch(url, tmp_path, '2020-03-01', '2020-06-01')
+    assert fetcher.downloads == [('2020-03-01', '2020-06-01')]
+    expected = bars[(bars.index >= '2020-03-01') & (bars.index < '2020-06-01')]
+    assert (df.index == expected.index).all()
+    assert (df['close'].to_numpy() == expected['close'].to_numpy()).all()
+
+    fetcher, df = fetch(url, tmp_path, '2020-01-01', '2020-09-01')
+    assert fetcher.downloads == [('2020-01-01', '2020-03-01'), ('2020-06-01', '2020-09-01')]
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+    assert len(df) == ((bars.index >= '2020-01-01') & (bars.index < '2020-09-01')).sum()
+
+    fetcher, _ = fetch(url, tmp_path, '2020-02-01', '2020-08-01')
+    assert fetcher.downloads == []
+    assert OHLCVCache(str(tmp_path)).covered_ranges('AAA') == [(date(2020, 1, 1), date(2020, 9, 1))]
+
+
+def test_missing_ranges_skip_covered_spans(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    assert cache.missing_ranges('AAA', '2020-01-01', '2020-02-01') == [(date(2020, 1, 1), date(2020, 2, 1))]
+    df = synthetic_daily_bars('2020-01-10', '2020-01-20')
+    assert cache.write('AAA', df, '2020-01-10', '2020-01-20')
+    assert cache.write('AAA', synthetic_daily_bars('2020-01-25', '2020-01-28'), '2020-01-25', '2020-01-28')
+    assert cache.missing_ranges('AAA', '2020-01-01', '2020-02-01') == [
+        (date(2020, 1, 1), date(2020, 1, 10)), (date(2020, 1, 20), date(2020, 1, 25)),
+        (date(2020, 1, 28), date(2020, 2, 1))]
+
+
+def test_empty_downloads_only_cover_ranges_without_weekdays(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    empty = pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], dtype=float)
+    # A weekday range answered with nothing may be an outage: ask again next time
+    assert not cache.write('AAA', empty, '2020-01-06', '2020-01-08')
+    assert cache.missing_ranges('AAA', '2020-01-06', '2020-01-08') == [(date(2020, 1, 6), date(2020, 1, 8))]
+    # A weekend has no bars to wait for
+    assert cache.write('AAA', empty, '2020-01-11', '2020-01-13')
+    assert cache.missing_ranges('AAA', '2020-01-11', '2020-01-13') == []
+
+
+def test_today_is_never_marked_complete(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    today = pd.Timestamp(date.today())
+    df = synthetic_daily_bars(today - pd.Timedelta(days=10), today)
+    cache.write('AAA', df, today - pd.Timedelta(days=10), today + pd.Timedelta(days=5))
+    assert cache.covered_ranges('AAA')[-1][1] == date.today()
+    tomorrow = (today + pd.Timedelta(days=1)).date()
+    assert cache.missing_ranges('AAA', today, tomorrow) == [(date.today(), tomorrow)]
+
+
+def test_rewritten_bars_replace_cached_ones(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    df = synthetic_daily_bars('2020-01-01', '2020-01-31')
+    cache.write('AAA', df, '2020-01-01', '2020-02-01')
+    revised = df.iloc[5:8].copy()
+    revised['close'] += 1.0
+    cache.write('AAA', revised, revised.index[0], revised.index[-1] + pd.Timedelta(days=1))
+    stored = cache.read('AAA')
+    assert len(stored) == len(df)
+    assert (stored['close'].to_numpy()[5:8] == revised['close'].to_numpy()).all()
+    assert (stored['close'].to_numpy()[8:] == df['close'].to_numpy()[8:]).all()
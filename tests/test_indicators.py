@@ -0,0 +1,33 @@
+# tests/test_indicators.py - Batched kernels against pandas and the incremental live state
+import numpy as np
+import pandas as pd
+
+from data.synthetic import synthetic_ohlcv
+from strategies import indicators
+from strategies.incremental import RollingMeanState
+
+
+def test_rolling_mean_matches_pandas_and_incremental_state():
+    df = synthetic_ohlcv(20000, seed=3)
+    tr = indicators.true_range(df['high'], df['low'], df['close'])[:, 0]
+    got = indicators.rolling_mean(tr, [5, 14, 50])
+    for k, period in enumerate([5, 14, 50]):
+        expected = pd.Series(tr).rolling(period).mean().to_numpy()
+        np.testing.assert_array_equal(got[:, 0, k], expected)
+        state = RollingMeanState(period)
+        live = []
+        for x in tr:
+            state.update(x)
+            live.append(state.value)
+        np.testing.assert_array_equal(got[:, 0, k], np.array(live))
+
+
+def test_ema_matches_pandas_on_gappy_panel():
+    close = synthetic_ohlcv(5000, seed=4)['close'].to_numpy()
+    panel = np.column_stack([close, close[::-1]])
+    panel[:7, 1] = np.nan
+    panel[1000:1010, 0] = np.nan
+    got = indicators.ema(panel, [3, 20, 50])
+    for k, span in enumerate([3, 20, 50]):
+        expected = pd.DataFrame(panel).ewm(span=span, adjust=False).mean().to_numpy()
+        np.testing.assert_array_equal(got[:, :, k], expected)
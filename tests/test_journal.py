@@ -0,0 +1,85 @@
+# tests/test_journal.py - Journal WAL appends and tailing, and PerformanceStats following a recreated journal
+import os
+import threading
+from types import SimpleNamespace
+
+from trading.journal import Journal
+from utils.performance import PerformanceStats
+
+
+def test_appends_get_increasing_ids_in_wal_mode(tmp_path):
+    journal = Journal(str(tmp_path / 'journal.db'))
+    assert journal.last_id() == 0
+    assert journal.db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    ids = [journal.record('signal', 'AAA', signal='BUY'), journal.record('equity', equity=1000.0),
+           journal.record('signal', 'BBB', signal='SELL')]
+    assert ids == sorted(ids) and len(set(ids)) == 3
+    assert journal.last_id() == ids[-1]
+    assert journal.count() == {'signal': 2, 'equity': 1}
+
+
+def test_tail_follows_appends_from_another_connection(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    writer, reader = Journal(path), Journal(path)
+    first = writer.record('equity', equity=1000.0)
+    seen = reader.last_id()
+    assert seen == first
+
+    writer.record('signal', 'AAA', signal='BUY')
+    latest = writer.record('equity', equity=1010.0)
+    assert [e.kind for e in reader.tail(seen)] == ['signal', 'equity']
+    assert [e.data['equity'] for e in reader.tail(seen, kinds=('equity',))] == [1010.0]
+    assert len(reader.tail(seen, limit=1)) == 1
+    assert reader.tail(latest) == []
+
+
+def test_concurrent_writers_each_use_their_own_connection(tmp_path):
+    journal = Journal(str(tmp_path / 'journal.db'))
+
+    def write(n):
+        for i in range(50):
+            journal.record('signal', f"S{n}", i=i)
+        journal.close()
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    events = journal.tail(0, limit=1000)
+    assert len(events) == 200 and len({e.id for e in events}) == 200
+
+
+def test_order_ids_recorded_for_placed_and_failed_orders(tmp_path):
+    journal = Journal(str(tmp_path / 'journal.db'))
+    order = SimpleNamespace(id='o-1', client_order_id='c-1', symbol='AAA', side='buy', qty='1',
+                            type='market', status='accepted', submitted_at=None)
+    journal.record_order(order)
+    journal.record('order', 'BBB', client_order_id='c-2', status='failed', error='503')
+    assert journal.client_order_ids() == {'c-1', 'c-2'}
+    assert journal.open_order_ids() == {'o-1'}
+
+
+def test_stats_start_over_when_the_journal_is_recreated(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = Journal(path)
+    for equity in (1000.0, 1100.0, 990.0):
+        journal.record('equity', equity=equity)
+    journal.record('session', status='complete', signal='BUY')
+    stats = PerformanceStats(path)
+    assert stats.update(journal) == 4
+    assert stats.sessions == 3 and stats.signals == {'BUY': 1}
+    assert stats.update(journal) == 0
+
+    journal.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    journal = Journal(path)
+    journal.record('equity', equity=500.0)
+    journal.record('equity', equity=550.0)
+    assert stats.update(journal) == 2
+    summary = stats.summary()
+    assert summary['sessions'] == 2 and summary['signals'] == {}
+    assert summary['initial_equity'] == 500.0 and summary['total_return_pct'] == 10.0
+    assert summary['max_drawdown_pct'] == 0.0
@@ -0,0 +1,49 @@
+# tests/test_main_strategy.py - SimpleCombinedWithATR against the original row-by-row implementation
+import os
+
+import numpy as np
+import pandas as pd
+
+from strategies.main_strategy import SimpleCombinedWithATR
+
+# Output of the original generate_signals (per-row iloc sizing loop and
+# Python position loop, before vectorization) on bars(), with the
+# parameters below. Recorded once; the loop version is too slow to keep.
+FIXTURE = os.path.join(os.path.dirname(__file__), 'data', 'simple_combined_loop.npz')
+PARAMS = dict(fast_ma=20, slow_ma=50, rsi_period=14, rsi_oversold=40, rsi_overbought=85,
+              atr_period=14, atr_multiplier=1.5, risk_per_trade=0.02)
+
+
+def bars(n=3000, seed=7):
+    """Minute bars with trends, a flat stretch (zero ATR) and a few gaps"""
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.0005, n // 250 + 1), 250)[:n]
+    close = 100 * np.exp(np.cumsum(drift + rng.normal(0, 0.002, n)))
+    close[1200:1260] = close[1199]
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    spread[1200:1260] = 0.0
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        'open': open_, 'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread, 'close': close,
+        'volume': rng.integers(1000, 50000, n).astype(float),
+    }, index=pd.date_range('2020-01-02 09:30', periods=n, freq='min'))
+    df['returns'] = df['close'].pct_change()
+    return df
+
+
+def test_generate_signals_matches_loop_implementation():
+    expected = np.load(FIXTURE)
+    df = SimpleCombinedWithATR(verbose=False, **PARAMS).generate_signals(bars())
+
+    # Every column must match the loop implementation bit for bit
+    for column in ('signal', 'position', 'position_size', 'stop_loss', 'ma_fast', 'ma_slow', 'rsi', 'atr'):
+        np.testing.assert_array_equal(df[column].to_numpy(), expected[column], err_msg=column)
+
+
+def test_signal_arrays_match_generate_signals():
+    df = bars()
+    strategy = SimpleCombinedWithATR(verbose=False, **PARAMS)
+    frame = strategy.generate_signals(df)
+    for name, values in strategy.signal_arrays(df).items():
+        np.testing.assert_array_equal(values, frame[name].to_numpy(), err_msg=name)
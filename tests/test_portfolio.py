@@ -0,0 +1,34 @@
+# tests/test_portfolio.py - Shared-capital portfolio simulation
+import numpy as np
+
+from backtesting.portfolio import simulate
+
+
+def test_entries_are_funded_from_cash_and_holdings_left_alone():
+    close = np.array([[10.0, 20.0, 5.0],
+                      [11.0, 18.0, 5.0],
+                      [12.0, 19.0, 6.0],
+                      [12.0, 21.0, 6.0]])
+    weights = np.array([[0.5, 0.5, 0.0],
+                        [0.5, 0.5, 0.0],
+                        [0.5, 0.0, 0.5],   # B exits, C enters with B's proceeds
+                        [0.5, 0.0, 0.5]])
+    sim = simulate(close, weights, 1000.0, 0.0)
+    # A was never traded after bar 0: 50 shares throughout
+    np.testing.assert_allclose(sim['weights'][:, 0] * sim['equity'], 50 * close[:, 0])
+    # C got only what selling B raised (25 x 19), not half of equity
+    np.testing.assert_allclose(sim['weights'][2, 2] * sim['equity'][2], 25 * 19.0)
+    np.testing.assert_array_equal(sim['rebalance'], [True, False, True, False])
+
+
+def test_delisted_holding_is_sold_at_its_last_close():
+    close = np.array([[10.0, 10.0],
+                      [10.0, 12.0],
+                      [10.0, np.nan],
+                      [10.0, np.nan]])
+    weights = np.array([[0.0, 1.0]] * 4)
+    sim = simulate(close, weights, 1000.0, 0.001)
+    shares = 1000.0 / 1.001 / 10.0
+    assert sim['weights'][2:, 1].max() == 0.0
+    assert sim['turnover'][2] > 0
+    np.testing.assert_allclose(sim['equity'][2:], shares * 12.0 * (1 - 0.001))
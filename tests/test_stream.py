@@ -0,0 +1,24 @@
+# tests/test_stream.py - StreamingTrader bar handling
+from trading.stream import StreamingTrader
+
+
+def minute_bar(symbol, minute, close):
+    return {'T': 'b', 'S': symbol, 't': f"2024-01-02T14:{minute:02d}:00Z",
+            'o': close, 'h': close + 0.5, 'l': close - 0.5, 'c': close, 'v': 100}
+
+
+def test_redelivered_and_out_of_order_bars_are_dropped():
+    trader = StreamingTrader(['AAA'], state_file=None, save_every=0, verbose=False)
+    state = trader.states['AAA']
+    for minute in range(3):
+        trader.on_bar(minute_bar('AAA', minute, 100.0 + minute), 0.0)
+    folded = state.to_dict()
+
+    trader.on_bar(minute_bar('AAA', 2, 250.0), 0.0)  # redelivered after a reconnect
+    trader.on_bar(minute_bar('AAA', 1, 50.0), 0.0)   # replayed older bar
+    assert trader.replayed == 2
+    assert trader.bars == 3
+    assert state.to_dict() == folded
+
+    trader.on_bar(minute_bar('AAA', 3, 103.0), 0.0)
+    assert state.bars == 4
@@ -0,0 +1,70 @@
+# tests/test_universe.py - UniverseLoader error isolation and alignment, loading from local stand-ins
+import asyncio
+
+import numpy as np
+import pytest
+
+from data.synthetic import synthetic_daily_bars
+from data.universe import UniverseLoader
+from trading.broker import AsyncAlpacaBroker
+from trading.standin import StandInAlpaca
+
+
+class StandInSource:
+    """Universe source reading each symbol's bars from its own stand-in server"""
+
+    def __init__(self, urls):
+        self.urls = urls
+
+    def __call__(self, symbol, start_date, end_date):
+        url = self.urls[symbol]
+
+        async def fetch():
+            async with AsyncAlpacaBroker('test', 'test', url, url) as broker:
+                return await broker.get_bars(symbol, start_date, end_date)
+        return asyncio.run(fetch())
+
+
+@pytest.fixture
+def bars():
+    return {
+        'AAA': synthetic_daily_bars('2020-01-01', '2020-12-31', seed=1),
+        # Listed half way through the range
+        'BBB': synthetic_daily_bars('2020-07-01', '2020-12-31', seed=2),
+    }
+
+
+@pytest.fixture
+def loader(serve, bars):
+    urls = {symbol: serve(StandInAlpaca(bars=df, page_size=50)) for symbol, df in bars.items()}
+    urls['DOWN'] = serve(StandInAlpaca(error_rate=1.0))
+    urls['EMPTY'] = serve(StandInAlpaca(bars=bars['AAA'].iloc[:0]))
+    return UniverseLoader('2020-01-01', '2021-01-01', source=StandInSource(urls), max_workers=4)
+
+
+def test_failing_symbols_are_left_out_and_reported(loader, bars):
+    panel = loader.load(['DOWN', 'AAA', 'EMPTY', 'BBB', 'MISSING'])
+    assert panel.symbols == ['AAA', 'BBB']
+    assert set(panel.errors) == {'DOWN', 'EMPTY', 'MISSING'}
+    assert '503' in panel.errors['DOWN']
+    assert panel.errors['EMPTY'] == 'no data returned'
+    np.testing.assert_array_equal(panel.frame('AAA')['close'].to_numpy(), bars['AAA']['close'].to_numpy())
+
+
+def test_partial_listing_is_nan_before_the_first_bar(loader, bars):
+    panel = loader.load(['AAA', 'BBB'])
+    assert len(panel.index) == len(bars['AAA'])
+    close = panel.field('close')
+    listed = panel.index >= bars['BBB'].index[0]
+    assert np.isnan(close[~listed, 1]).all()
+    np.testing.assert_array_equal(close[listed, 1], bars['BBB']['close'].to_numpy())
+    frame = panel.frame('BBB')
+    assert len(frame) == len(bars['BBB'])
+    assert np.isnan(frame['returns'].iloc[0])
+
+
+def test_universe_with_every_symbol_failing_is_empty(loader):
+    panel = loader.load(['DOWN', 'EMPTY'])
+    assert panel.symbols == []
+    assert panel.shape == (0, 0, 5)
+    assert set(panel.errors) == {'DOWN', 'EMPTY'}
@@ -0,0 +1,220 @@
+# trading/broker.py - Async Alpaca REST client with a pooled keep-alive session
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+
+from config.settings import (
+    ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL, ALPACA_DATA_URL,
+    BROKER_MAX_CONNECTIONS, BROKER_TIMEOUT, BROKER_CACHE_URL
+)
+from utils.telemetry import telemetry
+
+BAR_COLUMNS = {'o': 'open', 'h': 'high', 'l': 'low', 'c': 'close', 'v': 'volume',
+               'n': 'trade_count', 'vw': 'vwap'}
+
+
+class BrokerError(Exception):
+    """Non-2xx response from the Alpaca API
+
+    retry_after holds the Retry-After header in seconds (429/503), if sent.
+    """
+
+    def __init__(self, status, message, url=None, retry_after=None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.url = url
+        self.retry_after = retry_after
+
+
+class SessionSnapshot:
+    """Everything a trading session needs, fetched in one concurrent round"""
+
+    def __init__(self, account, clock, bars, position, bars_error=None):
+        self.account = account
+        self.clock = clock
+        self.bars = bars
+        self.position = position
+        self.bars_error = bars_error
+
+    @property
+    def equity(self):
+        return float(self.account.equity)
+
+
+def bars_to_frame(bars):
+    """Alpaca v2 bar dicts -> OHLCV DataFrame indexed by UTC timestamp (like REST.get_bars().df)"""
+    import pandas as pd  # Keeps account/position-only callers free of the pandas import
+
+    if not bars:
+        return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+    df = pd.DataFrame(bars).rename(columns=BAR_COLUMNS)
+    df.index = pd.to_datetime(df.pop('t'), utc=True)
+    df.index.name = 'timestamp'
+    return df
+
+
+class AsyncAlpacaBroker:
+    """Alpaca trading + market data endpoints over one aiohttp session
+
+    The session (and its connection pool) is created on first use and kept
+    until close(), so every call after the first reuses an open TLS
+    connection instead of paying a new handshake. Calls are coroutines:
+    independent ones can be awaited together with asyncio.gather.
+    Responses come back as attribute-style objects (account.equity, ...)
+    to match what alpaca_trade_api.REST returns. Without explicit URLs it
+    talks to the shared cache daemon when BROKER_CACHE_URL is set.
+    """
+
+    def __init__(self, key_id=None, secret_key=None, base_url=None, data_url=None,
+                 max_connections=BROKER_MAX_CONNECTIONS, timeout=BROKER_TIMEOUT):
+        self.key_id = key_id or ALPACA_API_KEY
+        self.secret_key = secret_key or ALPACA_SECRET_KEY
+        self.base_url = (base_url or BROKER_CACHE_URL or ALPACA_BASE_URL).rstrip('/')
+        self.data_url = (data_url or BROKER_CACHE_URL or ALPACA_DATA_URL).rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'APCA-API-KEY-ID': self.key_id or '',
+                    'APCA-API-SECRET-KEY': self.secret_key or '',
+                },
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _request(self, method, url, params=None, json=None):
+        async with self.session.request(method, url, params=params, json=json) as response:
+            if response.status >= 400:
+                try:
+                    message = (await response.json()).get('message', response.reason)
+                except (aiohttp.ContentTypeError, ValueError):
+                    message = await response.text()
+                retry_after = response.headers.get('Retry-After')
+                raise BrokerError(response.status, message, url,
+                                  float(retry_after) if retry_after else None)
+            if response.status == 204:
+                return None
+            return await response.json()
+
+    async def _trading(self, method, path, params=None, json=None):
+        return await self._request(method, f"{self.base_url}/v2{path}", params, json)
+
+    @staticmethod
+    def _entity(data):
+        if isinstance(data, list):
+            return [SimpleNamespace(**item) for item in data]
+        return SimpleNamespace(**data) if data is not None else None
+
+    # --- Trading API ------------------------------------------------------
+
+    @telemetry.timed('get_account', metric='broker_call_seconds')
+    async def get_account(self):
+        return self._entity(await self._trading('GET', '/account'))
+
+    @telemetry.timed('get_clock', metric='broker_call_seconds')
+    async def get_clock(self):
+        return self._entity(await self._trading('GET', '/clock'))
+
+    @telemetry.timed('get_position', metric='broker_call_seconds')
+    async def get_position(self, symbol):
+        """Open position, or None when there is none (the API answers 404)"""
+        try:
+            return self._entity(await self._trading('GET', f'/positions/{symbol}'))
+        except BrokerError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    @telemetry.timed('list_positions', metric='broker_call_seconds')
+    async def list_positions(self):
+        return self._entity(await self._trading('GET', '/positions'))
+
+    @telemetry.timed('list_orders', metric='broker_call_seconds')
+    async def list_orders(self, status='open', limit=50):
+        return self._entity(await self._trading('GET', '/orders',
+                                                params={'status': status, 'limit': limit}))
+
+    @telemetry.timed('submit_order', metric='broker_call_seconds')
+    async def submit_order(self, symbol, qty, side, type='market', time_in_force='day',
+                           client_order_id=None):
+        order = {'symbol': symbol, 'qty': str(qty), 'side': side, 'type': type,
+                 'time_in_force': time_in_force}
+        if client_order_id:
+            order['client_order_id'] = client_order_id
+        return self._entity(await self._trading('POST', '/orders', json=order))
+
+    @telemetry.timed('get_order_by_client_id', metric='broker_call_seconds')
+    async def get_order_by_client_id(self, client_order_id):
+        """Order submitted with this client_order_id, or None if the broker never got it"""
+        try:
+            return self._entity(await self._trading('GET', '/orders:by_client_order_id',
+                                                    params={'client_order_id': client_order_id}))
+        except BrokerError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    @telemetry.timed('close_position', metric='broker_call_seconds')
+    async def close_position(self, symbol):
+        return self._entity(await self._trading('DELETE', f'/positions/{symbol}'))
+
+    # --- Market data API --------------------------------------------------
+
+    @telemetry.timed('get_bars', metric='broker_call_seconds')
+    async def get_bars(self, symbol, start, end, timeframe='1Day', feed='iex', limit=10000):
+        """OHLCV DataFrame for [start, end], following next_page_token"""
+        url = f"{self.data_url}/v2/stocks/{symbol}/bars"
+        params = {'timeframe': timeframe, 'start': start, 'end': end,
+                  'feed': feed, 'limit': limit, 'adjustment': 'raw'}
+        bars = []
+        while True:
+            page = await self._request('GET', url, params=params)
+            bars.extend(page.get('bars') or [])
+            token = page.get('next_page_token')
+            if not token:
+                break
+            params['page_token'] = token
+        return bars_to_frame(bars)
+
+    # --- Composite calls --------------------------------------------------
+
+    @telemetry.timed('session_snapshot', metric='broker_call_seconds')
+    async def session_snapshot(self, symbol, start=None, end=None):
+        """Account, clock, daily bars and position fetched concurrently
+
+        Bars are skipped (None) when no range is given, e.g. when the
+        stored signal state is already up to date. A failed bars request
+        does not fail the snapshot; the error is kept in bars_error.
+        """
+        bars = self.get_bars(symbol, start, end) if start is not None else asyncio.sleep(0)
+        account, clock, bars, position = await asyncio.gather(
+            self.get_account(), self.get_clock(), bars, self.get_position(symbol),
+            return_exceptions=True,
+        )
+        for result in (account, clock, position):
+            if isinstance(result, BaseException):
+                raise result
+        bars_error = None
+        if isinstance(bars, BaseException):
+            bars_error, bars = bars, None
+        return SessionSnapshot(account, clock, bars, position, bars_error)
@@ -0,0 +1,375 @@
+# trading/cache.py - Shared broker cache: per-resource TTLs, request coalescing, local daemon
+import argparse
+import asyncio
+import hmac
+import json
+import time
+import urllib.request
+
+import aiohttp
+from aiohttp import web
+
+from config.settings import (
+    ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL, ALPACA_DATA_URL,
+    CACHE_TTL_ACCOUNT, CACHE_TTL_POSITIONS, CACHE_TTL_ORDERS, CACHE_TTL_CLOCK, CACHE_TTL_BARS,
+    CACHE_ERROR_TTL, BROKER_CACHE_HOST, BROKER_CACHE_PORT, BROKER_CACHE_URL
+)
+from trading.broker import AsyncAlpacaBroker, BrokerError, BAR_COLUMNS
+
+# Seconds a read stays fresh, by resource
+RESOURCE_TTLS = {
+    'account': CACHE_TTL_ACCOUNT,
+    'positions': CACHE_TTL_POSITIONS,
+    'orders': CACHE_TTL_ORDERS,
+    'clock': CACHE_TTL_CLOCK,
+    'bars': CACHE_TTL_BARS,
+}
+
+# What an order or a position close can change
+WRITE_INVALIDATES = ('account', 'positions', 'orders')
+
+STAT_FIELDS = ('hits', 'misses', 'coalesced', 'errors')
+
+
+def frame_to_bars(df):
+    """OHLCV DataFrame -> Alpaca v2 bar dicts (the inverse of bars_to_frame)"""
+    if df is None or len(df) == 0:
+        return []
+    keys = {column: key for key, column in BAR_COLUMNS.items()}
+    bars = df[[c for c in df.columns if c in keys]].rename(columns=keys)
+    bars.insert(0, 't', df.index.tz_convert('UTC').strftime('%Y-%m-%dT%H:%M:%SZ'))
+    return bars.to_dict('records')
+
+
+class BrokerCache:
+    """Read-through cache in front of an AsyncAlpacaBroker, with the same call interface
+
+    Reads are answered from memory while younger than their resource's
+    TTL (RESOURCE_TTLS: account, positions, orders, clock, bars);
+    concurrent identical reads that miss share one API request. A
+    position comes out of the cached position list, so get_position and
+    list_positions always agree. Orders and position closes go straight
+    through and drop the cached account, positions and orders; a read
+    already in flight at that moment still answers its callers but is
+    not stored. Failures are remembered for error_ttl seconds, so an
+    unreachable API is not retried by every caller. Order lookups by
+    client id are never cached (the executor relies on them being
+    current). Returned objects are shared between callers and must be
+    treated as read-only; bars are copied, since sessions clean them in
+    place.
+    """
+
+    def __init__(self, broker=None, ttls=None, error_ttl=CACHE_ERROR_TTL, clock=time.monotonic):
+        unknown = set(ttls or ()) - set(RESOURCE_TTLS)
+        if unknown:
+            raise ValueError(f"Unknown cache resource(s): {', '.join(sorted(unknown))}")
+        self.broker = broker or AsyncAlpacaBroker()
+        self.ttls = dict(RESOURCE_TTLS, **(ttls or {}))
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self._entries = {}   # (resource, method, args) -> (expires, value, error)
+        self._inflight = {}  # same key -> task shared by every caller
+        self._generation = dict.fromkeys(self.ttls, 0)
+        self._stats = {resource: dict.fromkeys(STAT_FIELDS, 0) for resource in self.ttls}
+
+    async def close(self):
+        await self.broker.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- Cache ------------------------------------------------------------
+
+    async def _cached(self, resource, key, call):
+        stats = self._stats[resource]
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            stats['hits'] += 1
+            if entry[2] is not None:
+                raise entry[2]
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            stats['coalesced'] += 1
+        else:
+            stats['misses'] += 1
+            task = asyncio.ensure_future(self._load(resource, key, call))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        # A cancelled caller must not cancel the request the others wait on
+        return await asyncio.shield(task)
+
+    async def _load(self, resource, key, call):
+        generation = self._generation[resource]
+        try:
+            value, error = await call(), None
+        except (BrokerError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._stats[resource]['errors'] += 1
+            value, error = None, e
+        ttl = self.ttls[resource] if error is None else self.error_ttl
+        if ttl > 0 and generation == self._generation[resource]:
+            self._entries[key] = (self.clock() + ttl, value, error)
+        if error is not None:
+            raise error
+        return value
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here, so an unawaited failure isn't reported as lost
+
+    def invalidate(self, *resources):
+        """Make the next read of these resources (default: all) ask the API"""
+        resources = resources or tuple(self.ttls)
+        for resource in resources:
+            self._generation[resource] += 1
+        for table in (self._entries, self._inflight):
+            for key in [key for key in table if key[0] in resources]:
+                del table[key]
+
+    def stats(self):
+        """{resource: hits, misses (= API calls), coalesced, errors, hit_rate}, plus 'total'"""
+        stats = {resource: dict(counts) for resource, counts in self._stats.items()}
+        stats['total'] = {field: sum(counts[field] for counts in self._stats.values())
+                          for field in STAT_FIELDS}
+        for counts in stats.values():
+            reads = counts['hits'] + counts['misses'] + counts['coalesced']
+            counts['hit_rate'] = (counts['hits'] + counts['coalesced']) / reads if reads else 0.0
+        return stats
+
+    # --- Reads --------------------------------------------------------------
+
+    async def get_account(self):
+        return await self._cached('account', ('account', 'get_account'), self.broker.get_account)
+
+    async def get_clock(self):
+        return await self._cached('clock', ('clock', 'get_clock'), self.broker.get_clock)
+
+    async def list_positions(self):
+        return await self._cached('positions', ('positions', 'list_positions'), self.broker.list_positions)
+
+    async def get_position(self, symbol):
+        """Open position from the cached position list, or None"""
+        for position in await self.list_positions():
+            if position.symbol == symbol:
+                return position
+        return None
+
+    async def list_orders(self, status='open', limit=50):
+        return await self._cached('orders', ('orders', 'list_orders', status, limit),
+                                  lambda: self.broker.list_orders(status=status, limit=limit))
+
+    async def get_bars(self, symbol, start, end, timeframe='1Day', feed='iex', limit=10000):
+        bars = await self._cached('bars', ('bars', 'get_bars', symbol, start, end, timeframe, feed, limit),
+                                  lambda: self.broker.get_bars(symbol, start, end, timeframe, feed, limit))
+        return bars.copy()
+
+    async def get_order_by_client_id(self, client_order_id):
+        return await self.broker.get_order_by_client_id(client_order_id)
+
+    # Same composite as the broker's, made of the cached calls above
+    session_snapshot = AsyncAlpacaBroker.session_snapshot
+
+    # --- Writes -------------------------------------------------------------
+
+    async def submit_order(self, *args, **kwargs):
+        try:
+            return await self.broker.submit_order(*args, **kwargs)
+        finally:
+            # Even a failed attempt may have reached the broker
+            self.invalidate(*WRITE_INVALIDATES)
+
+    async def close_position(self, symbol):
+        try:
+            return await self.broker.close_position(symbol)
+        finally:
+            self.invalidate(*WRITE_INVALIDATES)
+
+
+def cached_broker(ttls=None, **kwargs):
+    """Broker for a tool: through the shared daemon if BROKER_CACHE_URL is set, else cached in-process
+
+    The daemon already caches every call, so in that case a second,
+    in-process layer is only added when the caller asks for its own ttls.
+    """
+    broker = AsyncAlpacaBroker()
+    if BROKER_CACHE_URL and ttls is None and not kwargs:
+        return broker
+    return BrokerCache(broker, ttls, **kwargs)
+
+
+class CacheServer:
+    """aiohttp app answering the Alpaca REST subset the tools use from one BrokerCache
+
+    Trading and data paths are served from the same host, like
+    StandInAlpaca, so alpaca_trade_api.REST and AsyncAlpacaBroker can
+    both use it as their base and data URL. Bars come back in a single
+    page. GET /cache/stats returns BrokerCache.stats(); POST
+    /cache/invalidate[?resource=...] drops cached reads.
+
+    Every request must carry the same APCA key headers the cache uses
+    upstream (401 otherwise), so the daemon never signs an order, or
+    shows the account, for a caller that doesn't hold the keys itself.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.key_id = cache.broker.key_id
+        self.secret_key = cache.broker.secret_key
+        if not self.key_id or not self.secret_key:
+            raise ValueError("The broker cache daemon needs APCA_API_KEY_ID and APCA_API_SECRET_KEY")
+
+    def app(self):
+        app = web.Application(middlewares=[self._authenticate, self._errors])
+        app.router.add_get('/v2/account', self.account)
+        app.router.add_get('/v2/clock', self.clock)
+        app.router.add_get('/v2/positions', self.list_positions)
+        app.router.add_get('/v2/positions/{symbol}', self.get_position)
+        app.router.add_delete('/v2/positions/{symbol}', self.close_position)
+        app.router.add_get('/v2/orders', self.list_orders)
+        app.router.add_post('/v2/orders', self.submit_order)
+        app.router.add_get('/v2/orders:by_client_order_id', self.get_order_by_client_id)
+        app.router.add_get('/v2/stocks/{symbol}/bars', self.get_bars)
+        app.router.add_get('/cache/stats', self.stats)
+        app.router.add_post('/cache/invalidate', self.invalidate)
+        return app
+
+    @web.middleware
+    async def _authenticate(self, request, handler):
+        key_id = request.headers.get('APCA-API-KEY-ID', '')
+        secret_key = request.headers.get('APCA-API-SECRET-KEY', '')
+        if not (hmac.compare_digest(key_id.encode(), self.key_id.encode())
+                and hmac.compare_digest(secret_key.encode(), self.secret_key.encode())):
+            return web.json_response({'code': 40110000, 'message': 'access key verification failed'},
+                                     status=401)
+        return await handler(request)
+
+    @web.middleware
+    async def _errors(self, request, handler):
+        # Upstream failures are passed on as the API's own status and message
+        try:
+            return await handler(request)
+        except BrokerError as e:
+            headers = {'Retry-After': f"{e.retry_after:g}"} if e.retry_after else None
+            return web.json_response({'message': e.message}, status=e.status, headers=headers)
+        except asyncio.TimeoutError:
+            return web.json_response({'message': 'upstream timeout'}, status=504)
+        except aiohttp.ClientError as e:
+            return web.json_response({'message': f"upstream unreachable: {e}"}, status=502)
+
+    @staticmethod
+    def _json(entity, missing='not found'):
+        if entity is None:
+            return web.json_response({'code': 40410000, 'message': missing}, status=404)
+        if isinstance(entity, list):
+            return web.json_response([vars(item) for item in entity])
+        return web.json_response(vars(entity))
+
+    async def account(self, request):
+        return self._json(await self.cache.get_account())
+
+    async def clock(self, request):
+        return self._json(await self.cache.get_clock())
+
+    async def list_positions(self, request):
+        return self._json(await self.cache.list_positions())
+
+    async def get_position(self, request):
+        return self._json(await self.cache.get_position(request.match_info['symbol']),
+                          'position does not exist')
+
+    async def close_position(self, request):
+        return self._json(await self.cache.close_position(request.match_info['symbol']))
+
+    async def list_orders(self, request):
+        query = request.query
+        return self._json(await self.cache.list_orders(status=query.get('status', 'open'),
+                                                       limit=int(query.get('limit', 50))))
+
+    async def submit_order(self, request):
+        body = await request.json()
+        return self._json(await self.cache.submit_order(
+            symbol=body['symbol'], qty=body['qty'], side=body['side'], type=body.get('type', 'market'),
+            time_in_force=body.get('time_in_force', 'day'), client_order_id=body.get('client_order_id')))
+
+    async def get_order_by_client_id(self, request):
+        return self._json(await self.cache.get_order_by_client_id(request.query.get('client_order_id')),
+                          'order not found')
+
+    async def get_bars(self, request):
+        symbol = request.match_info['symbol']
+        query = request.query
+        bars = await self.cache.get_bars(symbol, query.get('start'), query.get('end'),
+                                         query.get('timeframe', '1Day'), query.get('feed', 'iex'),
+                                         int(query.get('limit', 10000)))
+        return web.json_response({'bars': frame_to_bars(bars), 'symbol': symbol, 'next_page_token': None})
+
+    async def stats(self, request):
+        return web.json_response(self.cache.stats())
+
+    async def invalidate(self, request):
+        self.cache.invalidate(*request.query.getall('resource', []))
+        return web.json_response(self.cache.stats())
+
+
+def print_stats(stats):
+    print(f"   {'resource':10} {'hits':>7} {'misses':>7} {'coalesced':>9} {'errors':>7} {'hit rate':>9}")
+    for resource, counts in stats.items():
+        print(f"   {resource:10} {counts['hits']:>7} {counts['misses']:>7} {counts['coalesced']:>9} "
+              f"{counts['errors']:>7} {counts['hit_rate']:>8.1%}")
+
+
+def serve(host=BROKER_CACHE_HOST, port=BROKER_CACHE_PORT):
+    """Run the shared cache daemon in front of the real Alpaca API"""
+    # Explicit upstream URLs: the daemon must not follow BROKER_CACHE_URL to itself
+    cache = BrokerCache(AsyncAlpacaBroker(base_url=ALPACA_BASE_URL, data_url=ALPACA_DATA_URL))
+
+    async def shutdown(app):
+        await cache.close()
+        print("📊 Broker cache totals:")
+        print_stats(cache.stats())
+
+    app = CacheServer(cache).app()
+    app.on_cleanup.append(shutdown)
+    ttls = ', '.join(f"{resource} {ttl:g}s" for resource, ttl in cache.ttls.items())
+    print(f"📡 Broker cache: http://{host}:{port} (stats: /cache/stats) | TTLs: {ttls}")
+    print(f"   Point the tools at it with BROKER_CACHE_URL=http://{host}:{port}")
+    web.run_app(app, host=host, port=port, print=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared broker cache daemon and its hit/miss statistics")
+    parser.add_argument('--serve', action='store_true', help="run the cache daemon")
+    parser.add_argument('--host', default=BROKER_CACHE_HOST)
+    parser.add_argument('--port', type=int, default=BROKER_CACHE_PORT)
+    parser.add_argument('--invalidate', action='store_true', help="drop everything the daemon has cached")
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            serve(args.host, args.port)
+        except ValueError as e:
+            print(f"❌ {e}")
+        return
+    url = BROKER_CACHE_URL or f"http://{args.host}:{args.port}"
+    request = urllib.request.Request(f"{url}/cache/{'invalidate' if args.invalidate else 'stats'}",
+                                     method='POST' if args.invalidate else 'GET',
+                                     headers={'APCA-API-KEY-ID': ALPACA_API_KEY or '',
+                                              'APCA-API-SECRET-KEY': ALPACA_SECRET_KEY or ''})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            stats = json.load(response)
+    except OSError as e:
+        print(f"❌ No broker cache daemon at {url} ({e}) - start one with: python -m trading.cache --serve")
+        return
+    print(f"📊 Broker cache at {url}{' (invalidated)' if args.invalidate else ''}:")
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
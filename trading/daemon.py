@@ -0,0 +1,238 @@
+# trading/daemon.py - Resident scheduler around AutomatedTradingSystem
+import argparse
+import asyncio
+import signal
+import time
+from datetime import datetime, time as dtime
+
+import pandas as pd
+from aiohttp import web
+
+from config.settings import (
+    DAEMON_SESSION_TIMES, DAEMON_HOST, DAEMON_PORT, DAEMON_PREWARM_SECONDS, DAEMON_MAX_SLEEP
+)
+from utils.telemetry import telemetry
+
+MARKET_TZ = 'US/Eastern'
+
+
+def parse_session_times(spec):
+    """'10:05,15:30' -> [time(10, 5), time(15, 30)]"""
+    times = []
+    for part in spec.split(','):
+        if part.strip():
+            hour, minute = part.strip().split(':')
+            times.append(dtime(int(hour), int(minute)))
+    return sorted(times)
+
+
+def next_session_time(clock, session_times, after=None):
+    """Next session trigger from an Alpaca clock, as (trigger, recheck_at)
+
+    The trigger is the first configured time (US/Eastern) that falls inside
+    the current or next regular session and is still ahead. When none is
+    left, trigger is None and recheck_at is just after the session closes,
+    when the clock will point at the following trading day.
+    """
+    now = pd.Timestamp(clock.timestamp).tz_convert(MARKET_TZ)
+    next_close = pd.Timestamp(clock.next_close).tz_convert(MARKET_TZ)
+    window_start = now if clock.is_open else pd.Timestamp(clock.next_open).tz_convert(MARKET_TZ)
+
+    for session_time in session_times:
+        trigger = pd.Timestamp(datetime.combine(window_start.date(), session_time)).tz_localize(MARKET_TZ)
+        if window_start <= trigger < next_close and trigger > now and (after is None or trigger > after):
+            return trigger, None
+    return None, next_close + pd.Timedelta(minutes=1)
+
+
+class TradingDaemon:
+    """Keeps AutomatedTradingSystem resident and runs it at the configured session times
+
+    Modules, the broker's connection pool and the incremental signal state
+    stay in memory between sessions, so a session is one concurrent round
+    of API calls plus O(1) indicator updates. The loop sleeps on the
+    market clock (broker.get_clock, corrected for local clock offset),
+    re-checks it `prewarm` seconds before the trigger (which also reopens
+    the keep-alive connections) and starts the session on the trigger.
+    GET /health on host:port reports the daemon's status as JSON and
+    GET /metrics the session timing histograms in Prometheus text format
+    (telemetry is always on in the daemon).
+    """
+
+    def __init__(self, trader=None, session_times=None, host=DAEMON_HOST, port=DAEMON_PORT,
+                 prewarm=DAEMON_PREWARM_SECONDS, max_sleep=DAEMON_MAX_SLEEP):
+        if trader is None:
+            from auto_trading_system import AutomatedTradingSystem
+            trader = AutomatedTradingSystem()
+        self.trader = trader
+        telemetry.enable()
+        self.session_times = session_times or parse_session_times(DAEMON_SESSION_TIMES)
+        self.host = host
+        self.port = port
+        self.prewarm = pd.Timedelta(seconds=prewarm)
+        self.max_sleep = max_sleep
+        self.clock_offset = pd.Timedelta(0)
+        self.started_at = time.time()
+        self.status = {
+            'status': 'starting',
+            'symbol': trader.symbol,
+            'session_times': [t.strftime('%H:%M') for t in self.session_times],
+            'market_open': None,
+            'next_session': None,
+            'sessions_run': 0,
+            'last_session': None,
+        }
+        self._stop = None
+
+    def market_now(self):
+        return pd.Timestamp.now(tz=MARKET_TZ) + self.clock_offset
+
+    async def fetch_clock(self):
+        """Market clock; also re-estimates the local clock's offset from the server"""
+        sent = time.time()
+        clock = await self.trader.broker.get_clock()
+        received = time.time()
+        local = pd.Timestamp((sent + received) / 2, unit='s', tz='UTC')
+        self.clock_offset = pd.Timestamp(clock.timestamp) - local
+        self.status['market_open'] = clock.is_open
+        return clock
+
+    async def sleep_until(self, target):
+        """Sleep until `target` (market time); False if the daemon was stopped meanwhile
+
+        Sleeps in slices of at most max_sleep so a suspended machine or a
+        clock adjustment is noticed instead of oversleeping.
+        """
+        while True:
+            remaining = (target - self.market_now()).total_seconds()
+            if remaining <= 0:
+                return not self._stop.is_set()
+            try:
+                await asyncio.wait_for(self._stop.wait(), min(remaining, self.max_sleep))
+                return False
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_session(self, trigger):
+        started = self.market_now()
+        record = {
+            'trigger': trigger.isoformat(),
+            'started': started.isoformat(),
+            'wake_lag_ms': round((started - trigger).total_seconds() * 1000, 3),
+        }
+        try:
+            record['signal'] = await self.trader.trading_session(trigger)
+        except Exception as e:
+            record['error'] = str(e)
+            print(f"❌ Session error: {e}")
+        record['duration_ms'] = round((self.market_now() - started).total_seconds() * 1000, 3)
+        self.status['last_session'] = record
+        self.status['sessions_run'] += 1
+        print(f"⏱️  Session started {record['wake_lag_ms']:.1f} ms after trigger, "
+              f"took {record['duration_ms']:.1f} ms")
+
+    async def schedule_loop(self):
+        last_trigger = None
+        while not self._stop.is_set():
+            try:
+                clock = await self.fetch_clock()
+            except Exception as e:
+                self.status['status'] = 'error'
+                print(f"❌ Clock error: {e} - retrying in 60s")
+                if not await self.sleep_until(self.market_now() + pd.Timedelta(seconds=60)):
+                    break
+                continue
+            self.status['status'] = 'running'
+
+            trigger, recheck_at = next_session_time(clock, self.session_times, after=last_trigger)
+            if trigger is None:
+                self.status['next_session'] = None
+                print(f"💤 No session left today - checking the clock again at {recheck_at}")
+                if not await self.sleep_until(recheck_at):
+                    break
+                continue
+
+            self.status['next_session'] = trigger.isoformat()
+            print(f"⏰ Next session: {trigger} (in {trigger - self.market_now()})")
+            if not await self.sleep_until(trigger - self.prewarm):
+                break
+            # Re-check the clock (and warm the connection pool) just before the trigger;
+            # if that fails, the clock fetched above still decides
+            try:
+                clock = await self.fetch_clock()
+            except Exception as e:
+                print(f"⚠️  Clock re-check failed: {e} - keeping the earlier clock")
+            trigger, _ = next_session_time(clock, self.session_times, after=last_trigger)
+            if trigger is None or trigger - self.market_now() > self.prewarm:
+                continue
+            if not await self.sleep_until(trigger):
+                break
+            last_trigger = trigger
+            await self.run_session(trigger)
+
+    def health_status(self):
+        return dict(self.status,
+                    now=self.market_now().isoformat(),
+                    uptime_seconds=round(time.time() - self.started_at, 1),
+                    signal_state={
+                        'bars': self.trader.signal_state.bars,
+                        'last_bar': str(self.trader.signal_state.last_timestamp),
+                        'signal': self.trader.signal_state.signal_text,
+                    })
+
+    async def health(self, request):
+        status = self.health_status()
+        return web.json_response(status, status=503 if status['status'] == 'error' else 200)
+
+    async def metrics(self, request):
+        return web.Response(body=telemetry.prometheus().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/health', self.health)
+        app.router.add_get('/metrics', self.metrics)
+        return app
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not the main thread / not supported on this platform
+
+        runner = web.AppRunner(self.app())
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        print(f"🩺 Health endpoint: http://{self.host}:{self.port}/health")
+        try:
+            await self.schedule_loop()
+        finally:
+            await runner.cleanup()
+            await self.trader.broker.close()
+            print("\n🛑 Trading daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident trading daemon")
+    parser.add_argument('--times', default=DAEMON_SESSION_TIMES,
+                        help="session times, US/Eastern, comma separated (e.g. 10:05,15:30)")
+    parser.add_argument('--port', type=int, default=DAEMON_PORT)
+    args = parser.parse_args()
+
+    print("🤖 TRADING DAEMON")
+    print("="*60)
+    daemon = TradingDaemon(session_times=parse_session_times(args.times), port=args.port)
+    print(f"   Symbol: {daemon.trader.symbol}")
+    print(f"   Sessions (ET): {', '.join(daemon.status['session_times'])}")
+    asyncio.run(daemon.run())
+
+
+if __name__ == "__main__":
+    main()
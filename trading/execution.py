@@ -0,0 +1,356 @@
+# trading/execution.py - Batched order execution: rate limited, concurrent, idempotent retries
+import argparse
+import asyncio
+import hashlib
+import time
+
+import aiohttp
+
+from config.settings import (
+    EXECUTION_RATE, EXECUTION_BURST, EXECUTION_CONCURRENCY, EXECUTION_RETRIES,
+    EXECUTION_ORDER_TIMEOUT, EXECUTION_ORDER_PREFIX
+)
+from trading.broker import BrokerError
+from utils.telemetry import telemetry
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests a second, bursts of up to `capacity`
+
+    acquire() reserves its token immediately and then sleeps until the
+    token is due, so concurrent callers go out evenly spaced in arrival
+    order without a lock. pause() holds back every later request, e.g.
+    for a 429's Retry-After. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(max(1, capacity))
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait for a token; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        delay = -self.tokens / self.rate
+        await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, seconds):
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+def client_order_id(batch_id, symbol, side, qty, n=0, prefix=EXECUTION_ORDER_PREFIX):
+    """Deterministic client_order_id of one order in a batch
+
+    The same (batch, symbol, side, qty) always gives the same id, so a
+    retry - or a rerun of the whole batch after a crash - is refused by
+    the broker as a duplicate instead of filling a second time. n tells
+    identical orders of one batch apart.
+    """
+    key = f"{batch_id}|{symbol}|{side}|{qty}|{n}"
+    return f"{prefix}-{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"
+
+
+class OrderRequest:
+    """One order of a batch"""
+
+    def __init__(self, symbol, qty, side, type='market', time_in_force='day'):
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Unknown order side: {side}")
+        self.symbol = symbol
+        self.qty = qty
+        self.side = side
+        self.type = type
+        self.time_in_force = time_in_force
+
+    def __repr__(self):
+        return f"OrderRequest({self.side} {self.qty} {self.symbol})"
+
+
+class OrderResult:
+    """What happened to one OrderRequest
+
+    latency runs from the first send to the broker's acknowledgement,
+    retries included; queued is the time spent waiting on the rate
+    limiter. recovered means an earlier attempt of this run had reached
+    the broker after all and its order was looked up instead of submitted
+    again. duplicate_of holds the order an earlier batch or run already
+    placed under the same client_order_id; this request was not placed
+    and does not count as ok.
+    """
+
+    def __init__(self, request, client_order_id):
+        self.request = request
+        self.client_order_id = client_order_id
+        self.order = None
+        self.error = None
+        self.attempts = 0
+        self.latency = None
+        self.queued = 0.0
+        self.ambiguous = False
+        self.reached = False
+        self.recovered = False
+        self.duplicate_of = None
+
+    @property
+    def ok(self):
+        return self.order is not None
+
+    @property
+    def status(self):
+        if self.duplicate_of is not None:
+            return 'duplicate'
+        return getattr(self.order, 'status', None) if self.ok else 'failed'
+
+    def __repr__(self):
+        latency = f", {self.latency * 1000:.1f} ms" if self.latency is not None else ""
+        return f"OrderResult({self.request!r}: {self.status}, {self.attempts} attempt(s){latency})"
+
+
+class ExecutionReport:
+    """Results of one batch, in submission order"""
+
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok and r.duplicate_of is None]
+
+    @property
+    def duplicates(self):
+        return [r for r in self.results if r.duplicate_of is not None]
+
+    def summary(self):
+        latencies = sorted(r.latency for r in self.results if r.latency is not None)
+
+        def quantile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            'orders': len(self.results), 'ok': sum(r.ok for r in self.results),
+            'failed': len(self.failed), 'duplicates': len(self.duplicates),
+            'attempts': sum(r.attempts for r in self.results),
+            'recovered': sum(r.recovered for r in self.results), 'seconds': self.seconds,
+            'p50_ms': quantile(0.5), 'p95_ms': quantile(0.95), 'max_ms': quantile(1.0),
+            'queued_s': sum(r.queued for r in self.results),
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"📤 {s['orders']} orders in {s['seconds']:.2f}s: {s['ok']} ok, {s['failed']} failed, "
+              f"{s['duplicates']} already placed earlier, {s['attempts']} attempts, "
+              f"{s['recovered']} recovered after an ambiguous failure")
+        if s['ok']:
+            print(f"   Latency: p50 {s['p50_ms']:.1f} ms, p95 {s['p95_ms']:.1f} ms, max {s['max_ms']:.1f} ms "
+                  f"| rate-limit wait {s['queued_s']:.2f}s total")
+        for result in self.failed:
+            print(f"   ❌ {result.request.side} {result.request.qty} {result.request.symbol}: {result.error}")
+
+
+class OrderExecutor:
+    """Submits batches of orders concurrently, within the broker's rate limit
+
+    At most `concurrency` orders are in flight, and every broker request
+    takes a token from a shared TokenBucket first. Each order carries a
+    deterministic client_order_id (see client_order_id()). An attempt
+    that times out or gets a 5xx may still have reached the broker, so
+    the retry first looks the id up and only resubmits if the broker
+    never saw it. A resubmission the broker already has is refused as a
+    duplicate, so an order never fills twice. The ids this executor sent
+    (and, with a journal, every id an earlier run journaled) are kept in
+    `sent`: an order found under an id that was sent before this request
+    belongs to an earlier batch or run and is reported as a duplicate,
+    not as placed. 429s honour Retry-After
+    across the whole bucket; other 4xx are final. Orders and failures
+    are journaled when a journal is given, and latencies go to telemetry
+    as order_seconds.
+    """
+
+    def __init__(self, broker, rate=EXECUTION_RATE, burst=EXECUTION_BURST,
+                 concurrency=EXECUTION_CONCURRENCY, retries=EXECUTION_RETRIES,
+                 timeout=EXECUTION_ORDER_TIMEOUT, backoff=0.25, journal=None, bucket=None):
+        self.broker = broker
+        self.bucket = bucket or TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.journal = journal
+        self.sent = set()
+        self._journaled = None
+        self._slots = None
+
+    @staticmethod
+    def client_order_ids(orders, batch_id):
+        seen = {}
+        ids = []
+        for order in orders:
+            key = (order.symbol, order.side, order.qty)
+            seen[key] = seen.get(key, -1) + 1
+            ids.append(client_order_id(batch_id, *key, n=seen[key]))
+        return ids
+
+    async def execute(self, orders, batch_id, session_id=None):
+        """Submit a batch; sells go first so the buys can use the cash they free"""
+        orders = list(orders)
+        results = [OrderResult(o, cid) for o, cid in zip(orders, self.client_order_ids(orders, batch_id))]
+        started = time.perf_counter()
+        for side in ('sell', 'buy'):
+            await asyncio.gather(*(self._run(r, session_id) for r in results if r.request.side == side))
+        return ExecutionReport(results, time.perf_counter() - started)
+
+    async def submit(self, order, batch_id, session_id=None):
+        """Submit a single order; returns its OrderResult"""
+        result = OrderResult(order, client_order_id(batch_id, order.symbol, order.side, order.qty))
+        await self._run(result, session_id)
+        return result
+
+    async def _run(self, result, session_id):
+        # One semaphore per event loop (a session runs each on its own asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.concurrency))
+        async with self._slots[1]:
+            await self._submit(result)
+        request = result.request
+        if result.ok:
+            telemetry.observe('order_seconds', result.latency, request.symbol)
+        if self.journal is None:
+            return
+        if result.ok:
+            self.journal.record_order(result.order, session_id, attempts=result.attempts,
+                                      latency_ms=round(result.latency * 1000, 3), recovered=result.recovered)
+        else:
+            self.journal.record('order', request.symbol, session_id, side=request.side, qty=request.qty,
+                                status=result.status, client_order_id=result.client_order_id,
+                                attempts=result.attempts, error=str(result.error))
+
+    def sent_earlier(self, client_order_id):
+        """Whether an earlier batch of this executor, or a journaled earlier run, sent this id"""
+        if client_order_id in self.sent:
+            return True
+        if self.journal is None:
+            return False
+        if self._journaled is None:
+            self._journaled = self.journal.client_order_ids()
+        return client_order_id in self._journaled
+
+    async def _call(self, result, request):
+        result.queued += await self.bucket.acquire()
+        return await asyncio.wait_for(request(), self.timeout)
+
+    async def _submit(self, result):
+        request = result.request
+        first_sent = None
+        earlier = self.sent_earlier(result.client_order_id)
+        refused = False
+        for attempt in range(self.retries + 1):
+            if attempt:
+                if not refused:
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                # The last attempt may have reached the broker before failing
+                if result.ambiguous:
+                    try:
+                        order = await self._call(result, lambda: self.broker.get_order_by_client_id(
+                            result.client_order_id))
+                    except (asyncio.TimeoutError, aiohttp.ClientError, BrokerError) as e:
+                        result.error = e
+                        continue
+                    if order is not None:
+                        if result.reached and not earlier:
+                            result.order, result.recovered = order, True
+                        else:
+                            # Sent before this request: an earlier batch's or run's order
+                            result.duplicate_of = order
+                            result.error = (f"client_order_id {result.client_order_id} already used by "
+                                            f"order {getattr(order, 'id', '?')}")
+                        break
+                    result.ambiguous = False
+            result.attempts += 1
+            if first_sent is None:
+                first_sent = time.perf_counter()
+            self.sent.add(result.client_order_id)
+            try:
+                result.order = await self._call(result, lambda: self.broker.submit_order(
+                    symbol=request.symbol, qty=request.qty, side=request.side, type=request.type,
+                    time_in_force=request.time_in_force, client_order_id=result.client_order_id))
+                break
+            except BrokerError as e:
+                result.error = e
+                refused = e.status == 422 and 'client_order_id' in str(e.message)
+                if refused:
+                    result.ambiguous = True  # An earlier attempt (or run) got through
+                elif e.status == 429:
+                    self.bucket.pause(e.retry_after or self.backoff * 2 ** attempt)
+                elif e.status >= 500:
+                    result.ambiguous = result.reached = True
+                else:
+                    return
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                result.error = e
+                result.ambiguous = result.reached = True
+        if result.ok:
+            result.error = None
+            result.latency = time.perf_counter() - first_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched order execution against a local stand-in broker")
+    parser.add_argument('--orders', type=int, default=50, help="buy orders in the batch (one per symbol)")
+    parser.add_argument('--rate', type=float, default=EXECUTION_RATE, help="requests per second (0 = unlimited)")
+    parser.add_argument('--burst', type=int, default=EXECUTION_BURST)
+    parser.add_argument('--latency', type=float, default=0.02, help="stand-in response delay in seconds")
+    parser.add_argument('--timeouts', type=float, default=0.1,
+                        help="share of orders the stand-in fills but answers too late")
+    parser.add_argument('--errors', type=float, default=0.1, help="share of requests answered with a 503")
+    args = parser.parse_args()
+
+    from trading.broker import AsyncAlpacaBroker
+    from trading.standin import StandInAlpaca, StandInServer
+
+    api = StandInAlpaca(latency=args.latency, equity=10_000_000.0, timeout_rate=args.timeouts,
+                        error_rate=args.errors)
+    timeout = max(0.5, args.latency * 10)
+    api.timeout_delay = timeout * 2
+    orders = [OrderRequest(f"SYM{i:03d}", 10, 'buy') for i in range(args.orders)]
+
+    async def run(url):
+        async with AsyncAlpacaBroker('stand-in', 'stand-in', url, url) as broker:
+            executor = OrderExecutor(broker, rate=args.rate, burst=args.burst, timeout=timeout,
+                                     retries=5, backoff=0.05)
+            first = await executor.execute(orders, batch_id='demo')
+            # Rerunning the same batch must not place anything new
+            second = await executor.execute(orders, batch_id='demo')
+            return first, second
+
+    print(f"🧪 EXECUTION DEMO: {args.orders} orders, {args.rate:g} req/s (burst {args.burst}), "
+          f"{args.timeouts:.0%} late answers, {args.errors:.0%} 503s")
+    with StandInServer(api) as server:
+        first, second = asyncio.run(run(server.url))
+    first.print_summary()
+    print("🔁 Same batch again (every order already placed, none resubmitted):")
+    second.print_summary()
+    filled = sum(1 for o in api.orders if o['status'] == 'filled')
+    print(f"{'✅' if filled == args.orders else '❌'} Broker filled {filled} order(s) for {args.orders} requested "
+          f"({api.duplicates} duplicate submissions refused)")
+
+
+if __name__ == "__main__":
+    main()
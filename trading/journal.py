@@ -0,0 +1,256 @@
+# trading/journal.py - Append-only SQLite (WAL) journal of sessions, signals, orders, fills and equity
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from config.settings import JOURNAL_FILE
+
+KINDS = ('session', 'signal', 'order', 'fill', 'equity')
+FINAL_ORDER_STATUSES = ('filled', 'canceled', 'expired', 'rejected', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT,
+    session_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+"""
+
+JournalEvent = namedtuple('JournalEvent', 'id ts kind symbol session_id data')
+
+
+def _timestamp(value):
+    """Epoch seconds from None, a number, a datetime or an ISO string"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value.timestamp()
+
+
+class Journal:
+    """Structured trading journal in one SQLite database in WAL mode
+
+    Every event is one appended row: a timestamp (epoch seconds), a kind
+    from KINDS, the symbol, the id of the session event it belongs to and
+    a JSON payload. Rows are never updated. WAL lets readers run while a
+    writer appends. Separate processes (daemon, stream, dashboard) can
+    write at the same time: each insert is its own short transaction, and
+    a busy database is waited on for up to `timeout` seconds. Time-range
+    queries use the ts index; tail() follows new events by primary key.
+    Connections are per thread.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Durable at checkpoints rather than every commit; a crash can
+            # lose the last events but never corrupts the file
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def record(self, kind, symbol=None, session_id=None, ts=None, **data):
+        """Append one event; returns its id"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown journal event kind: {kind} (expected one of {KINDS})")
+        ts = time.time() if ts is None else _timestamp(ts)
+        cursor = self.db.execute(
+            'INSERT INTO events (ts, kind, symbol, session_id, data) VALUES (?, ?, ?, ?, ?)',
+            (ts, kind, symbol, session_id, json.dumps(data, default=str)))
+        return cursor.lastrowid
+
+    def record_order(self, order, session_id=None, **extra):
+        """Journal a broker order response, plus its fill if it already filled"""
+        fields = {k: getattr(order, k, None) for k in
+                  ('id', 'client_order_id', 'side', 'qty', 'type', 'status', 'submitted_at')}
+        event_id = self.record('order', getattr(order, 'symbol', None), session_id,
+                               **fields, **extra)
+        if getattr(order, 'status', None) == 'filled':
+            self.record_fill(order, session_id)
+        return event_id
+
+    def record_fill(self, order, session_id=None):
+        return self.record('fill', getattr(order, 'symbol', None), session_id,
+                           order_id=order.id, side=order.side, qty=float(order.filled_qty),
+                           price=float(order.filled_avg_price), filled_at=getattr(order, 'filled_at', None))
+
+    def open_order_ids(self):
+        """Ids of journaled orders whose latest event is neither final nor followed by a fill"""
+        rows = self.db.execute("""
+            SELECT order_id FROM (
+                SELECT json_extract(data, '$.id') AS order_id, json_extract(data, '$.status') AS status,
+                       MAX(id)
+                FROM events WHERE kind = 'order' AND order_id IS NOT NULL GROUP BY order_id
+            ) WHERE status NOT IN (%s)
+            EXCEPT
+            SELECT json_extract(data, '$.order_id') FROM events WHERE kind = 'fill'
+        """ % ', '.join(f"'{s}'" for s in FINAL_ORDER_STATUSES)).fetchall()
+        return {order_id for order_id, in rows}
+
+    def client_order_ids(self):
+        """client_order_id of every journaled order, placed or failed"""
+        rows = self.db.execute("SELECT DISTINCT json_extract(data, '$.client_order_id') FROM events "
+                               "WHERE kind = 'order'").fetchall()
+        return {cid for cid, in rows if cid}
+
+    def _select(self, where, params, order='ASC', limit=None):
+        sql = 'SELECT id, ts, kind, symbol, session_id, data FROM events'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY id {order}'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [JournalEvent(i, ts, kind, symbol, session_id, json.loads(data))
+                for i, ts, kind, symbol, session_id, data in self.db.execute(sql, params)]
+
+    @staticmethod
+    def _filters(kinds=None, symbol=None, session_id=None):
+        where, params = [], []
+        if kinds:
+            kinds = [kinds] if isinstance(kinds, str) else list(kinds)
+            where.append(f"kind IN ({', '.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if symbol:
+            where.append('symbol = ?')
+            params.append(symbol)
+        if session_id is not None:
+            where.append('session_id = ?')
+            params.append(session_id)
+        return where, params
+
+    def query(self, kinds=None, start=None, end=None, symbol=None, session_id=None, limit=None):
+        """Events in [start, end) (epoch seconds, datetimes or ISO strings), oldest first"""
+        where, params = self._filters(kinds, symbol, session_id)
+        if start is not None:
+            where.append('ts >= ?')
+            params.append(_timestamp(start))
+        if end is not None:
+            where.append('ts < ?')
+            params.append(_timestamp(end))
+        return self._select(where, params, limit=limit)
+
+    def last(self, kinds=None, n=1, symbol=None):
+        """The n most recent events, oldest first"""
+        where, params = self._filters(kinds, symbol)
+        return self._select(where, params, order='DESC', limit=n)[::-1]
+
+    def tail(self, after_id=0, kinds=None, limit=1000):
+        """Events appended after event id `after_id` (pass the last id seen)"""
+        where, params = self._filters(kinds)
+        where.append('id > ?')
+        params.append(after_id)
+        return self._select(where, params, limit=limit)
+
+    def equity_curve(self, start=None, end=None):
+        """[(ts, equity)] from the equity snapshots, oldest first"""
+        return [(e.ts, e.data['equity']) for e in self.query('equity', start, end)]
+
+    def last_id(self):
+        return self.db.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+    def count(self):
+        return dict(self.db.execute('SELECT kind, COUNT(*) FROM events GROUP BY kind').fetchall())
+
+    def import_csv(self, path):
+        """One-off migration of the old trading_log.csv (one row per session)"""
+        imported = 0
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                ts = _timestamp(datetime.fromisoformat(row['timestamp']))
+                session_id = self.record('session', ts=ts, status='complete', signal=row['signal'],
+                                         had_position=row['had_position'] == 'True', source=path)
+                self.record('equity', session_id=session_id, ts=ts, equity=float(row['equity']))
+                imported += 1
+        return imported
+
+
+def format_event(event):
+    when = datetime.fromtimestamp(event.ts).strftime('%Y-%m-%d %H:%M:%S')
+    details = ' '.join(f"{k}={v}" for k, v in event.data.items() if v is not None)
+    return f"{event.id:>6} {when} {event.kind:8} {event.symbol or '':6} {details}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the trading journal")
+    parser.add_argument('--db', default=JOURNAL_FILE)
+    parser.add_argument('--kind', action='append', choices=KINDS, help="repeatable; default: all")
+    parser.add_argument('--since', help="ISO date/time (local)")
+    parser.add_argument('--until', help="ISO date/time (local), exclusive")
+    parser.add_argument('--last', type=int, default=20, help="without --since: the last N events")
+    parser.add_argument('--follow', action='store_true', help="keep printing new events as they are written")
+    parser.add_argument('--stats', action='store_true', help="event counts per kind")
+    parser.add_argument('--import-csv', metavar='PATH', help="import an old trading_log.csv")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db) and not args.import_csv:
+        print(f"❌ No journal yet ({args.db})")
+        return
+    journal = Journal(args.db)
+    if args.import_csv:
+        print(f"📥 Imported {journal.import_csv(args.import_csv)} sessions from {args.import_csv}")
+        return
+    if args.stats:
+        counts = journal.count()
+        print(f"📒 {args.db}: " + ', '.join(f"{counts.get(k, 0)} {k}" for k in KINDS))
+        return
+
+    if args.since:
+        events = journal.query(args.kind, start=args.since, end=args.until)
+    else:
+        events = journal.last(args.kind, n=args.last)
+    for event in events:
+        print(format_event(event))
+    if not args.follow:
+        return
+
+    # The WAL file is touched by every commit, so wake on its changes
+    import asyncio
+    from utils.logtail import FileWatcher
+
+    async def follow(last_id):
+        watcher = FileWatcher(f"{args.db}-wal")
+        watcher.start()
+        try:
+            while True:
+                await watcher.wait(60)
+                for event in journal.tail(last_id, args.kind):
+                    print(format_event(event), flush=True)
+                    last_id = event.id
+        finally:
+            watcher.close()
+
+    try:
+        asyncio.run(follow(events[-1].id if events else journal.last_id()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
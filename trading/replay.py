@@ -0,0 +1,136 @@
+# trading/replay.py - Local websocket server replaying bars over the Alpaca stream protocol
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from data.synthetic import synthetic_minute_bars
+
+
+class ReplayServer:
+    """Streams historical bars to websocket clients as Alpaca "b" messages
+
+    Implements the handshake of the Alpaca v2 market data stream
+    (connected -> auth -> subscribe) on /v2/{feed}, then replays the bars
+    of the subscribed symbols in time order, one frame per timestamp.
+    speed is bars-per-bar-duration: 1 = real time, 60 = one minute bar per
+    second, 0 = as fast as the client reads. With live_timestamps each
+    bar is stamped as having just closed when it is sent, so clients can
+    measure delivery latency at any speed. The connection is closed when
+    the data runs out (unless loop=True).
+    """
+
+    def __init__(self, bars, speed=60.0, live_timestamps=True, bar_seconds=60, loop=False):
+        self.bars = bars
+        self.speed = speed
+        self.live_timestamps = live_timestamps
+        self.bar_seconds = bar_seconds
+        self.loop = loop
+        self.clients = 0
+        self.sent = 0
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/v2/{feed}', self.handle)
+        return app
+
+    def _frames(self, symbols):
+        """(timestamp ns, [(symbol, o, h, l, c, v), ...]) per timestamp, in time order"""
+        columns = []
+        for symbol in symbols:
+            df = self.bars[symbol]
+            stamps = df.index.values.astype('datetime64[ns]').view(np.int64)
+            columns.append((symbol, stamps, df['open'].to_numpy(), df['high'].to_numpy(),
+                            df['low'].to_numpy(), df['close'].to_numpy(), df['volume'].to_numpy()))
+        timeline = np.unique(np.concatenate([c[1] for c in columns])) if columns else []
+        positions = [0] * len(columns)
+        for stamp in timeline:
+            rows = []
+            for i, (symbol, stamps, o, h, l, c, v) in enumerate(columns):
+                j = positions[i]
+                if j < len(stamps) and stamps[j] == stamp:
+                    rows.append((symbol, float(o[j]), float(h[j]), float(l[j]), float(c[j]), int(v[j])))
+                    positions[i] = j + 1
+            yield int(stamp), rows
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.clients += 1
+        await ws.send_json([{'T': 'success', 'msg': 'connected'}])
+
+        auth = await ws.receive_json()
+        if auth.get('action') != 'auth' or not auth.get('key'):
+            await ws.send_json([{'T': 'error', 'code': 402, 'msg': 'auth failed'}])
+            await ws.close()
+            return ws
+        await ws.send_json([{'T': 'success', 'msg': 'authenticated'}])
+
+        subscribe = await ws.receive_json()
+        symbols = [s for s in subscribe.get('bars', []) if s in self.bars]
+        await ws.send_json([{'T': 'subscription', 'trades': [], 'quotes': [], 'bars': symbols}])
+
+        interval = self.bar_seconds / self.speed if self.speed > 0 else 0.0
+        try:
+            while True:
+                started = time.monotonic()
+                for k, (stamp, rows) in enumerate(self._frames(symbols)):
+                    if interval:
+                        # Absolute schedule, so slow sends do not accumulate drift
+                        delay = started + (k + 1) * interval - time.monotonic()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    if self.live_timestamps:
+                        stamp = int((time.time() - self.bar_seconds) * 1e9)
+                    t = pd.Timestamp(stamp, tz='UTC').strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+                    await ws.send_str(json.dumps([
+                        {'T': 'b', 'S': s, 'o': o, 'h': h, 'l': l, 'c': c, 'v': v, 't': t}
+                        for s, o, h, l, c, v in rows
+                    ]))
+                    self.sent += len(rows)
+                    if ws.closed:
+                        return ws
+                if not self.loop:
+                    break
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        await ws.close()
+        return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay bars over a local Alpaca-style websocket")
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--symbols', default='AAPL', help="comma separated (synthetic data)")
+    parser.add_argument('--csv', help="replay an OHLCV CSV (index = timestamps) as --symbols' only symbol")
+    parser.add_argument('--sessions', type=int, default=5, help="synthetic trading days per symbol")
+    parser.add_argument('--speed', type=float, default=60.0,
+                        help="1 = real time, 60 = a minute bar per second, 0 = as fast as possible")
+    parser.add_argument('--loop', action='store_true', help="start over when the data runs out")
+    parser.add_argument('--historical-timestamps', action='store_true',
+                        help="send the original bar times instead of stamping bars as just closed")
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+    if args.csv:
+        df = pd.read_csv(args.csv, index_col=0)
+        df.index = pd.to_datetime(df.index, utc=True)
+        df.columns = [c.lower() for c in df.columns]
+        bars = {symbols[0]: df}
+    else:
+        bars = synthetic_minute_bars(symbols, sessions=args.sessions)
+    server = ReplayServer(bars, speed=args.speed, live_timestamps=not args.historical_timestamps,
+                          loop=args.loop)
+
+    total = sum(len(df) for df in bars.values())
+    print(f"📼 Replaying {total:,} bars ({', '.join(bars)}) at speed {args.speed:g}")
+    print(f"   ws://127.0.0.1:{args.port}/v2/iex")
+    web.run_app(server.app(), host='127.0.0.1', port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
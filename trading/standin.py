@@ -0,0 +1,306 @@
+# trading/standin.py - Local stand-in for the Alpaca REST API (offline testing/benchmarks)
+import argparse
+import asyncio
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+from aiohttp import web
+
+from data.synthetic import synthetic_daily_bars
+
+
+def _utc(value):
+    """Query timestamp as UTC; like Alpaca, a bare date ('2024-01-02') means its UTC midnight"""
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize('UTC') if stamp.tz is None else stamp.tz_convert('UTC')
+
+
+class StandInAlpaca:
+    """aiohttp app speaking the subset of the Alpaca trading + data API the bot uses
+
+    Serves both base URLs from one host (/v2/account, /v2/stocks/.../bars,
+    ...), so alpaca_trade_api.REST and AsyncAlpacaBroker can both point at
+    it. `latency` seconds are added to every response to stand in for the
+    network round trip. Orders fill immediately at the last bar's close.
+    The clock follows open_time-close_time (US/Eastern) on trading_days.
+
+    For exercising order execution (trading/execution.py): client_order_ids
+    are unique (a repeat is refused with 422, like Alpaca) and can be
+    looked up; error_rate of requests get a 503 without being processed,
+    timeout_rate of orders are filled but answered only after
+    timeout_delay seconds; rate_limit (requests a second, burst of the
+    same size) answers 429 with Retry-After when exceeded. Faults are
+    drawn from a seeded RNG, so runs repeat.
+    """
+
+    def __init__(self, latency=0.0, equity=100000.0, bars=None, page_size=1000,
+                 open_time='09:30', close_time='16:00', trading_days=(0, 1, 2, 3, 4),
+                 error_rate=0.0, timeout_rate=0.0, timeout_delay=30.0, rate_limit=None, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self._allowance = rate_limit or 0.0
+        self._allowance_at = time.monotonic()
+        self.by_client_id = {}
+        self.duplicates = 0
+        self.rejected = {429: 0, 503: 0}
+        self.open_time = open_time
+        self.close_time = close_time
+        self.trading_days = trading_days
+        self.cash = equity
+        self.bars = bars if bars is not None else synthetic_daily_bars()
+        self.page_size = page_size
+        self.positions = {}
+        self.orders = []
+        self.requests = 0
+        self.connections = set()
+
+    def app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/v2/account', self.account)
+        app.router.add_get('/v2/clock', self.clock)
+        app.router.add_get('/v2/positions', self.list_positions)
+        app.router.add_get('/v2/positions/{symbol}', self.get_position)
+        app.router.add_delete('/v2/positions/{symbol}', self.close_position)
+        app.router.add_get('/v2/orders', self.list_orders)
+        app.router.add_post('/v2/orders', self.submit_order)
+        app.router.add_get('/v2/orders:by_client_order_id', self.get_order_by_client_id)
+        app.router.add_get('/v2/stocks/{symbol}/bars', self.get_bars)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info('peername'))
+        if not request.headers.get('APCA-API-KEY-ID'):
+            return web.json_response({'code': 40110000, 'message': 'access key verification failed'},
+                                     status=401)
+        if self.rate_limit:
+            now = time.monotonic()
+            self._allowance = min(self.rate_limit, self._allowance + (now - self._allowance_at) * self.rate_limit)
+            self._allowance_at = now
+            if self._allowance < 1:
+                self.rejected[429] += 1
+                return web.json_response({'code': 42910000, 'message': 'rate limit exceeded'}, status=429,
+                                         headers={'Retry-After': f"{(1 - self._allowance) / self.rate_limit:.3f}"})
+            self._allowance -= 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.rejected[503] += 1
+            return web.json_response({'code': 50310000, 'message': 'service unavailable'}, status=503)
+        return await handler(request)
+
+    def _last_price(self):
+        return float(self.bars['close'].iloc[-1])
+
+    def _position(self, symbol):
+        qty = self.positions[symbol]['qty']
+        avg = self.positions[symbol]['avg_entry_price']
+        price = self._last_price()
+        return {
+            'symbol': symbol, 'qty': str(qty), 'side': 'long',
+            'avg_entry_price': str(avg), 'current_price': str(price),
+            'market_value': str(qty * price), 'unrealized_pl': str(qty * (price - avg)),
+            'unrealized_plpc': str(price / avg - 1),
+        }
+
+    def _equity(self):
+        return self.cash + sum(p['qty'] for p in self.positions.values()) * self._last_price()
+
+    async def account(self, request):
+        equity = self._equity()
+        return web.json_response({
+            'id': 'stand-in', 'status': 'ACTIVE', 'currency': 'USD',
+            'equity': str(equity), 'cash': str(self.cash), 'buying_power': str(2 * self.cash),
+            'last_equity': str(equity),
+        })
+
+    def market_clock(self, now=None):
+        """(is_open, next_open, next_close) for regular hours in US/Eastern (no holidays)"""
+        now = (now or pd.Timestamp.now(tz='UTC')).tz_convert('US/Eastern')
+        day = now.normalize()
+        while True:
+            if day.weekday() in self.trading_days:
+                open_at = day + pd.Timedelta(self.open_time + ':00')
+                close_at = day + pd.Timedelta(self.close_time + ':00')
+                if now < close_at:
+                    is_open = open_at <= now
+                    if is_open:
+                        # Alpaca reports the following session's open while open
+                        next_day = day + pd.Timedelta(days=1)
+                        while next_day.weekday() not in self.trading_days:
+                            next_day += pd.Timedelta(days=1)
+                        open_at = next_day + pd.Timedelta(self.open_time + ':00')
+                    return is_open, open_at, close_at
+            day += pd.Timedelta(days=1)
+
+    async def clock(self, request):
+        now = pd.Timestamp.now(tz='UTC')
+        is_open, next_open, next_close = self.market_clock(now)
+        return web.json_response({
+            'timestamp': now.tz_convert('US/Eastern').isoformat(), 'is_open': bool(is_open),
+            'next_open': next_open.isoformat(), 'next_close': next_close.isoformat(),
+        })
+
+    async def list_positions(self, request):
+        return web.json_response([self._position(s) for s in self.positions])
+
+    async def get_position(self, request):
+        symbol = request.match_info['symbol']
+        if symbol not in self.positions:
+            return web.json_response({'code': 40410000, 'message': 'position does not exist'},
+                                     status=404)
+        return web.json_response(self._position(symbol))
+
+    def _fill(self, symbol, qty, side, client_order_id=None):
+        price = self._last_price()
+        held = self.positions.get(symbol, {'qty': 0, 'avg_entry_price': price})
+        if side == 'buy':
+            total = held['qty'] + qty
+            held['avg_entry_price'] = (held['qty'] * held['avg_entry_price'] + qty * price) / total
+            held['qty'] = total
+            self.cash -= qty * price
+        else:
+            held['qty'] -= qty
+            self.cash += qty * price
+        if held['qty'] > 0:
+            self.positions[symbol] = held
+        else:
+            self.positions.pop(symbol, None)
+
+        now = datetime.now(timezone.utc).isoformat()
+        order = {
+            'id': str(uuid.uuid4()), 'client_order_id': client_order_id or str(uuid.uuid4()),
+            'symbol': symbol, 'qty': str(qty), 'filled_qty': str(qty), 'side': side,
+            'type': 'market', 'status': 'filled', 'filled_avg_price': str(price),
+            'submitted_at': now, 'filled_at': now,
+        }
+        self.orders.append(order)
+        self.by_client_id[order['client_order_id']] = order
+        return order
+
+    async def submit_order(self, request):
+        body = await request.json()
+        qty = float(body['qty'])
+        qty = int(qty) if qty.is_integer() else qty
+        if body.get('client_order_id') in self.by_client_id:
+            self.duplicates += 1
+            return web.json_response({'code': 40010001, 'message': 'client_order_id must be unique'},
+                                     status=422)
+        if body.get('side') == 'sell' and self.positions.get(body['symbol'], {}).get('qty', 0) < qty:
+            return web.json_response({'code': 40310000, 'message': 'insufficient qty available'},
+                                     status=403)
+        order = self._fill(body['symbol'], qty, body['side'], body.get('client_order_id'))
+        if self.timeout_rate and self.random.random() < self.timeout_rate:
+            # Filled, but the answer arrives after the client has given up
+            await asyncio.sleep(self.timeout_delay)
+        return web.json_response(order)
+
+    async def get_order_by_client_id(self, request):
+        order = self.by_client_id.get(request.query.get('client_order_id'))
+        if order is None:
+            return web.json_response({'code': 40410000, 'message': 'order not found'}, status=404)
+        return web.json_response(order)
+
+    async def close_position(self, request):
+        symbol = request.match_info['symbol']
+        if symbol not in self.positions:
+            return web.json_response({'code': 40410000, 'message': 'position does not exist'},
+                                     status=404)
+        return web.json_response(self._fill(symbol, self.positions[symbol]['qty'], 'sell'))
+
+    async def list_orders(self, request):
+        limit = int(request.query.get('limit', 50))
+        return web.json_response(self.orders[-limit:][::-1])
+
+    async def get_bars(self, request):
+        symbol = request.match_info['symbol']
+        query = request.query
+        bars = self.bars
+        if 'start' in query:
+            bars = bars[bars.index >= _utc(query['start'])]
+        if 'end' in query:
+            bars = bars[bars.index <= _utc(query['end'])]
+
+        offset = int(query.get('page_token', 0))
+        limit = min(int(query.get('limit', self.page_size)), self.page_size)
+        page = bars.iloc[offset:offset + limit]
+        next_token = str(offset + limit) if offset + limit < len(bars) else None
+        rows = [
+            {'t': t.strftime('%Y-%m-%dT%H:%M:%SZ'), 'o': o, 'h': h, 'l': l, 'c': c, 'v': int(v)}
+            for t, o, h, l, c, v in zip(page.index, page['open'], page['high'], page['low'],
+                                        page['close'], page['volume'])
+        ]
+        return web.json_response({'bars': rows, 'symbol': symbol, 'next_page_token': next_token})
+
+
+class StandInServer:
+    """Run a stand-in (anything with an .app(), e.g. StandInAlpaca) on 127.0.0.1 in a thread"""
+
+    def __init__(self, api=None, port=0):
+        self.api = api or StandInAlpaca()
+        self.port = port
+        self.url = None
+        self._loop = None
+        self._thread = None
+        self._runner = None
+        self._ready = threading.Event()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.api.app())
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.url
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Alpaca REST API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Seconds added to every response (simulated round trip)")
+    args = parser.parse_args()
+
+    print(f"🧪 Alpaca stand-in on http://127.0.0.1:{args.port} (latency {args.latency*1000:.0f} ms)")
+    print(f"   export APCA_API_BASE_URL=http://127.0.0.1:{args.port}")
+    print(f"   export APCA_API_DATA_URL=http://127.0.0.1:{args.port}")
+    web.run_app(StandInAlpaca(latency=args.latency).app(), host='127.0.0.1', port=args.port,
+                print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+# trading/stream.py - Minute-bar streaming: Alpaca websocket bars -> strategy on every bar close
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import aiohttp
+
+from config.settings import (
+    ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_STREAM_URL, DATA_FEED,
+    SIMULATED_CAPITAL, RISK_PERCENT, RISK_PER_TRADE,
+    STREAM_SYMBOLS, STREAM_STATE_FILE, STREAM_MAX_LAG
+)
+from utils.telemetry import telemetry
+
+
+class StreamError(Exception):
+    """Error message from the market data stream (e.g. auth failure)"""
+
+
+def bar_time(bar):
+    """Start of a streamed bar as an aware datetime"""
+    return datetime.fromisoformat(bar['t'].replace('Z', '+00:00'))
+
+
+def bar_close_time(bar, bar_seconds=60):
+    """Epoch seconds at which a streamed bar closed (its 't' is the bar start)"""
+    return bar_time(bar).timestamp() + bar_seconds
+
+
+class BarStream:
+    """Alpaca v2 market data websocket, subscribed to bars for some symbols
+
+    Speaks the documented protocol: wait for "connected", authenticate,
+    subscribe, then every text frame is a JSON array of messages; "b"
+    messages are bars. bars() yields (bar, received_at) with received_at
+    taken when the frame arrived, before any parsing.
+    """
+
+    def __init__(self, symbols, url=None, key_id=None, secret_key=None, feed=DATA_FEED):
+        self.symbols = list(symbols)
+        self.url = url or f"{ALPACA_STREAM_URL.rstrip('/')}/v2/{feed}"
+        self.key_id = key_id or ALPACA_API_KEY
+        self.secret_key = secret_key or ALPACA_SECRET_KEY
+
+    @staticmethod
+    async def _expect(ws, msg):
+        messages = await ws.receive_json()
+        for item in messages:
+            if item.get('T') == 'error':
+                raise StreamError(f"{item.get('code')}: {item.get('msg')}")
+            if item.get('T') == 'success' and item.get('msg') == msg:
+                return
+        raise StreamError(f"Expected '{msg}', got {messages}")
+
+    async def bars(self, session):
+        async with session.ws_connect(self.url, heartbeat=30) as ws:
+            await self._expect(ws, 'connected')
+            await ws.send_json({'action': 'auth', 'key': self.key_id, 'secret': self.secret_key})
+            await self._expect(ws, 'authenticated')
+            await ws.send_json({'action': 'subscribe', 'bars': self.symbols})
+
+            async for message in ws:
+                received_at = time.time()
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    if message.type == aiohttp.WSMsgType.ERROR:
+                        raise StreamError(f"Websocket error: {ws.exception()}")
+                    continue
+                for item in json.loads(message.data):
+                    kind = item.get('T')
+                    if kind == 'b':
+                        yield item, received_at
+                    elif kind == 'error':
+                        raise StreamError(f"{item.get('code')}: {item.get('msg')}")
+
+
+class LatencyStats:
+    """Recent latency samples (seconds) with percentile summaries"""
+
+    def __init__(self, maxlen=100000):
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+
+    def record(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {'count': 0}
+        values = sorted(self.samples)
+        pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+        return {'count': self.count, 'p50_ms': pick(0.50) * 1000, 'p99_ms': pick(0.99) * 1000,
+                'max_ms': values[-1] * 1000}
+
+
+class StreamingTrader:
+    """Runs SimpleCombinedWithATR on every streamed bar close, per symbol
+
+    Each symbol has an IncrementalSignalState, so a bar costs O(1) no
+    matter how long the stream has been running. Two latencies are
+    measured for every bar: delivery (bar close -> frame received) and
+    decision (frame received -> signal computed). A position change is
+    only acted on if the bar arrived within max_lag seconds of its close;
+    staler signals are reported and skipped. A bar no newer than the
+    symbol's last one (redelivered after a reconnect, or replayed) is
+    counted and dropped, never folded into the state twice. Orders (trade=True) go out
+    through the async broker as background tasks, so the stream keeps
+    being read while they are in flight; a symbol's orders run one at a
+    time, in signal order, so a sell never reads the position before the
+    buy ahead of it has filled. State is saved to state_file on exit and
+    every save_every bars.
+    """
+
+    def __init__(self, symbols, strategy=None, stream=None, broker=None, trade=False,
+                 max_lag=STREAM_MAX_LAG, state_file=STREAM_STATE_FILE, save_every=500,
+                 bar_seconds=60, verbose=True):
+        from strategies.incremental import IncrementalSignalState
+        from strategies.main_strategy import SimpleCombinedWithATR
+
+        self.symbols = list(symbols)
+        self.strategy = strategy or SimpleCombinedWithATR(risk_per_trade=RISK_PER_TRADE, verbose=False)
+        self.stream = stream or BarStream(self.symbols)
+        self.trade = trade
+        if trade and broker is None:
+            from trading.broker import AsyncAlpacaBroker
+            broker = AsyncAlpacaBroker()
+        self.broker = broker
+        self.executor = None
+        if broker is not None:
+            from trading.execution import OrderExecutor
+            self.executor = OrderExecutor(broker)
+        self.max_lag = max_lag
+        self.state_file = state_file
+        self.save_every = save_every
+        self.bar_seconds = bar_seconds
+        self.verbose = verbose
+
+        saved = {}
+        if state_file and os.path.exists(state_file):
+            with open(state_file) as f:
+                saved = json.load(f)
+        self.states = {
+            symbol: IncrementalSignalState.from_dict(saved[symbol], self.strategy)
+            if symbol in saved else IncrementalSignalState(self.strategy)
+            for symbol in self.symbols
+        }
+        self.delivery = LatencyStats()
+        self.decision = LatencyStats()
+        self.bars = 0
+        self.stale_signals = 0
+        self.replayed = 0
+        self.orders = []
+        self._tasks = set()
+        self._locks = {}
+
+    def on_bar(self, bar, received_at):
+        """Update the symbol's state with one bar; returns the signal"""
+        state = self.states.get(bar['S'])
+        if state is None:
+            return 0
+        if state.last_timestamp is not None and bar_time(bar) <= state.last_timestamp:
+            self.replayed += 1
+            return 0
+        was_long = state.latched
+        signal = state.update(bar['t'], bar['h'], bar['l'], bar['c'])
+        decided_at = time.time()
+
+        self.bars += 1
+        lag = received_at - bar_close_time(bar, self.bar_seconds)
+        self.delivery.record(lag)
+        self.decision.record(decided_at - received_at)
+
+        if state.latched != was_long:
+            side = 'buy' if state.latched else 'sell'
+            if lag > self.max_lag:
+                self.stale_signals += 1
+                if self.verbose:
+                    print(f"⚠️  {bar['S']} {side.upper()} at {bar['t']} ignored: bar is {lag:.1f}s old")
+            else:
+                self.on_position_change(bar['S'], side, state)
+        if self.save_every and self.bars % self.save_every == 0:
+            self.save()
+        return signal
+
+    def on_position_change(self, symbol, side, state):
+        if self.verbose:
+            print(f"🎯 {symbol} {side.upper()} @ ${state.close:.2f} ({state.last_timestamp})")
+        if not self.trade:
+            return
+        task = asyncio.ensure_future(self.execute(symbol, side, state.close, state.atr_value,
+                                                  time.perf_counter(), f"stream-{state.last_timestamp}"))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def execute(self, symbol, side, price, atr, signal_at=None, batch_id=None):
+        """Same sizing as the daily session: risk SIMULATED_CAPITAL * RISK_PERCENT per ATR stop
+
+        Orders go through the shared OrderExecutor (rate limit, retries);
+        batch_id (the signal's bar) keeps a retried signal from trading twice.
+        The broker's position decides, not the signal state: a skipped
+        (stale) or failed sell leaves the position open while the state
+        went flat, so a buy is only sent when nothing is held yet.
+        """
+        lock = self._locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            await self._execute(symbol, side, price, atr, signal_at, batch_id)
+
+    async def _execute(self, symbol, side, price, atr, signal_at, batch_id):
+        from trading.execution import OrderRequest
+
+        try:
+            position = await self.broker.get_position(symbol)
+            if side == 'buy':
+                if position is not None:
+                    if self.verbose:
+                        print(f"⏸️  {symbol} BUY skipped: already holding {position.qty} shares")
+                    return
+                if not atr or atr != atr:
+                    return
+                qty = max(1, int(SIMULATED_CAPITAL * RISK_PERCENT / (atr * self.strategy.atr_multiplier)))
+            else:
+                if position is None:
+                    return
+                qty = float(position.qty)
+                qty = int(qty) if qty.is_integer() else qty
+        except Exception as e:
+            print(f"❌ {symbol} {side} order failed: {e}")
+            return
+        result = await self.executor.submit(OrderRequest(symbol, qty, side),
+                                            batch_id or f"stream-{time.time()}")
+        if not result.ok:
+            print(f"❌ {symbol} {side} order failed: {result.error}")
+            return
+        if signal_at is not None:
+            telemetry.observe('signal_to_order_seconds', time.perf_counter() - signal_at, symbol)
+        self.orders.append(result.order)
+        if self.verbose:
+            print(f"✅ {symbol} {side} order {result.order.id}")
+
+    def save(self):
+        if not self.state_file:
+            return
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({symbol: state.to_dict() for symbol, state in self.states.items()}, f)
+        os.replace(tmp_path, self.state_file)
+
+    def report(self):
+        delivery, decision = self.delivery.summary(), self.decision.summary()
+        print(f"📊 {self.bars:,} bars | {len(self.orders)} orders | {self.stale_signals} stale signals | "
+              f"{self.replayed} replayed bars dropped")
+        if delivery['count']:
+            print(f"   Delivery (close -> received): p50 {delivery['p50_ms']:.2f} ms, "
+                  f"p99 {delivery['p99_ms']:.2f} ms, max {delivery['max_ms']:.2f} ms")
+            print(f"   Decision (received -> signal): p50 {decision['p50_ms']:.3f} ms, "
+                  f"p99 {decision['p99_ms']:.3f} ms, max {decision['max_ms']:.3f} ms")
+
+    async def run(self, reconnect=True, max_bars=None):
+        """Consume the stream until it ends (reconnect=False), max_bars, or cancellation"""
+        backoff = 1
+        try:
+            async with aiohttp.ClientSession() as session:
+                while True:
+                    try:
+                        async for bar, received_at in self.stream.bars(session):
+                            self.on_bar(bar, received_at)
+                            backoff = 1
+                            if max_bars and self.bars >= max_bars:
+                                return
+                    except (aiohttp.ClientError, StreamError) as e:
+                        if not reconnect:
+                            raise
+                        print(f"❌ Stream error: {e}")
+                    if not reconnect:
+                        return
+                    print(f"🔌 Stream closed - reconnecting in {backoff}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60)
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self.broker is not None:
+                await self.broker.close()
+            self.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the strategy on streamed minute bars")
+    parser.add_argument('--symbols', default=STREAM_SYMBOLS, help="comma separated (default: STREAM_SYMBOLS)")
+    parser.add_argument('--url', default=None, help="websocket URL (e.g. a local trading.replay server)")
+    parser.add_argument('--trade', action='store_true', help="submit orders on position changes")
+    parser.add_argument('--no-reconnect', action='store_true', help="stop when the stream closes")
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+    trader = StreamingTrader(symbols, stream=BarStream(symbols, url=args.url), trade=args.trade)
+    print(f"📡 STREAMING {', '.join(symbols)} minute bars from {trader.stream.url}")
+    print(f"   Trading: {'ON' if args.trade else 'OFF (signals only)'} | max lag {trader.max_lag:.0f}s")
+    try:
+        asyncio.run(trader.run(reconnect=not args.no_reconnect))
+    except KeyboardInterrupt:
+        print("\n🛑 Stream stopped by user")
+    trader.report()
+
+
+if __name__ == "__main__":
+    main()
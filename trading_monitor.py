@@ -1,110 +1,171 @@
-import time
-import os
-from datetime import datetime, timedelta
-import subprocess
 import sys
+import os
+import argparse
+import asyncio
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import (
+    SYMBOL, SESSION_LOG_FILE, MONITOR_STATUS_SECONDS, MONITOR_BROKER_TTL, DAEMON_SESSION_TIMES
+)
+from utils.logtail import LogTail, FileWatcher
+
+# The market clock only changes meaning once a day
+CLOCK_TTL = 900
+
+
+class TradingMonitor:
+    """Follows the session log as it grows and shows account status periodically
+
+    New log lines are printed as soon as they are written: the monitor
+    sleeps on file change notifications and reads only the appended
+    bytes. The status block (log size, next session, position, equity)
+    is printed every status_interval seconds from the shared broker cache
+    (trading/cache.py), with account and position kept for broker_ttl
+    seconds and failures for as long, so an unreachable API is not
+    retried on every refresh; new log lines expire the account/position
+    cache, since they usually mean a session just traded.
+    """
+
+    def __init__(self, log_file=SESSION_LOG_FILE, symbol=SYMBOL, status_interval=MONITOR_STATUS_SECONDS,
+                 broker=None, broker_ttl=MONITOR_BROKER_TTL, use_broker=True, backlog=5, width=80):
+        self.log_file = log_file
+        self.symbol = symbol
+        self.status_interval = status_interval
+        self.backlog = backlog
+        self.width = width
+        self.tail = LogTail(log_file)
+        self.watcher = FileWatcher(log_file)
+        self.broker = None
+        if use_broker:
+            from trading.cache import BrokerCache
+            ttls = {'account': broker_ttl, 'positions': broker_ttl, 'clock': CLOCK_TTL}
+            self.broker = BrokerCache(broker, ttls, error_ttl=broker_ttl)
+        self.updates = 0
+
+    def clean(self, line):
+        line = line.rstrip()
+        return line[:self.width] + "..." if len(line) > self.width else line
+
+    def print_lines(self, lines):
+        lines = [line for line in lines if line.strip()]
+        for line in lines:
+            print(f"  {self.clean(line)}")
+        return len(lines)
+
+    async def next_session(self):
+        from trading.daemon import next_session_time, parse_session_times
+
+        clock = await self.broker.get_clock()
+        trigger, _ = next_session_time(clock, parse_session_times(DAEMON_SESSION_TIMES))
+        if trigger is not None and trigger.timestamp() < time.time():
+            # The cached clock is from before that trigger: ask again next time
+            self.broker.invalidate('clock')
+        return trigger
+
+    async def print_status(self):
+        self.updates += 1
+        print(f"\n🔄 Update #{self.updates} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("-"*40)
+        try:
+            st = os.stat(self.log_file)
+            print(f"💾 Log: {st.st_size / 1024:.1f} KB, updated: "
+                  f"{datetime.fromtimestamp(st.st_mtime).strftime('%H:%M:%S')}")
+        except FileNotFoundError:
+            print("📝 No log file yet")
+
+        if self.broker is None:
+            print("-"*40)
+            return
+        try:
+            trigger = await self.next_session()
+            if trigger is None:
+                print("⏰ Next session: none left today (waiting for the next trading day)")
+            else:
+                local = trigger.to_pydatetime().astimezone()
+                left = int(trigger.timestamp() - time.time())
+                print(f"⏰ Next session: {local.strftime('%Y-%m-%d %H:%M')} "
+                      f"(in {left // 3600}h {(left % 3600) // 60}m)")
+        except Exception as e:
+            print(f"⏰ Next session: unknown ({e})")
+
+        account, position = await asyncio.gather(
+            self.broker.get_account(), self.broker.get_position(self.symbol),
+            return_exceptions=True)
+        if isinstance(position, Exception):
+            print(f"🔍 Position check failed: {position}")
+        elif position is None:
+            print(f"🔍 {self.symbol}: No position")
+        else:
+            print(f"🔍 {self.symbol}: {position.qty} shares, P&L: ${float(position.unrealized_pl):+.2f}")
+        if not isinstance(account, Exception):
+            print(f"💰 Equity: ${float(account.equity):,.2f}")
+        print("-"*40)
+
+    async def run(self, duration=None):
+        """Follow the log until cancelled (or for `duration` seconds)"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.watcher.start()
+        try:
+            backlog = self.tail.seek_end(self.backlog)
+            if backlog:
+                print("📝 RECENT LOG ENTRIES:")
+                self.print_lines(backlog)
+            await self.print_status()
+            next_status = loop.time() + self.status_interval
+
+            while duration is None or loop.time() - started < duration:
+                timeout = next_status - loop.time()
+                if duration is not None:
+                    timeout = min(timeout, started + duration - loop.time())
+                if await self.watcher.wait(max(timeout, 0)):
+                    if self.print_lines(self.tail.read_new()) and self.broker is not None:
+                        self.broker.invalidate('account', 'positions')
+                if loop.time() >= next_status:
+                    await self.print_status()
+                    next_status = loop.time() + self.status_interval
+        finally:
+            self.watcher.close()
+            self.tail.close()
+            if self.broker is not None:
+                await self.broker.close()
+
+    def report(self):
+        mode = 'inotify' if self.watcher.using_inotify else f'polling every {self.watcher.poll_interval:g}s'
+        print(f"📊 {self.watcher.wakeups} log wakeups ({mode}), {self.tail.bytes_read:,} bytes read, "
+              f"{self.updates} status updates")
+        if self.broker is not None:
+            total = self.broker.stats()['total']
+            print(f"   Broker: {total['misses']} API calls, {total['hits'] + total['coalesced']} served from cache")
 
-from config.settings import SYMBOL
 
 def monitor_trading_bot():
     """Monitor trading bot in real-time"""
+    parser = argparse.ArgumentParser(description="Follow the session log and account status")
+    parser.add_argument('--log', default=SESSION_LOG_FILE, help="log file to follow")
+    parser.add_argument('--symbol', default=SYMBOL)
+    parser.add_argument('--status-every', type=float, default=MONITOR_STATUS_SECONDS,
+                        help="seconds between status blocks")
+    parser.add_argument('--no-broker', action='store_true', help="log only, no API calls")
+    parser.add_argument('--duration', type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
     print("📊 TRADING BOT LIVE MONITOR")
     print("="*60)
-    print("Monitors: trading_sessions.log | Positions | Account")
+    print(f"Monitors: {args.log} | Positions | Account")
     print("Press Ctrl+C to stop")
     print("="*60)
-    
-    log_file = 'trading_sessions.log'
-    iteration = 0
-    
+
+    monitor = TradingMonitor(args.log, args.symbol, args.status_every, use_broker=not args.no_broker)
     try:
-        while True:
-            iteration += 1
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            print(f"\n🔄 Update #{iteration} - {current_time}")
-            print("-"*40)
-            
-            # 1. Show latest log entries
-            if os.path.exists(log_file):
-                print("📝 RECENT LOG ENTRIES:")
-                try:
-                    with open(log_file, 'r') as f:
-                        lines = f.readlines()
-                        if lines:
-                            # Show last relevant lines
-                            recent = [l for l in lines[-20:] if l.strip()]
-                            for line in recent[-5:]:
-                                # Clean up the output
-                                clean_line = line.rstrip()[:80] + "..." if len(line) > 80 else line.rstrip()
-                                print(f"  {clean_line}")
-                        else:
-                            print("  Log file empty")
-                except:
-                    print("  Error reading log")
-            else:
-                print("📝 No log file yet")
-            
-            # 2. File info
-            if os.path.exists(log_file):
-                size_kb = os.path.getsize(log_file) / 1024
-                mod_time = datetime.fromtimestamp(os.path.getmtime(log_file))
-                print(f"\n💾 Log: {size_kb:.1f} KB, updated: {mod_time.strftime('%H:%M:%S')}")
-            
-            # 3. Next scheduled run
-            now = datetime.now()
-            next_run = now.replace(hour=14, minute=5, second=0, microsecond=0)
-            if now > next_run:
-                next_run += timedelta(days=1)
-            
-            # Skip weekends
-            while next_run.weekday() >= 5:
-                next_run += timedelta(days=1)
-            
-            time_left = next_run - now
-            hours = time_left.seconds // 3600
-            minutes = (time_left.seconds % 3600) // 60
-            
-            print(f"\n⏰ NEXT SCHEDULED RUN:")
-            print(f"  Time: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"  In: {hours}h {minutes}m")
-            
-            # 4. Quick position check (every 3 updates)
-            if iteration % 3 == 0:
-                print(f"\n🔍 QUICK POSITION CHECK:")
-                try:
-                    # Simple position check without full imports
-                    check_code = '''
-import alpaca_trade_api as tradeapi
-import os
-from dotenv import load_dotenv
-load_dotenv()
-from config.settings import SYMBOL
-api = tradeapi.REST(os.getenv("APCA_API_KEY_ID"), os.getenv("APCA_API_SECRET_KEY"), "https://paper-api.alpaca.markets")
-try:
-    pos = api.get_position(SYMBOL)
-    print(f"{SYMBOL}: {pos.qty} shares, P&L: ${float(pos.unrealized_pl):+.2f}")
-except:
-    print(f"{SYMBOL}: No position")
-'''
-                    result = subprocess.run(
-                        [sys.executable, '-c', check_code],
-                        capture_output=True,
-                        text=True
-                    )
-                    if result.stdout:
-                        print(f"  {result.stdout.strip()}")
-                except:
-                    print("  Position check failed")
-            
-            print("-"*40)
-            print("Sleeping 60 seconds... (Ctrl+C to stop)")
-            
-            time.sleep(60)
-            
+        asyncio.run(monitor.run(duration=args.duration))
     except KeyboardInterrupt:
         print("\n\n🛑 Monitor stopped by user")
-        print("="*60)
+    monitor.report()
+    print("="*60)
+
 
 if __name__ == "__main__":
     monitor_trading_bot()
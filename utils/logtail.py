@@ -0,0 +1,194 @@
+# utils/logtail.py - Incremental file tailing and change notification (inotify on Linux)
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+
+
+class LogTail:
+    """Returns only the lines appended to a file since the previous read
+
+    Keeps the file open at its last offset between calls, so each read
+    costs the size of what was appended, not of the whole file. When the
+    path is replaced (log rotation) the rest of the old file is read
+    before following the new one; a truncated file is read again from the
+    start. A trailing line without its newline yet is held back until it
+    is complete.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.partial = b''
+        self.bytes_read = 0
+        self._file = None
+
+    def _open(self):
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            self._file = None
+        self.partial = b''
+        return self._file
+
+    def seek_end(self, backlog=0, block=8192):
+        """Start at the end of the file; returns its last `backlog` lines"""
+        f = self._open()
+        if f is None:
+            return []
+        size = f.seek(0, os.SEEK_END)
+        if backlog <= 0 or size == 0:
+            return []
+        # Read backwards in blocks until enough newlines are found
+        data = b''
+        position = size
+        while position > 0 and data.count(b'\n') <= backlog:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+        f.seek(size)
+        self.bytes_read += len(data)
+        lines = data.decode('utf-8', 'replace').splitlines()
+        return lines[-backlog:]
+
+    def read_new(self):
+        """Complete lines appended since the last call"""
+        if self._file is None and self._open() is None:
+            return []
+        if os.fstat(self._file.fileno()).st_size < self._file.tell():
+            self._file.seek(0)
+            self.partial = b''
+        data = self.partial + self._read()
+        lines = data.split(b'\n')
+        self.partial = lines.pop()
+
+        if self._rotated():
+            # Whatever the old file ended with is final
+            if self.partial:
+                lines.append(self.partial)
+            self._file.close()
+            if self._open() is not None:
+                more = self._read().split(b'\n')
+                self.partial = more.pop()
+                lines.extend(more)
+        return [line.decode('utf-8', 'replace') for line in lines]
+
+    def _read(self):
+        data = self._file.read()
+        self.bytes_read += len(data)
+        return data
+
+    def _rotated(self):
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class FileWatcher:
+    """Wakes an asyncio task when a file changes
+
+    Uses inotify on the file's directory (so creation and rotation are
+    seen too) where available; elsewhere it falls back to checking the
+    file's size and mtime every poll_interval seconds. wait(timeout)
+    returns True on a change, False if the timeout passed first.
+    """
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+    def __init__(self, path, poll_interval=1.0):
+        self.path = os.path.abspath(path)
+        self.name = os.fsencode(os.path.basename(self.path))
+        self.poll_interval = poll_interval
+        self.fd = None
+        self.using_inotify = False
+        self.wakeups = 0
+        self._event = None
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_ino, st.st_size, st.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def start(self):
+        """Register with the running event loop (call from inside it)"""
+        self._event = asyncio.Event()
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return
+            directory = os.fsencode(os.path.dirname(self.path))
+            if libc.inotify_add_watch(fd, directory, self.MASK) < 0:
+                os.close(fd)
+                return
+        except (OSError, AttributeError):
+            # No inotify (e.g. macOS): wait() polls instead
+            return
+        self.fd = fd
+        self.using_inotify = True
+        asyncio.get_running_loop().add_reader(fd, self._on_readable)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+            if name == self.name:
+                self._event.set()
+
+    async def wait(self, timeout):
+        if self.fd is None:
+            return await self._poll(timeout)
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        self.wakeups += 1
+        return True
+
+    async def _poll(self, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                self.wakeups += 1
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        if self.fd is not None:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = None
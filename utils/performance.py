@@ -0,0 +1,198 @@
+# utils/performance.py - Running performance aggregates over the trading journal
+import json
+import os
+import time
+from datetime import datetime
+
+from config.settings import JOURNAL_FILE, DASHBOARD_STATE_FILE, DASHBOARD_CHART_FILE
+
+
+class PerformanceStats:
+    """Equity statistics kept up to date one journal event at a time
+
+    Each update() reads only the equity and session events appended
+    since the last one (by journal id) and folds them into running
+    aggregates: return, peak and drawdown, best/worst/average session
+    return and the signal counts. The aggregates and the series the
+    chart needs are saved to a small JSON state file, so the next
+    dashboard run starts where this one stopped. The chart is redrawn
+    only when events arrived since it was last rendered.
+    """
+
+    def __init__(self, journal_path=JOURNAL_FILE):
+        self.journal_path = os.path.abspath(journal_path)
+        self.last_id = 0
+        self.rendered_id = None
+        self.initial = None
+        self.current = None
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.return_sum = 0.0
+        self.best = None
+        self.worst = None
+        self.signals = {}
+        self.timestamps = []
+        self.equity = []
+        self.returns = []
+        self.drawdowns = []
+
+    @property
+    def sessions(self):
+        return len(self.equity)
+
+    def add_equity(self, ts, equity):
+        if self.initial is None:
+            self.initial = self.peak = equity
+            self.returns.append(None)
+        else:
+            ret = (equity / self.current - 1) * 100
+            self.return_sum += ret
+            self.best = ret if self.best is None else max(self.best, ret)
+            self.worst = ret if self.worst is None else min(self.worst, ret)
+            self.returns.append(ret)
+        self.current = equity
+        self.peak = max(self.peak, equity)
+        drawdown = (equity - self.peak) / self.peak * 100
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+        self.timestamps.append(ts)
+        self.equity.append(equity)
+        self.drawdowns.append(drawdown)
+
+    def update(self, journal):
+        """Fold in the events appended since the last update; returns how many there were"""
+        if journal.last_id() < self.last_id:
+            # The journal was recreated: its ids started over
+            self.__init__(self.journal_path)
+        new = 0
+        while True:
+            events = journal.tail(self.last_id, ('equity', 'session'))
+            if not events:
+                return new
+            for event in events:
+                if event.kind == 'equity':
+                    self.add_equity(event.ts, float(event.data['equity']))
+                elif event.data.get('status') == 'complete' and event.data.get('signal'):
+                    signal = event.data['signal']
+                    self.signals[signal] = self.signals.get(signal, 0) + 1
+                self.last_id = event.id
+            new += len(events)
+
+    def summary(self):
+        """The precomputed statistics as a JSON-ready dict"""
+        stats = {'sessions': self.sessions, 'last_event_id': self.last_id, 'signals': self.signals}
+        if self.initial is None:
+            return stats
+        stats.update(
+            initial_equity=self.initial,
+            current_equity=self.current,
+            total_pnl=self.current - self.initial,
+            total_return_pct=(self.current - self.initial) / self.initial * 100,
+            avg_return_pct=self.return_sum / (self.sessions - 1) if self.sessions > 1 else None,
+            best_return_pct=self.best,
+            worst_return_pct=self.worst,
+            peak_equity=self.peak,
+            drawdown_pct=self.drawdowns[-1],
+            max_drawdown_pct=self.max_drawdown,
+            last_snapshot=datetime.fromtimestamp(self.timestamps[-1]).isoformat(),
+        )
+        return stats
+
+    def chart_stale(self, path=DASHBOARD_CHART_FILE):
+        return self.rendered_id != self.last_id or not os.path.exists(path)
+
+    def render(self, path=DASHBOARD_CHART_FILE, show=False):
+        """Draw the four-panel chart to path; returns False when it was already current"""
+        if not self.chart_stale(path) and not show:
+            return False
+        import matplotlib
+        if not show:
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        dates = [datetime.fromtimestamp(ts) for ts in self.timestamps]
+        fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+
+        # Equity curve
+        ax = axes[0, 0]
+        ax.plot(dates, self.equity, 'b-', linewidth=2, label='Equity')
+        ax.fill_between(dates, self.equity, min(self.equity, default=0), alpha=0.1)
+        ax.set_title('Account Equity Over Time', fontsize=12)
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Equity ($)')
+        ax.grid(True, alpha=0.3)
+        ax.legend()
+
+        # Session returns
+        ax = axes[0, 1]
+        returns = [0.0 if r is None else r for r in self.returns]
+        ax.bar(range(len(returns)), returns, color=['green' if r >= 0 else 'red' for r in returns], alpha=0.7)
+        ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+        ax.set_title('Daily Returns (%)', fontsize=12)
+        ax.set_xlabel('Session')
+        ax.set_ylabel('Return %')
+        ax.grid(True, alpha=0.3)
+
+        # Signal distribution
+        ax = axes[1, 0]
+        if self.signals:
+            ax.pie(list(self.signals.values()), labels=list(self.signals), autopct='%1.1f%%',
+                   colors=['green', 'red', 'gray'])
+        ax.set_title('Signal Distribution', fontsize=12)
+
+        # Drawdown
+        ax = axes[1, 1]
+        ax.fill_between(dates, self.drawdowns, 0, color='red', alpha=0.3)
+        ax.plot(dates, self.drawdowns, 'r-', alpha=0.7)
+        ax.set_title('Drawdown (%)', fontsize=12)
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Drawdown %')
+        ax.grid(True, alpha=0.3)
+        ax.set_ylim([self.max_drawdown - 1, 1])
+
+        fig.tight_layout()
+        fig.savefig(path, dpi=120, bbox_inches='tight')
+        if show:
+            plt.show()
+        plt.close(fig)
+        self.rendered_id = self.last_id
+        return True
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def save(self, path=DASHBOARD_STATE_FILE):
+        """Persist atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DASHBOARD_STATE_FILE, journal_path=JOURNAL_FILE):
+        """Restore saved aggregates, or start fresh if missing or from another journal"""
+        stats = cls(journal_path)
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get('journal_path') == stats.journal_path:
+                vars(stats).update(state)
+        return stats
+
+
+class StatsRefresher:
+    """Shared PerformanceStats for a long-running server, refreshed at most every min_interval seconds"""
+
+    def __init__(self, journal, stats, state_file=DASHBOARD_STATE_FILE, min_interval=1.0):
+        self.journal = journal
+        self.stats = stats
+        self.state_file = state_file
+        self.min_interval = min_interval
+        self._checked = 0.0
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self._checked >= self.min_interval:
+            self._checked = now
+            if self.stats.update(self.journal):
+                self.stats.save(self.state_file)
+        return self.stats
@@ -0,0 +1,103 @@
+# utils/status.py - Quick read-only commands (signal, position, account) with minimal imports
+import argparse
+import json
+import os
+
+from config.settings import SIGNAL_STATE_FILE, SYMBOL
+
+
+def print_signal(state):
+    """Print a signal state dict (IncrementalSignalState.to_dict() / signal_state.json)"""
+    signal = {1: "BUY", -1: "SELL"}.get(state['signal'], "HOLD")
+    print(f"🎯 {SYMBOL} signal: {signal}")
+    print(f"   Last bar:   {state['last_timestamp']} ({state['bars']} bars)")
+    print(f"   Close:      ${state['close']:.2f}")
+    print(f"   EMA fast/slow: {state['ma_fast']:.2f} / {state['ma_slow']:.2f}")
+    print(f"   RSI:        {state['rsi']:.1f}")
+    print(f"   ATR:        {state['atr']['value']:.2f}")
+    print(f"   Position:   {'LONG' if state['latched'] else 'FLAT'}")
+    if state['signal'] == 1:
+        print(f"   Size/Stop:  {state['position_size']*100:.1f}% / ${state['stop_loss']:.2f}")
+
+
+def show_signal():
+    """Latest signal from the persisted state file (no pandas, no network) or --live"""
+    parser = argparse.ArgumentParser(description="Today's strategy signal")
+    parser.add_argument('--live', action='store_true',
+                        help="fetch new bars from the broker first (includes today's forming bar)")
+    args = parser.parse_args()
+
+    if args.live:
+        from auto_trading_system import AutomatedTradingSystem
+        state = AutomatedTradingSystem().check_signal()
+        if state is None:
+            print("❌ No data available")
+            return
+        print_signal(state.to_dict())
+        return
+
+    if not os.path.exists(SIGNAL_STATE_FILE):
+        print(f"❌ No signal state yet ({SIGNAL_STATE_FILE}) - run a session or use --live")
+        return
+    with open(SIGNAL_STATE_FILE) as f:
+        print_signal(json.load(f))
+
+
+def broker_calls(*calls):
+    """Run broker calls (functions of the broker) concurrently through the shared broker cache"""
+    import asyncio
+    from trading.cache import cached_broker
+
+    async def fetch():
+        async with cached_broker() as broker:
+            return await asyncio.gather(*(call(broker) for call in calls))
+    return asyncio.run(fetch())
+
+
+def show_position():
+    """Account equity and the open position (or all of them), fetched concurrently"""
+    parser = argparse.ArgumentParser(description="Account and open position")
+    parser.add_argument('--symbol', default=SYMBOL)
+    parser.add_argument('--all', action='store_true', help="every open position and their total P&L")
+    args = parser.parse_args()
+
+    if args.all:
+        account, positions = broker_calls(lambda b: b.get_account(), lambda b: b.list_positions())
+    else:
+        account, position = broker_calls(lambda b: b.get_account(), lambda b: b.get_position(args.symbol))
+    print(f"💰 Equity: ${float(account.equity):,.2f} | Cash: ${float(account.cash):,.2f}")
+    if not args.all:
+        if position is None:
+            print(f"📦 {args.symbol}: No position")
+        else:
+            print(f"📦 {args.symbol}: {position.qty} shares @ ${float(position.avg_entry_price):.2f}")
+            print(f"   Current: ${float(position.current_price):.2f} | "
+                  f"P&L: ${float(position.unrealized_pl):+.2f}")
+        return
+
+    if not positions:
+        print("📦 No positions")
+        return
+    total_pnl = 0
+    for p in positions:
+        pnl = float(p.unrealized_pl)
+        total_pnl += pnl
+        print(f"📦 {p.symbol}: {p.qty} shares @ ${float(p.avg_entry_price):.2f}")
+        print(f"   Current: ${float(p.current_price):.2f} | "
+              f"P&L: ${pnl:+.2f} ({float(p.unrealized_plpc)*100:+.2f}%)")
+    print(f"   TOTAL P&L: ${total_pnl:+.2f}")
+
+
+def show_account():
+    """Account balances and the return since a starting equity"""
+    parser = argparse.ArgumentParser(description="Account summary")
+    parser.add_argument('--starting-equity', type=float, default=100000.0)
+    args = parser.parse_args()
+
+    account, = broker_calls(lambda b: b.get_account())
+    equity = float(account.equity)
+    print(f"💰 Equity: ${equity:,.2f}")
+    print(f"   Buying Power: ${float(account.buying_power):,.2f}")
+    print(f"   Cash: ${float(account.cash):,.2f}")
+    print(f"   Total Return: {(equity / args.starting_equity - 1) * 100:+.3f}%")
+    print(f"   Total P&L: ${equity - args.starting_equity:+.2f}")
@@ -0,0 +1,217 @@
+# utils/telemetry.py - Timing spans and latency histograms with Prometheus / JSON lines export
+import atexit
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+from config.settings import TELEMETRY_ENABLED, TELEMETRY_EXPORT
+
+# Histogram upper bounds in seconds: 100 us to 60 s on a 1-2.5-5 scale
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = 'trading_'
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (counts per bucket plus count, sum, min, max)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate, interpolated linearly inside the bucket holding the q-th sample"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                value = low + (high - low) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.sum, 'min': self.min, 'max': self.max,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99),
+                'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts))}
+
+
+class _NoSpan:
+    """Shared do-nothing span handed out while telemetry is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, telemetry, metric, name):
+        self.telemetry = telemetry
+        self.metric = metric
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.observe(self.metric, time.perf_counter() - self.started, self.name)
+        return False
+
+
+class Telemetry:
+    """Registry of latency histograms, one per (metric, name)
+
+    Metrics used across the bot:
+      stage_seconds            pipeline stages (fetch, indicators, signals, backtest, ...)
+      broker_call_seconds      AsyncAlpacaBroker requests, by method
+      signal_to_order_seconds  signal decided -> order acknowledged, by symbol
+
+    While disabled, span() returns a shared no-op object and timed()
+    functions only pay one attribute check, so the instrumentation can
+    stay in hot paths. Enable with TELEMETRY=1 (or enable()).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def observe(self, metric, seconds, name=''):
+        if not self.enabled:
+            return
+        key = (metric, name)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, name, metric='stage_seconds'):
+        """Context manager timing its block"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, metric, name)
+
+    def timed(self, name, metric='stage_seconds'):
+        """Decorator timing every call of a function or coroutine function"""
+        def decorate(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    started = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.observe(metric, time.perf_counter() - started, name)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(metric, time.perf_counter() - started, name)
+            return wrapper
+        return decorate
+
+    # --- Export -----------------------------------------------------------
+
+    def _items(self):
+        with self._lock:
+            return sorted(self.histograms.items())
+
+    def prometheus(self):
+        """Prometheus text exposition format (histograms in seconds)"""
+        lines = []
+        typed = set()
+        for (metric, name), h in self._items():
+            full = PREFIX + metric
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} histogram")
+            label = f'name="{name}"'
+            cumulative = 0
+            for bound, n in zip([f"{b:g}" for b in h.buckets] + ['+Inf'], h.counts):
+                cumulative += n
+                lines.append(f'{full}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{full}_sum{{{label}}} {h.sum:.9g}")
+            lines.append(f"{full}_count{{{label}}} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def records(self):
+        """One JSON-ready dict per histogram"""
+        now = time.time()
+        return [dict(ts=now, metric=PREFIX + metric, name=name, **h.to_dict())
+                for (metric, name), h in self._items()]
+
+    def export(self, path):
+        """Write .prom files as Prometheus text (replaced); anything else gets JSON lines appended"""
+        if path.endswith('.prom'):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(self.prometheus())
+            os.replace(tmp_path, path)
+        else:
+            with open(path, 'a') as f:
+                for record in self.records():
+                    f.write(json.dumps(record) + '\n')
+
+    def report(self):
+        print("⏱️  TIMINGS (p50 / p95 / max, ms)")
+        for (metric, name), h in self._items():
+            print(f"   {metric:24} {name:16} {h.count:>6}x  "
+                  f"{h.quantile(0.5)*1000:>9.2f} {h.quantile(0.95)*1000:>9.2f} {h.max*1000:>9.2f}")
+
+
+telemetry = Telemetry(enabled=TELEMETRY_ENABLED)
+
+
+@atexit.register
+def _export_at_exit():
+    if not telemetry.enabled or not telemetry.histograms:
+        return
+    if TELEMETRY_EXPORT:
+        telemetry.export(TELEMETRY_EXPORT)
+        print(f"⏱️  Telemetry written to {TELEMETRY_EXPORT}")
+    else:
+        telemetry.report()
@@ -0,0 +1,64 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import (
+    SYMBOL, BACKTEST_START_DATE, BACKTEST_END_DATE,
+    INITIAL_CAPITAL, COMMISSION, BACKTEST_ENGINE
+)
+from data.data_fetcher import DataFetcher
+from backtesting.optimizer import DEFAULT_SPACE, grid_search_space, random_search_space
+from backtesting.walk_forward import WalkForward
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward out-of-sample evaluation")
+    parser.add_argument('symbols', nargs='*', default=[SYMBOL], help="symbols to evaluate")
+    parser.add_argument('--train', type=int, default=252, help="training window in bars")
+    parser.add_argument('--test', type=int, default=63, help="test window in bars")
+    parser.add_argument('--step', type=int, default=None, help="roll step in bars (default: --test)")
+    parser.add_argument('--random', type=int, metavar='N',
+                        help="optimize over N random combinations instead of the full grid")
+    parser.add_argument('--seed', type=int, default=None, help="seed for --random")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("🔁 TRADING BOT - WALK-FORWARD ANALYSIS")
+    print("="*60)
+
+    data = {}
+    for symbol in args.symbols:
+        df = DataFetcher(symbol, BACKTEST_START_DATE, BACKTEST_END_DATE).fetch_historical_data()
+        if df is not None:
+            data[symbol] = df
+    if not data:
+        return
+
+    if args.random:
+        combos = random_search_space(DEFAULT_SPACE, args.random, seed=args.seed)
+    else:
+        combos = grid_search_space(DEFAULT_SPACE)
+
+    runner = WalkForward(train_bars=args.train, test_bars=args.test, step=args.step,
+                         combos=combos, initial_capital=INITIAL_CAPITAL, commission=COMMISSION,
+                         engine=BACKTEST_ENGINE, max_workers=args.workers)
+    result = runner.run(data)
+
+    summary = result.summary()
+    if len(summary):
+        summary.to_csv('walk_forward_folds.csv', index=False)
+        print(f"\n📄 Per-fold results saved to: walk_forward_folds.csv")
+
+    print("\n" + "="*60)
+    print("📊 STITCHED OUT-OF-SAMPLE RESULTS")
+    print("="*60)
+    for symbol in result.symbols:
+        equity = result.stitched_equity(symbol)
+        equity.to_csv(f'walk_forward_equity_{symbol}.csv', header=['portfolio_value'])
+        print(f"{symbol:8}: ${equity.iloc[0]:,.2f} -> ${equity.iloc[-1]:,.2f} "
+              f"({(equity.iloc[-1] / INITIAL_CAPITAL - 1)*100:+.2f}%) over {len(equity)} bars")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()